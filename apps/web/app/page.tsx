@@ -5,7 +5,8 @@ import { useRouter } from "next/navigation";
 import { postJSON, getOrCreateUserId } from "../lib/api";
 
 type StreamEvent =
-  | { stage: "router" | "rag" | "search" | "llm"; msg: string }
+  | { stage: "router" | "cache" | "rag" | "search" | "curate" | "llm"; msg: string }
+  | { stage: "narration"; msg: string; delta: string }
   | { stage: "done"; msg: string; story_payload: any; session_id?: string };
 
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:8000";
@@ -15,6 +16,7 @@ export default function ExpressPage() {
   const [text, setText] = useState("");
   const [busy, setBusy] = useState(false);
   const [progress, setProgress] = useState<string[]>([]);
+  const [narration, setNarration] = useState("");
   const [error, setError] = useState<string | null>(null);
 
   // A simple staged fallback ticker in case streaming fails
@@ -95,7 +97,11 @@ export default function ExpressPage() {
         }
         if (!data) continue;
 
-        if (data.stage !== "done") {
+        if (data.stage === "narration") {
+          // partial story text while the LLM is still writing
+          const delta = data.delta;
+          setNarration((prev) => prev + delta);
+        } else if (data.stage !== "done") {
           setProgress((prev) => [...prev, data.msg]);
         } else {
           // Final payload from stream
@@ -144,6 +150,7 @@ export default function ExpressPage() {
 
     setBusy(true);
     setProgress([]);
+    setNarration("");
     startFallbackTicker();
 
     // Save quick client hints
@@ -225,6 +232,9 @@ export default function ExpressPage() {
               <li key={i}>{p}</li>
             ))}
           </ul>
+          {narration && (
+            <p className="mt-3 whitespace-pre-wrap text-neutral-700">{narration}</p>
+          )}
         </div>
       )}
 
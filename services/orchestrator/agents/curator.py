@@ -1,4 +1,4 @@
-from llm.adapter import generate_with_gemini
+from llm.adapter import agenerate_with_gemini
 
 async def curate_context(scripture_text: str, web_snippets: list[str]) -> str:
     prompt = f"""
@@ -13,4 +13,4 @@ WEB KNOWLEDGE:
 Return a unified short insight paragraph.
 """
 
-    return generate_with_gemini(prompt)
+    return await agenerate_with_gemini(prompt)
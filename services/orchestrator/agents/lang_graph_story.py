@@ -1,9 +1,10 @@
 from typing import List, Dict
+import os, time, asyncio, inspect
 from langgraph.graph import StateGraph, START, END
 from .schemas import StoryState
 from .planner import plan_sources
 from .search_agents import plan_queries, web_search_stub
-from rag.retrieve import search_gita
+from rag.retrieve import asearch, works_for_hint
 from .prompts import STORY_SYSTEM, STORY_USER_TEMPLATE
 from .llm_adapter import llm_generate
 
@@ -20,42 +21,41 @@ def _format_context(rag_hits: List[Dict], web_snippets: List[Dict]) -> str:
     return "\n".join(parts) if parts else "(no context)"
 
 def router(state: StoryState) -> StoryState:
-    state["plan"] = plan_sources(state["problem_text"], state.get("emotion_tags", []))
-    return state
+    return {"plan": plan_sources(state["problem_text"], state.get("emotion_tags", []))}
 
-def rag_node(state: StoryState) -> StoryState:
+# rag and search run in parallel, so each node returns only the keys it owns
+# (LangGraph rejects two writes to the same key in one step).
+async def rag_node(state: StoryState) -> StoryState:
     sources = state["plan"]["sources"]
     if "rag" not in sources:
-        state["rag_hits"] = []
-        return state
-    hits = []
+        return {"rag_hits": []}
+    # wait_for only cancels this coroutine; the deadline also stops the pool work
+    deadline = time.monotonic() + NODE_BUDGETS["rag"]
     try:
-        hits = search_gita(state["problem_text"], k=3)
-    except Exception:
-        hits = []
-    state["rag_hits"] = hits
-    return state
+        works = works_for_hint(state["plan"].get("work"))
+        hits = await asearch(state["problem_text"], works, k=3, embedding=state.get("query_embedding"),
+                             deadline=deadline)
+    except Exception as e:
+        print(f"⚠️ rag node failed: {e}")
+        return {"rag_hits": [], "degraded": ["rag"]}  # so /story doesn't cache a story without scripture
+    return {"rag_hits": hits}
 
-def search_node(state: StoryState) -> StoryState:
+async def search_node(state: StoryState) -> StoryState:
     sources = state["plan"]["sources"]
     if "search" not in sources:
-        state["web_snippets"] = []
-        return state
+        return {"web_snippets": []}
     qs = plan_queries(state["problem_text"], state["plan"].get("work"))
-    state["web_snippets"] = web_search_stub(qs)
-    return state
+    return {"web_snippets": web_search_stub(qs)}
 
 async def llm_node(state: StoryState) -> StoryState:
     sources = state["plan"]["sources"]
     use_llm = "llm" in sources or not state.get("rag_hits")
     if not use_llm:
-        state["llm_story"] = ""
-        return state
+        return {"llm_story": ""}
     ctx = _format_context(state.get("rag_hits", []), state.get("web_snippets", []))
     user = STORY_USER_TEMPLATE.format(problem=state["problem_text"], context=ctx)
     out = await llm_generate(STORY_SYSTEM, user)
-    state["llm_story"] = out or ""
-    return state
+    return {"llm_story": out or ""}
 
 def compose_node(state: StoryState) -> StoryState:
     # Prefer RAG citation if exists
@@ -89,8 +89,7 @@ def compose_node(state: StoryState) -> StoryState:
 
     persona = state["plan"].get("persona","omniphilosopher")
     work = state["plan"].get("work", "Bhagavad Gita")
-    state["citations"] = cites
-    state["story_payload"] = {
+    story_payload = {
         "title": "Do Your Part. Let Worry Be Light.",
         "slides": [
             {"image_url": "/assets/kurukshetra_1.jpg", "caption": "Arjuna feels fear on the field."},
@@ -101,29 +100,74 @@ def compose_node(state: StoryState) -> StoryState:
         "citations": cites,
         # bg_music_url filled in API
     }
-    return state
+    return {"citations": cites, "story_payload": story_payload}
+
+# ---- Per-node budgets (seconds). A node that runs over is cut off and its
+# fallback update is used instead, so one slow branch can't stall the story.
+NODE_BUDGETS = {
+    "rag": float(os.getenv("STORY_RAG_TIMEOUT_S", "3")),
+    "search": float(os.getenv("STORY_SEARCH_TIMEOUT_S", "4")),
+    "llm": float(os.getenv("STORY_LLM_TIMEOUT_S", "45")),
+}
+NODE_FALLBACKS = {
+    "rag": {"rag_hits": []},
+    "search": {"web_snippets": []},
+    "llm": {"llm_story": ""},  # compose_node falls back to its template
+}
+
+def _instrument(name: str, fn):
+    """Wrap a node with wall-clock timing and (for async nodes) its timeout budget."""
+    budget = NODE_BUDGETS.get(name)
+
+    async def node(state: StoryState) -> StoryState:
+        t0 = time.perf_counter()
+        degraded = False
+        if inspect.iscoroutinefunction(fn):
+            try:
+                update = await asyncio.wait_for(fn(state), timeout=budget)
+            except asyncio.TimeoutError:
+                update, degraded = dict(NODE_FALLBACKS[name]), True
+        else:
+            update = fn(state)
+        update = dict(update or {})
+        update["node_ms"] = {name: round((time.perf_counter() - t0) * 1000, 1)}
+        if degraded:
+            update["degraded"] = [name]
+        return update
+    return node
 
 # ---- Build the graph
 def build_story_graph():
     g = StateGraph(StoryState)
-    g.add_node("router", router)
-    g.add_node("rag", rag_node)
-    g.add_node("search", search_node)
-    g.add_node("llm", llm_node)  # async
-    g.add_node("compose", compose_node)
+    g.add_node("router", _instrument("router", router))
+    g.add_node("rag", _instrument("rag", rag_node))
+    g.add_node("search", _instrument("search", search_node))
+    g.add_node("llm", _instrument("llm", llm_node))
+    g.add_node("compose", _instrument("compose", compose_node))
 
     g.add_edge(START, "router")
-    # simple linear for demo; later you can branch dynamically
+    # rag + search fan out together and join before the LLM
     g.add_edge("router", "rag")
-    g.add_edge("rag", "search")
-    g.add_edge("search", "llm")
+    g.add_edge("router", "search")
+    g.add_edge(["rag", "search"], "llm")
     g.add_edge("llm", "compose")
     g.add_edge("compose", END)
     return g.compile()
 
+_story_graph = None
+
+def get_story_graph():
+    """Compiled graph is immutable; build it once and share it across requests."""
+    global _story_graph
+    if _story_graph is None:
+        _story_graph = build_story_graph()
+    return _story_graph
+
 # convenience runner
-async def run_story_pipeline(problem_text: str, emotion_tags: List[str]) -> Dict:
-    graph = build_story_graph()
-    init: StoryState = {"problem_text": problem_text, "emotion_tags": emotion_tags}
+async def run_story_pipeline(problem_text: str, emotion_tags: List[str],
+                             query_embedding: List[float] | None = None) -> Dict:
+    graph = get_story_graph()
+    init: StoryState = {"problem_text": problem_text, "emotion_tags": emotion_tags,
+                        "query_embedding": query_embedding}
     final: StoryState = await graph.ainvoke(init)
     return final
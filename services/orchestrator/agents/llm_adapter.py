@@ -1,5 +1,7 @@
 import os, json
-import httpx
+from http_pool import post_json
+from llm.openroute import OPENROUTER_URL
+from cache.prompt import prompt_cache, prompt_key
 
 OPENROUTER_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini-translate")
@@ -18,7 +20,6 @@ async def llm_generate(system: str, user: str) -> str:
             "Takeaways:\n- " + "\n- ".join(takeaways)
         )
 
-    url = "https://openrouter.ai/api/v1/chat/completions"
     headers = {"Authorization": f"Bearer {OPENROUTER_KEY}", "Content-Type":"application/json"}
     body = {
         "model": OPENROUTER_MODEL,
@@ -28,8 +29,9 @@ async def llm_generate(system: str, user: str) -> str:
         ],
         "temperature": 0.7
     }
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(url, headers=headers, json=body)
-        r.raise_for_status()
-        data = r.json()
+
+    async def call() -> str:
+        data = await post_json(OPENROUTER_URL, headers=headers, json=body, timeout=60)
         return data["choices"][0]["message"]["content"]
+
+    return await prompt_cache.aget_or_compute(prompt_key("openrouter", OPENROUTER_MODEL, system, user), call)
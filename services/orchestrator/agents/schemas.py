@@ -1,11 +1,18 @@
-from typing import List, Dict, Optional, TypedDict
+from typing import List, Dict, Optional, TypedDict, Annotated
+import operator
+
+def _merge_dicts(a: Dict, b: Dict) -> Dict:
+    return {**(a or {}), **(b or {})}
 
 class StoryState(TypedDict, total=False):
     problem_text: str
     emotion_tags: List[str]
+    query_embedding: Optional[List[float]]  # reused by rag_node when the API already encoded the problem
     plan: Dict              # {"sources":["rag","llm","search"], "persona":"krishna", "work":"Bhagavad Gita"}
     rag_hits: List[Dict]    # [{doc:str, meta:{...}, score:float}]
     web_snippets: List[Dict]
     llm_story: str
     citations: List[Dict]
     story_payload: Dict
+    node_ms: Annotated[Dict[str, float], _merge_dicts]   # {"rag": 41.2, "llm": 812.0, ...}
+    degraded: Annotated[List[str], operator.add]         # nodes that hit their timeout budget
@@ -1,11 +1,11 @@
 from __future__ import annotations
 from typing import List, Dict
 import os, re, asyncio
-import aiohttp
+from http_pool import post_json
+from llm.openroute import OPENROUTER_URL
 
 # ---------- Config ----------
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 # You can change this to any search-capable model you have access to on OpenRouter.
 # Perplexity Sonar models are popular for retrieval-ish answers.
 OPENROUTER_SEARCH_MODEL = os.getenv("OPENROUTER_SEARCH_MODEL", "perplexity/sonar-small-chat")
@@ -56,10 +56,20 @@ def web_search_stub(queries: List[str]) -> List[Dict]:
     return []
 
 # ---------- API used by /story/stream ----------
-async def web_search_agent(query: str) -> List[str]:
+def fallback_insights(query: str) -> List[str]:
+    """Generic but useful lines for when the search call fails."""
+    return [
+        f"General insight about: {query}",
+        "Name the worry, then do one 5-minute task.",
+        "Breathe slowly (4-4-4-4) to settle the body.",
+    ]
+
+async def web_search_agent(query: str, soft_fail: bool = True) -> List[str]:
     """
     Use OpenRouter to get a small set of concise bullet insights for 'query'.
-    Returns a list of strings (bullets).
+    Returns a list of strings (bullets). If the call fails, returns
+    fallback_insights(query), or raises with soft_fail=False (for callers that
+    need to know, e.g. not to cache the result).
     """
     # Safety: if no key set, return a tiny static fallback so pipeline continues.
     if not OPENROUTER_API_KEY:
@@ -87,23 +97,17 @@ async def web_search_agent(query: str) -> List[str]:
     }
 
     try:
-        timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(OPENROUTER_URL, headers=headers, json=body) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                text = data["choices"][0]["message"]["content"]
-                bullets = _to_bullets(text, max_items=5)
-                # Guard: ensure we have something meaningful
-                return bullets or [
-                    f"Perspective on: {query}",
-                    "Act on one tiny, controllable step.",
-                    "Detach a little from the outcome to reduce pressure.",
-                ]
+        data = await post_json(OPENROUTER_URL, headers=headers, json=body, timeout=30)
+        text = data["choices"][0]["message"]["content"]
+        bullets = _to_bullets(text, max_items=5)
+        # Guard: ensure we have something meaningful
+        return bullets or [
+            f"Perspective on: {query}",
+            "Act on one tiny, controllable step.",
+            "Detach a little from the outcome to reduce pressure.",
+        ]
     except Exception:
+        if not soft_fail:
+            raise
         # Soft-fail: keep the pipeline alive with generic but useful lines
-        return [
-            f"General insight about: {query}",
-            "Name the worry, then do one 5-minute task.",
-            "Breathe slowly (4-4-4-4) to settle the body.",
-        ]
+        return fallback_insights(query)
@@ -0,0 +1,56 @@
+"""chat_turns: append-only chat messages
+
+Revision ID: 3b9d2c7e41a0
+Revises: f6e200a927a8
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d2c7e41a0'
+down_revision: Union[str, None] = 'f6e200a927a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_turns',
+    sa.Column('chat_id', sa.UUID(as_uuid=False), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['chat_id'], ['chats.id'], ),
+    sa.PrimaryKeyConstraint('chat_id', 'seq')
+    )
+    op.add_column('chats', sa.Column('turn_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.alter_column('chats', 'turns', existing_type=sa.JSON(), nullable=True)
+
+    # backfill: one row per element of each blob, seq = position in the array
+    op.execute("""
+        INSERT INTO chat_turns (chat_id, seq, role, text, created_at)
+        SELECT c.id, t.seq, COALESCE(t.turn->>'role', ''), COALESCE(t.turn->>'text', ''), c.created_at
+        FROM chats c
+        CROSS JOIN LATERAL json_array_elements(COALESCE(c.turns, '[]'::json)) WITH ORDINALITY AS t(turn, seq)
+    """)
+    op.execute("""
+        UPDATE chats SET turn_count = json_array_length(turns), turns = NULL
+        WHERE turns IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE chats c SET turns = COALESCE((
+            SELECT json_agg(json_build_object('role', t.role, 'text', t.text) ORDER BY t.seq)
+            FROM chat_turns t WHERE t.chat_id = c.id
+        ), '[]'::json)
+    """)
+    op.alter_column('chats', 'turns', existing_type=sa.JSON(), nullable=False)
+    op.drop_column('chats', 'turn_count')
+    op.drop_table('chat_turns')
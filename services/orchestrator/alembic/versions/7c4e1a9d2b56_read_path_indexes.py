@@ -0,0 +1,36 @@
+"""indexes for the guide_chat / story read paths
+
+Revision ID: 7c4e1a9d2b56
+Revises: 3b9d2c7e41a0
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e1a9d2b56'
+down_revision: Union[str, None] = '3b9d2c7e41a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY: don't block story/chat writes while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index('ix_stories_session_id_created_at', 'stories', ['session_id', 'created_at'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_chats_session_id_persona', 'chats', ['session_id', 'persona'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_sessions_user_id', 'sessions', ['user_id'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_sessions_user_id', table_name='sessions', postgresql_concurrently=True)
+        op.drop_index('ix_chats_session_id_persona', table_name='chats', postgresql_concurrently=True)
+        op.drop_index('ix_stories_session_id_created_at', table_name='stories', postgresql_concurrently=True)
@@ -0,0 +1,51 @@
+"""totals: weekly points, updated_at and change_xid for the leaderboard feed
+
+Revision ID: 9e1f4b7a3c08
+Revises: 7c4e1a9d2b56
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1f4b7a3c08'
+down_revision: Union[str, None] = '7c4e1a9d2b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    op.add_column('totals', sa.Column('week_start', sa.Date(), nullable=True))
+    op.add_column('totals', sa.Column('week_points', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('totals', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    # id of the transaction that last changed the row (xid8 as bigint), the
+    # leaderboard feed's watermark. Nullable with no default, so adding it
+    # doesn't rewrite totals; the app sets it on every write.
+    op.add_column('totals', sa.Column('change_xid', sa.BigInteger(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_totals_change_xid', 'totals', ['change_xid'],
+                        unique=False, postgresql_concurrently=True)
+        # existing rows: 0 = "before the feed"; a worker's first pass reads
+        # every row anyway. Committed per batch, so locks stay short.
+        conn = op.get_bind()
+        while conn.execute(sa.text(
+            "UPDATE totals SET change_xid = 0 WHERE user_id IN "
+            "(SELECT user_id FROM totals WHERE change_xid IS NULL LIMIT :n)"
+        ), {"n": BACKFILL_BATCH}).rowcount:
+            pass
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_totals_change_xid', table_name='totals', postgresql_concurrently=True)
+    op.drop_column('totals', 'change_xid')
+    op.drop_column('totals', 'updated_at')
+    op.drop_column('totals', 'week_points')
+    op.drop_column('totals', 'week_start')
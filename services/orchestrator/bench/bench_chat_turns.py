@@ -0,0 +1,126 @@
+"""
+Chat turn persistence: rewriting the Chat.turns JSON blob (old) vs INSERT-only
+appends to chat_turns, as the conversation grows.
+
+For each --turns size, a chat is pre-filled with that many turns, then
+--appends user+guide pairs are written one transaction each:
+
+  blob    SELECT chat, append two dicts, UPDATE the whole array (old guide_chat)
+  append  crud.append_turns (counter bump + 2-row INSERT) + recent_turns window
+
+Then --writers threads append to one chat at the same time, to show the blob
+losing turns under concurrency and chat_turns keeping every one.
+
+Needs the real Postgres schema (alembic upgrade head):
+
+  DATABASE_URL=postgresql+psycopg://... python -m bench.bench_chat_turns --turns 10 100 1000
+"""
+import time, argparse, threading
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+from sqlalchemy import delete, insert
+from db import SessionLocal, engine
+from models_db import User, Session as DBSession, Chat, ChatTurn
+from crud import append_turns, recent_turns
+
+PAIR = [
+    {"role": "user", "text": "I keep overthinking my exam results, what do I do?"},
+    {"role": "guide", "text": "Act from a quiet mind. Let results be light. What small action can you take now?"},
+]
+
+def make_chat(db, user_id: str, session_id: str, turns: int, blob: bool) -> str:
+    pairs = [dict(PAIR[i % 2]) for i in range(turns)]
+    chat = Chat(user_id=user_id, session_id=session_id, persona="bench",
+                turns=pairs if blob else None, turn_count=0 if blob else turns)
+    db.add(chat)
+    db.flush()
+    if not blob and turns:
+        db.execute(insert(ChatTurn), [{"chat_id": chat.id, "seq": i + 1, "role": t["role"], "body": t["text"]}
+                                     for i, t in enumerate(pairs)])
+    db.commit()
+    return chat.id
+
+def blob_append(chat_id: str):
+    with SessionLocal() as db:
+        chat = db.get(Chat, chat_id)
+        turns = list(chat.turns or [])
+        turns.extend(dict(t) for t in PAIR)
+        chat.turns = turns
+        db.commit()
+
+def row_append(chat_id: str, window: int = 6):
+    with SessionLocal() as db:
+        append_turns(db, chat_id, PAIR)
+        recent_turns(db, chat_id, window)
+        db.commit()
+
+def timed(fn, chat_id: str, n: int) -> list[float]:
+    lat = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(chat_id)
+        lat.append(time.perf_counter() - t0)
+    return lat
+
+def race(fn, chat_id: str, writers: int, per_writer: int):
+    threads = [threading.Thread(target=lambda: [fn(chat_id) for _ in range(per_writer)]) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--appends", type=int, default=200)
+    ap.add_argument("--writers", type=int, default=8)
+    args = ap.parse_args()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("bench_chat_turns needs DATABASE_URL pointing at Postgres (alembic upgrade head)")
+
+    with SessionLocal() as db:
+        user = User(locale="bench")
+        db.add(user)
+        db.flush()
+        sess = DBSession(user_id=user.id, problem_text="bench")
+        db.add(sess)
+        db.commit()
+        user_id, session_id = user.id, sess.id
+
+    chats = []
+    try:
+        for size in args.turns:
+            print(f"--- chat with {size} turns, {args.appends} appends of 2 turns")
+            for label, blob, fn in (("blob rewrite", True, blob_append), ("insert-only", False, row_append)):
+                with SessionLocal() as db:
+                    chat_id = make_chat(db, user_id, session_id, size, blob)
+                chats.append(chat_id)
+                print(summarize_ms(label, timed(fn, chat_id, args.appends)))
+
+        per_writer = 25
+        expected = args.writers * per_writer * len(PAIR)
+        print(f"--- {args.writers} writers x {per_writer} appends on one chat (expect {expected} turns)")
+        with SessionLocal() as db:
+            blob_id = make_chat(db, user_id, session_id, 0, blob=True)
+            row_id = make_chat(db, user_id, session_id, 0, blob=False)
+        chats += [blob_id, row_id]
+        race(blob_append, blob_id, args.writers, per_writer)
+        race(row_append, row_id, args.writers, per_writer)
+        with SessionLocal() as db:
+            blob_n = len(db.get(Chat, blob_id).turns)
+            row_n = db.query(ChatTurn).filter(ChatTurn.chat_id == row_id).count()
+            row_count = db.get(Chat, row_id).turn_count
+        print(f"blob rewrite   kept {blob_n}/{expected} turns")
+        print(f"insert-only    kept {row_n}/{expected} turns (turn_count={row_count})")
+    finally:
+        with SessionLocal() as db:
+            db.execute(delete(ChatTurn).where(ChatTurn.chat_id.in_(chats)))
+            db.execute(delete(Chat).where(Chat.id.in_(chats)))
+            db.execute(delete(DBSession).where(DBSession.id == session_id))
+            db.execute(delete(User).where(User.id == user_id))
+            db.commit()
+
+if __name__ == "__main__":
+    main_cli()
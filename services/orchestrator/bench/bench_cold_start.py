@@ -0,0 +1,51 @@
+"""
+Cold-start timing report for the orchestrator process.
+
+Measures, in a fresh interpreter:
+  import_main_ms   : importing main (FastAPI app, torch, chromadb, ...)
+  warm_up()        : model load, first/second encode, collection handles
+  first_search_ms  : first search_gita after warm-up
+  warm_search_ms   : median of the next --repeat searches
+
+Compare with the lazy path by passing --no-warmup: the first search then
+pays for model load + first forward pass, which is what the first /story
+after a deploy used to see.
+
+  python -m bench.bench_cold_start
+  python -m bench.bench_cold_start --no-warmup
+"""
+import argparse, json, statistics, time
+
+import bench.common  # noqa: F401  (env defaults)
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--no-warmup", action="store_true")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    report = {}
+    t = time.perf_counter()
+    import main  # noqa: F401
+    report["import_main_ms"] = round((time.perf_counter() - t) * 1000, 1)
+
+    from rag.embedder import warm_up
+    from rag.retrieve import search_gita
+
+    if not args.no_warmup:
+        report["warm_up"] = warm_up()
+
+    t = time.perf_counter()
+    search_gita("I'm anxious about exams", k=3)
+    report["first_search_ms"] = round((time.perf_counter() - t) * 1000, 1)
+
+    lat = []
+    for i in range(args.repeat):
+        t = time.perf_counter()
+        search_gita(f"I'm anxious about exams {i}", k=3)
+        lat.append((time.perf_counter() - t) * 1000)
+    report["warm_search_ms"] = round(statistics.median(lat), 1)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,116 @@
+"""
+DB round trips from async handlers: sync engine on the DB thread pool vs the
+asyncpg engine (executors.run_db_sync vs run_db_async), under load.
+
+Each of --clients concurrent clients loops for --seconds, doing what /story
+does to the DB: create_user_session, then save_story, each in its own
+transaction. A sampler records the pool's checked-out connections every 10ms.
+Reported per mode and client count:
+- request throughput (two transactions per request)
+- per-transaction latency
+- peak and mean connections in use
+- server-side backends from pg_stat_activity
+
+Needs the real Postgres schema (alembic upgrade head) and asyncpg:
+
+  DATABASE_URL=postgresql+psycopg://... python -m bench.bench_db_pool --clients 50 200 500
+  DB_POOL_SIZE=20 DB_MAX_OVERFLOW=0 python -m bench.bench_db_pool --modes async
+"""
+import time, uuid, asyncio, argparse
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import TimeoutError as SATimeoutError
+import db as dbmod
+from db import SessionLocal, engine, get_async_engine, dispose_async_engine
+from models_db import User, Session as DBSession, Story as DBStory, Totals
+from crud import create_user_session, save_story
+from executors import run_db_sync, run_db_async, DB_WORKERS
+
+PAYLOAD = {"title": "bench", "narration_text": "A calm bench story.",
+           "citations": [{"work": "Bhagavad Gita", "ref": "2.47"}]}
+
+def backends() -> int:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(
+            "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()"
+        ).scalar()
+
+async def run(mode: str, clients: int, seconds: float, user_ids: list[str]) -> dict:
+    call = run_db_async if mode == "async" else run_db_sync
+    pool = get_async_engine().sync_engine.pool if mode == "async" else engine.pool
+    lat: list[float] = []
+    requests = errors = 0
+    in_use: list[int] = []
+    peak_backends = 0
+    stop = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal requests, errors
+        uid = str(uuid.uuid4())
+        user_ids.append(uid)
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            try:
+                sid = await call(create_user_session, uid, "bench", ["calm"])
+                t1 = time.perf_counter()
+                await call(save_story, uid, sid, PAYLOAD)
+            except SATimeoutError:
+                errors += 1  # waited DB_POOL_TIMEOUT_S for a connection
+                continue
+            lat.extend([t1 - t0, time.perf_counter() - t1])
+            requests += 1
+
+    async def sampler():
+        nonlocal peak_backends
+        while time.perf_counter() < stop:
+            in_use.append(pool.checkedout())
+            await asyncio.sleep(0.01)
+        peak_backends = await asyncio.to_thread(backends)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(sampler(), *(client() for _ in range(clients)))
+    wall = time.perf_counter() - t0
+    return {"lat": lat, "rps": requests / wall, "peak": max(in_use, default=0),
+            "mean": sum(in_use) / max(1, len(in_use)), "backends": peak_backends, "errors": errors}
+
+def cleanup(user_ids: list[str]):
+    with SessionLocal() as db:
+        sids = select(DBSession.id).where(DBSession.user_id.in_(user_ids))
+        db.execute(delete(DBStory).where(DBStory.session_id.in_(sids)))
+        db.execute(delete(DBSession).where(DBSession.user_id.in_(user_ids)))
+        db.execute(delete(Totals).where(Totals.user_id.in_(user_ids)))
+        db.execute(delete(User).where(User.id.in_(user_ids)))
+        db.commit()
+
+async def main_async(args):
+    print(f"pool_size={dbmod.DB_POOL_SIZE} max_overflow={dbmod.DB_MAX_OVERFLOW} "
+          f"db_workers={DB_WORKERS} statement_cache={dbmod.DB_STATEMENT_CACHE_SIZE}")
+    user_ids: list[str] = []
+    try:
+        for clients in args.clients:
+            print(f"--- {clients} concurrent clients, {args.seconds:.0f}s")
+            for mode in args.modes:
+                await run(mode, min(clients, 10), 1.0, user_ids)  # warm the pool
+                r = await run(mode, clients, args.seconds, user_ids)
+                print(summarize_ms(f"{mode} per transaction", r["lat"]))
+                print(f"{mode:<5} {r['rps']:8.1f} req/s   conns in use peak={r['peak']} "
+                      f"mean={r['mean']:.1f}   pg backends={r['backends']}   pool timeouts={r['errors']}")
+    finally:
+        await dispose_async_engine()
+        cleanup(user_ids)
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, nargs="+", default=[50, 200, 500])
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    args = ap.parse_args()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("bench_db_pool needs DATABASE_URL pointing at Postgres (alembic upgrade head)")
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main_cli()
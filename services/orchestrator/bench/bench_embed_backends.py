@@ -0,0 +1,92 @@
+"""
+Embedding backends (EMBEDDING_BACKEND) head to head: torch vs onnx vs onnx-int8.
+
+Each backend runs in its own subprocess so load time and RSS aren't polluted
+by the others. Reported per backend:
+
+  load_s      : model construction (import + weights + session)
+  rss_mb      : resident set size after load and the throughput run
+  texts_per_s : encode throughput over --texts texts at --batch-size
+  cos_mean/min: cosine between each text's vector and the torch vector
+                (both are L2-normalized, so this is a dot product)
+
+  python -m bench.bench_embed_backends --texts 2000 --batch-size 32
+  EMBEDDING_MODEL=/models/all-MiniLM-L6-v2 python -m bench.bench_embed_backends --backends torch onnx-int8
+"""
+import os, sys, json, time, argparse, subprocess, tempfile
+
+import numpy as np
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+def corpus_texts(n: int) -> list[str]:
+    base = []
+    for name in ("gita_eval_corpus.jsonl", "gita_eval_queries.jsonl"):
+        with open(os.path.join(DATA, name), encoding="utf-8") as f:
+            for line in f:
+                rec = json.loads(line)
+                base.append(rec.get("text") or rec["query"])
+    return [f"{base[i % len(base)]} ({i})" for i in range(n)]
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+def worker(backend: str, n: int, batch_size: int, out_path: str):
+    from rag.embedder import load_model
+    t0 = time.perf_counter()
+    model = load_model(backend)
+    load_s = time.perf_counter() - t0
+    texts = corpus_texts(n)
+    model.encode(texts[:batch_size], normalize_embeddings=True)  # first pass is slow
+    t0 = time.perf_counter()
+    vecs = np.concatenate([
+        np.asarray(model.encode(texts[i:i + batch_size], normalize_embeddings=True), dtype=np.float32)
+        for i in range(0, n, batch_size)
+    ])
+    secs = time.perf_counter() - t0
+    np.save(out_path, vecs)
+    print(json.dumps({"load_s": round(load_s, 2), "rss_mb": round(rss_mb(), 1),
+                      "texts_per_s": round(n / secs, 1), "dim": int(vecs.shape[1])}))
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    ap.add_argument("--texts", type=int, default=2000)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    ap.add_argument("--out", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.worker:
+        return worker(args.worker, args.texts, args.batch_size, args.out)
+
+    tmp = tempfile.mkdtemp(prefix="embed_backends_")
+    results, vecs = {}, {}
+    for backend in args.backends:
+        out = os.path.join(tmp, f"{backend}.npy")
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.bench_embed_backends", "--worker", backend,
+             "--texts", str(args.texts), "--batch-size", str(args.batch_size), "--out", out],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{backend:<10} FAILED: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            continue
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+        vecs[backend] = np.load(out)
+
+    ref = vecs.get("torch")
+    print(f"model={os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')} texts={args.texts} batch={args.batch_size}")
+    for backend, r in results.items():
+        line = (f"{backend:<10} load={r['load_s']:6.2f}s rss={r['rss_mb']:7.1f}MB "
+                f"{r['texts_per_s']:8.1f} texts/s dim={r['dim']}")
+        if ref is not None and backend != "torch":
+            cos = (vecs[backend] * ref).sum(axis=1)
+            line += f"  cos_mean={cos.mean():.4f} cos_min={cos.min():.4f}"
+        print(line)
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,69 @@
+"""
+Embedding throughput (texts/sec) vs concurrency, direct vs micro-batched.
+
+Each of C client threads loops calling the embedder with ONE text, the way
+search_gita and upsert_summary do, for --seconds. "direct" calls
+encode_batch (batch size 1 forward passes); "batched" goes through
+embed_texts and the EmbeddingBatcher.
+
+Run on the CPU box you deploy to; numbers depend heavily on core count.
+
+  python -m bench.bench_embed_batching --concurrency 1 4 16 64
+  EMBED_BATCH_WAIT_MS=5 EMBED_BATCH_MAX=64 python -m bench.bench_embed_batching
+"""
+import argparse, threading, time
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import percentile
+from rag import embedder
+
+TEXTS = [
+    "I'm anxious about my exams and can't sleep.",
+    "I keep overthinking what my manager said.",
+    "I feel stuck choosing between two jobs.",
+    "My mind won't stop racing at night.",
+]
+
+def run_clients(fn, concurrency: int, seconds: float):
+    done, lat = [0] * concurrency, [[] for _ in range(concurrency)]
+    stop = time.monotonic() + seconds
+
+    def client(i):
+        j = 0
+        while time.monotonic() < stop:
+            t = time.perf_counter()
+            fn([f"{TEXTS[j % len(TEXTS)]} ({i}:{j})"])
+            lat[i].append(time.perf_counter() - t)
+            done[i] += 1
+            j += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    flat = [x for xs in lat for x in xs]
+    return sum(done) / wall, percentile(flat, 50) * 1000, percentile(flat, 99) * 1000
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    ap.add_argument("--seconds", type=float, default=5)
+    args = ap.parse_args()
+
+    if embedder.batcher is None:
+        raise SystemExit("EMBED_BATCH_ENABLED=false; nothing to compare")
+    embedder.encode_batch(["warm up"])  # model load outside the timed region
+
+    print(f"max_batch={embedder.EMBED_BATCH_MAX} max_wait_ms={embedder.EMBED_BATCH_WAIT_MS}")
+    print(f"{'conc':>5} {'mode':>8} {'texts/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for c in args.concurrency:
+        for mode, fn in (("direct", embedder.encode_batch), ("batched", embedder.embed_texts)):
+            tps, p50, p99 = run_clients(fn, c, args.seconds)
+            print(f"{c:>5} {mode:>8} {tps:>10.1f} {p50:>8.2f} {p99:>8.2f}")
+    print("batcher:", embedder.batcher.snapshot())
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,69 @@
+"""
+Hybrid retrieval: recall@k and latency for vector, BM25 and RRF-fused search.
+
+Ingests bench/data/gita_eval_corpus.jsonl into its own collection (building
+the lexical index on the way), optionally padded with --filler synthetic
+distractor docs, then runs every query in gita_eval_queries.jsonl through
+each mode. The retrieval cache is disabled so latencies are real.
+
+Needs the real embedding model for the vector numbers to mean anything.
+
+  python -m bench.bench_hybrid --k 3
+  python -m bench.bench_hybrid --k 5 --filler 20000 --repeat 5
+"""
+import os, json, time, random, argparse
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+os.environ["RETRIEVAL_CACHE_SIZE"] = "0"
+
+from rag import retrieve, lexical
+from rag.ingest import read_jsonl, ingest_records
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+COLLECTION = "eval_gita"
+
+def filler_docs(n: int, vocab: list[str], seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {"id": f"filler-{i}", "work": "Filler", "text": " ".join(rng.choices(vocab, k=rng.randint(12, 30)))}
+
+def recall_at_k(ranked: list[str], relevant: list[str], k: int) -> float:
+    return len(set(ranked[:k]) & set(relevant)) / len(relevant)
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--k", type=int, default=3)
+    ap.add_argument("--filler", type=int, default=0, help="synthetic distractor docs to add")
+    ap.add_argument("--repeat", type=int, default=3, help="passes over the query set for latency")
+    args = ap.parse_args()
+
+    corpus = list(read_jsonl(os.path.join(DATA, "gita_eval_corpus.jsonl")))
+    queries = list(read_jsonl(os.path.join(DATA, "gita_eval_queries.jsonl")))
+    vocab = sorted({t for d in corpus for t in lexical.tokenize(d["text"])})
+    ingest_records(corpus, COLLECTION, lexical=not args.filler, log=lambda *_: None)
+    if args.filler:
+        print(ingest_records(filler_docs(args.filler, vocab), COLLECTION, log=lambda *_: None))
+
+    index = lexical.get_index(COLLECTION)
+    embs = {q["query"]: retrieve.embed_query(q["query"]) for q in queries}
+    modes = {
+        "vector": lambda q: [h["id"] for h in retrieve.query_collection(COLLECTION, embs[q], args.k)],
+        "bm25": lambda q: [cid for cid, _ in index.search(q, args.k)],
+        "hybrid": lambda q: [h["id"] for h in retrieve.query_collection(COLLECTION, embs[q], args.k, query=q)],
+    }
+
+    print(f"corpus={index.n_docs} docs, queries={len(queries)}, k={args.k}")
+    for name, fn in modes.items():
+        recall = sum(recall_at_k(fn(q["query"]), q["relevant"], args.k) for q in queries) / len(queries)
+        lat = []
+        for _ in range(args.repeat):
+            for q in queries:
+                t0 = time.perf_counter()
+                fn(q["query"])
+                lat.append(time.perf_counter() - t0)
+        print(f"{name:<7} recall@{args.k}={recall:.3f}  " + summarize_ms("", lat).strip())
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,154 @@
+"""
+Karma awards and /progress reads against a real Postgres schema.
+
+  streak   sets last_active to today / yesterday / 3 days ago, awards once,
+           and checks the streak stays / grows / resets
+  awards   --threads threads each make --awards awards, one transaction each,
+           all on ONE user (the hot-row worst case): the old ORM
+           read-modify-write (get, +=, commit) vs karma.award. Reports
+           awards/s, latency and lost updates (expected - actual points)
+  reads    /progress lookups with --rows synthetic users in totals, for each
+           size: karma.load_progress (cache miss, one PK read) vs
+           cached_progress (hit). The latency should stay flat as rows grow
+
+  DATABASE_URL=postgresql+psycopg://... python -m bench.bench_karma --threads 32 --awards 200
+  python -m bench.bench_karma --rows 1000 100000 1000000 --skip-awards
+"""
+import time, uuid, argparse, threading
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+from sqlalchemy import delete, insert, update, text
+from db import SessionLocal, engine
+from models_db import User, Session as DBSession, Totals
+from crud import create_user_session
+import karma
+from karma import award, load_progress, cached_progress
+
+def new_user() -> str:
+    uid = str(uuid.uuid4())
+    with SessionLocal() as db:
+        create_user_session(db, uid, "bench", ["calm"])
+        db.commit()
+    return uid
+
+def points(uid: str) -> int:
+    with SessionLocal() as db:
+        return db.get(Totals, uid).karmic_points
+
+def rmw_award(uid: str, n: int):
+    with SessionLocal() as db:
+        totals = db.get(Totals, uid)
+        totals.karmic_points = (totals.karmic_points or 0) + n
+        db.commit()
+
+def atomic_award(uid: str, n: int):
+    with SessionLocal() as db:
+        award(db, uid, n)
+        db.commit()
+
+def hammer(fn, uid: str, threads: int, awards: int) -> tuple[list[float], float]:
+    lat, lock = [], threading.Lock()
+    def worker():
+        mine = []
+        for _ in range(awards):
+            t0 = time.perf_counter()
+            fn(uid, 1)
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            lat.extend(mine)
+    ts = [threading.Thread(target=worker) for _ in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return lat, time.perf_counter() - t0
+
+def check_streaks(uid: str):
+    cases = [("0 days", None), ("1 day", "+1"), ("3 days", "reset")]
+    for ago, expect in cases:
+        with SessionLocal() as db:
+            db.execute(update(Totals).where(Totals.user_id == uid).values(
+                streak_days=4, last_active=text(f"now() - interval '{ago}'")))
+            db.commit()
+            got = award(db, uid, 0)["streak_days"]
+            db.commit()
+        want = {None: 4, "+1": 5, "reset": 1}[expect]
+        print(f"{'ok  ' if got == want else 'FAIL'}  last active {ago} ago: streak 4 -> {got} (want {want})")
+        if got != want:
+            raise SystemExit(1)
+
+def seed_rows(n: int, have: int, ids: list[str]):
+    for start in range(have, n, 10000):
+        chunk = [str(uuid.uuid4()) for _ in range(min(10000, n - start))]
+        with SessionLocal() as db:
+            db.execute(insert(User), [{"id": u, "locale": "bench"} for u in chunk])
+            db.execute(insert(Totals), [{"user_id": u, "karmic_points": i % 300, "streak_days": i % 9}
+                                        for i, u in enumerate(chunk)])
+            db.commit()
+        ids.extend(chunk)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE totals")
+
+def bench_reads(ids: list[str], lookups: int):
+    miss, hit = [], []
+    for i in range(lookups):
+        uid = ids[(i * 7919) % len(ids)]
+        karma._progress.pop(uid)
+        t0 = time.perf_counter()
+        with SessionLocal() as db:
+            load_progress(db, uid)
+        miss.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        cached_progress(uid)
+        hit.append(time.perf_counter() - t0)
+    print(summarize_ms("  load_progress (miss)", miss))
+    print(summarize_ms("  cached_progress (hit)", hit))
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--threads", type=int, default=32)
+    ap.add_argument("--awards", type=int, default=200, help="awards per thread")
+    ap.add_argument("--rows", type=int, nargs="+", default=[1000, 100000])
+    ap.add_argument("--lookups", type=int, default=2000)
+    ap.add_argument("--skip-awards", action="store_true")
+    args = ap.parse_args()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("bench_karma needs DATABASE_URL pointing at Postgres (alembic upgrade head)")
+
+    users = [new_user() for _ in range(3)]
+    synthetic: list[str] = []
+    try:
+        print("--- streak")
+        check_streaks(users[0])
+
+        if not args.skip_awards:
+            expected = args.threads * args.awards
+            print(f"--- {args.threads} threads x {args.awards} awards of 1 point on one user")
+            for label, fn, uid in (("read-modify-write", rmw_award, users[1]), ("karma.award", atomic_award, users[2])):
+                before = points(uid)
+                lat, wall = hammer(fn, uid, args.threads, args.awards)
+                gained = points(uid) - before
+                print(summarize_ms(label, lat) + f"  {expected / wall:8.0f} awards/s")
+                print(f"{'':<28} +{gained}/{expected} points, lost updates: {expected - gained}")
+
+        print(f"--- /progress reads, {args.lookups} lookups per size")
+        for n in sorted(args.rows):
+            seed_rows(n, len(synthetic), synthetic)
+            print(f"{n} rows in totals")
+            bench_reads(synthetic, args.lookups)
+    finally:
+        with SessionLocal() as db:
+            for i in range(0, len(synthetic), 10000):
+                chunk = synthetic[i:i + 10000]
+                db.execute(delete(Totals).where(Totals.user_id.in_(chunk)))
+                db.execute(delete(User).where(User.id.in_(chunk)))
+            db.execute(delete(DBSession).where(DBSession.user_id.in_(users)))
+            db.execute(delete(Totals).where(Totals.user_id.in_(users)))
+            db.execute(delete(User).where(User.id.in_(users)))
+            db.commit()
+
+if __name__ == "__main__":
+    main_cli()
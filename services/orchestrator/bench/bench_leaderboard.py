@@ -0,0 +1,106 @@
+"""
+Leaderboard rank index (rank_index.RankIndex) with --users synthetic users.
+Pure in-process; no DB or model needed.
+
+  build    set() every user once (what Leaderboard.load does after the query)
+  awards   --awards random point increments on random users (the award feed)
+  rank     rank-of-user lookups
+  top      20-row pages at offsets 0, 1k, n/2 and the last page
+  levels   users per level (4 range counts)
+  scan     for contrast: rank-of-user by scanning every score, as a
+           per-request query over totals would, on --scan-samples users
+
+Every read is checked against a sorted copy of the scores at the end
+(--verify N users), including ties.
+
+  python -m bench.bench_leaderboard --users 1000000
+"""
+import time, random, argparse
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import percentile
+
+from rank_index import RankIndex
+
+# karma.LEVELS floors (imported there with the DB stack; kept in step here)
+LEVEL_FLOORS = [("Sage", 200), ("Practitioner", 120), ("Seeker", 60), ("Starter", 0)]
+
+def summarize_us(label: str, values: list[float]) -> str:
+    us = [v * 1e6 for v in values]
+    return (f"{label:<28} n={len(us):<6} p50={percentile(us, 50):9.1f}us "
+            f"p99={percentile(us, 99):9.1f}us max={max(us):9.1f}us")
+
+def timed(fn, args_list) -> list[float]:
+    lat = []
+    for a in args_list:
+        t0 = time.perf_counter()
+        fn(*a)
+        lat.append(time.perf_counter() - t0)
+    return lat
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, default=1_000_000)
+    ap.add_argument("--awards", type=int, default=200_000)
+    ap.add_argument("--lookups", type=int, default=20_000)
+    ap.add_argument("--scan-samples", type=int, default=20)
+    ap.add_argument("--verify", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    rng = random.Random(args.seed)
+    n = args.users
+    ids = [f"u{i:07d}" for i in range(n)]
+    # long tail: most seekers have a few points, a few have thousands
+    scores = {u: min(int(rng.paretovariate(1.3) * 10) - 10, 20000) for u in ids}
+
+    idx = RankIndex()
+    t0 = time.perf_counter()
+    for u, s in scores.items():
+        idx.set(u, s)
+    build = time.perf_counter() - t0
+    print(f"build   {n} users in {build:.2f}s ({n / build:,.0f} sets/s), max score {max(scores.values())}")
+
+    picks = [(ids[rng.randrange(n)], rng.choice((1, 1, 1, 5, 10))) for _ in range(args.awards)]
+    t0 = time.perf_counter()
+    for u, pts in picks:
+        scores[u] += pts
+        idx.set(u, scores[u])
+    wall = time.perf_counter() - t0
+    print(f"awards  {args.awards} updates in {wall:.2f}s ({args.awards / wall:,.0f}/s)")
+
+    sample = [(ids[rng.randrange(n)],) for _ in range(args.lookups)]
+    print(summarize_us("rank(user)", timed(idx.rank, sample)))
+    for off in (0, 1000, n // 2, max(0, n - 20)):
+        print(summarize_us(f"page(offset={off}, 20)", timed(idx.page, [(off, 20)] * 2000)))
+
+    def levels():
+        out, hi = {}, None
+        for name, floor in LEVEL_FLOORS:
+            out[name] = idx.count_between(floor, hi)
+            hi = floor
+        return out
+    print(summarize_us("levels()", timed(levels, [()] * 2000)) + f"  {levels()}")
+
+    values = list(scores.values())
+    def scan_rank(u):
+        s = scores[u]
+        return 1 + sum(1 for v in values if v > s)
+    print(summarize_us("full-scan rank (contrast)", timed(scan_rank, sample[:args.scan_samples])))
+
+    # correctness against a sorted copy
+    order = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+    first_rank = {}
+    for pos, (u, s) in enumerate(order):
+        first_rank.setdefault(s, pos + 1)
+    for u, _ in rng.sample(order, min(args.verify, n)):
+        assert idx.rank(u) == (first_rank[scores[u]], scores[u]), u
+    for off in (0, 1000, n // 2, max(0, n - 20)):
+        want = [(first_rank[s], u, s) for u, s in order[off:off + 20]]
+        assert idx.page(off, 20) == want, off
+    counts = levels()
+    assert counts["Sage"] == sum(1 for v in values if v >= 200)
+    assert sum(counts.values()) == n
+    print(f"verify  ok ({min(args.verify, n)} ranks, 4 pages, level counts)")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,83 @@
+"""
+Per-user memory recall latency as the user_memory collection grows.
+
+Grows the collection in steps (--users, each with --notes random notes),
+and after each step times recall() for randomly chosen users:
+
+  cold : hot cache cleared, so each call looks the user's note ids up in
+         user_memory.note_index, reads them from Chroma by id and scores
+         them in-process. On a collection seeded before the note index
+         existed, a user's first cold read is instead the where={"user_id": ...}
+         read that fills the index in for them; run twice to see both.
+  hot  : the same users again, served from the per-user cache
+
+Point CHROMA_DIR at a scratch directory: this writes to `user_memory`.
+The full-size run (100k users x 50 notes = 5M vectors) needs ~10 GB of
+disk and a while to seed; the defaults are a smaller ladder.
+
+  CHROMA_DIR=/tmp/recall_bench python -m bench.bench_memory_recall --users 1000 10000 100000 --notes 50
+"""
+import time, random, argparse
+
+import numpy as np
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+from memory import user_memory
+
+DIM = 384
+
+def grow(start: int, stop: int, notes: int, rng):
+    col = user_memory._col()
+    if col.get(ids=[f"bench-u{stop - 1}:s{notes - 1}"], include=[])["ids"]:
+        return  # already seeded by an earlier run
+    ids, embs, docs, metas = [], [], [], []
+    def flush():
+        if ids:
+            user_memory.note_index.add(zip((m["user_id"] for m in metas), ids, (m["ts"] for m in metas)))
+            col.upsert(ids=ids, embeddings=embs, documents=docs, metadatas=metas)
+            ids.clear(); embs.clear(); docs.clear(); metas.clear()
+    for u in range(start, stop):
+        v = rng.standard_normal((notes, DIM)).astype(np.float32)
+        v /= np.linalg.norm(v, axis=1, keepdims=True)
+        for j in range(notes):
+            ids.append(f"bench-u{u}:s{j}")
+            embs.append(v[j].tolist())
+            docs.append(f"User concern (short): bench note {j} of user {u}.")
+            metas.append({"user_id": f"bench-u{u}", "session_id": f"s{j}", "type": "summary",
+                          "ts": f"2026-01-01T00:00:{j:05d}"})
+        if len(ids) >= 5000:
+            flush()
+    flush()
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int, nargs="+", default=[1000, 5000, 20000])
+    ap.add_argument("--notes", type=int, default=50)
+    ap.add_argument("--samples", type=int, default=200)
+    ap.add_argument("--k", type=int, default=5)
+    args = ap.parse_args()
+    rng = np.random.default_rng(0)
+    have = 0
+    for users in sorted(args.users):
+        t0 = time.perf_counter()
+        grow(have, users, args.notes, rng)
+        have = users
+        total = user_memory._col().count()
+        print(f"--- {users} users x {args.notes} notes ({total} vectors, seeded in {time.perf_counter() - t0:.0f}s)")
+        sample = [f"bench-u{random.randrange(users)}" for _ in range(args.samples)]
+        queries = rng.standard_normal((args.samples, DIM)).astype(np.float32)
+        for label in ("cold", "hot"):
+            if label == "cold":
+                user_memory._hot.clear()
+            lat = []
+            for uid, q in zip(sample, queries):
+                t = time.perf_counter()
+                hits = user_memory.recall(uid, "", k=args.k, embedding=q)
+                lat.append(time.perf_counter() - t)
+                assert len(hits) == min(args.k, args.notes), len(hits)
+            print(summarize_ms(f"recall {label}", lat))
+
+if __name__ == "__main__":
+    main_cli()
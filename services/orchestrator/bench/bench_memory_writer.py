@@ -0,0 +1,71 @@
+"""
+user_memory writes: inline (old) vs the background MemoryWriter.
+
+Simulates --turns chat turns that each trigger a summary (every_n=1) from
+--users concurrent chat threads and reports what the chat request pays per
+call, then how long the writer needs to drain and how it batched.
+
+  python -m bench.bench_memory_writer --turns 600 --users 8
+  MEMORY_WRITER_FLUSH_MS=100 python -m bench.bench_memory_writer
+"""
+import time, uuid, argparse, threading
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+from memory import user_memory
+from rag.embedder import get_model
+
+def turns_for(i: int) -> list[dict]:
+    return [
+        {"role": "user", "text": f"I keep overthinking my exam results, attempt {i}."},
+        {"role": "guide", "text": "Act without clinging to the fruits; one small step today."},
+    ]
+
+def run(users: int, turns: int, inline: bool) -> list[float]:
+    lat: list[float] = []
+    lock = threading.Lock()
+    per_user = turns // users
+
+    def chat(uid: str):
+        sid = str(uuid.uuid4())
+        for i in range(per_user):
+            t0 = time.perf_counter()
+            if inline:
+                user_memory.upsert_summary(uid, sid, turns_for(i))
+            else:
+                user_memory.summarize_if_needed(uid, sid, turns_for(i), every_n=1)
+            dt = time.perf_counter() - t0
+            with lock:
+                lat.append(dt)
+
+    threads = [threading.Thread(target=chat, args=(str(uuid.uuid4()),)) for _ in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return lat
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--turns", type=int, default=600)
+    ap.add_argument("--users", type=int, default=8)
+    args = ap.parse_args()
+    get_model()
+    user_memory.upsert_summary("warm", "warm", turns_for(0))
+
+    t0 = time.perf_counter()
+    lat = run(args.users, args.turns, inline=True)
+    print(summarize_ms("inline per turn", lat) + f"  wall={time.perf_counter() - t0:.2f}s")
+
+    t0 = time.perf_counter()
+    lat = run(args.users, args.turns, inline=False)
+    enq = time.perf_counter() - t0
+    print(summarize_ms("queued per turn", lat) + f"  wall={enq:.2f}s")
+    t1 = time.perf_counter()
+    drained = user_memory.writer.close(timeout=120)
+    print(f"drain after last enqueue: {time.perf_counter() - t1:.2f}s (ok={drained})")
+    print("writer:", user_memory.writer.snapshot())
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,84 @@
+"""
+Multi-work retrieval: concurrent fan-out (asearch) vs sequential (search).
+
+Seeds N synthetic works into their own Chroma collections (random unit
+vectors, so no embedding model is needed), then times one query across all
+N works both ways. The retrieval cache is disabled and every query uses a
+fresh embedding, so each sample pays the real Chroma cost.
+
+  python -m bench.bench_multi_work --works 1 2 4 --docs 2000 --queries 200
+  CHROMA_DIR=/tmp/bench_chroma EMBED_WORKERS=4 python -m bench.bench_multi_work
+"""
+import os, json, time, asyncio, argparse
+
+import numpy as np
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+MAX_WORKS = 8
+os.environ["RETRIEVAL_CACHE_SIZE"] = "0"
+os.environ["RAG_WORK_COLLECTIONS"] = json.dumps({f"Work {i}": f"bench_work_{i}" for i in range(MAX_WORKS)})
+
+from rag import retrieve
+from rag.chroma_client import get_collection, upsert
+from executors import EMBED_WORKERS, shutdown_pools
+
+DIM = 384
+
+def _unit(rng, n: int) -> np.ndarray:
+    v = rng.standard_normal((n, DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+def seed(n_works: int, docs: int, rng):
+    for i in range(n_works):
+        name = f"bench_work_{i}"
+        have = get_collection(name).count()
+        if have >= docs:
+            continue
+        for start in range(have, docs, 1000):
+            n = min(1000, docs - start)
+            upsert(
+                name,
+                ids=[f"w{i}-{j}" for j in range(start, start + n)],
+                embeddings=_unit(rng, n).tolist(),
+                documents=[f"work {i} passage {j}" for j in range(start, start + n)],
+                metadatas=[{"work": f"Work {i}", "chapter": 1, "verse": j} for j in range(start, start + n)],
+            )
+
+async def run(args):
+    rng = np.random.default_rng(0)
+    print(f"seeding {max(args.works)} works x {args.docs} docs ...")
+    seed(max(args.works), args.docs, rng)
+    print(f"EMBED_WORKERS={EMBED_WORKERS}, k={args.k}, queries={args.queries}")
+
+    for n in args.works:
+        works = [f"Work {i}" for i in range(n)]
+        queries = _unit(rng, args.queries).tolist()
+        seq, fan = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            retrieve.search("bench", works, k=args.k, embedding=q)
+            seq.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            hits = await retrieve.asearch("bench", works, k=args.k, embedding=q)
+            fan.append(time.perf_counter() - t0)
+        per_work = {w: sum(1 for h in hits if h["meta"]["work"] == w) for w in works}
+        print(summarize_ms(f"sequential  works={n}", seq))
+        print(summarize_ms(f"fan-out     works={n}", fan))
+        print(f"  last merge per work: {per_work}")
+    shutdown_pools()
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--works", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=3)
+    args = ap.parse_args()
+    if max(args.works) > MAX_WORKS:
+        ap.error(f"--works is capped at {MAX_WORKS}")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main_cli()
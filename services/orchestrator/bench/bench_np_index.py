@@ -0,0 +1,97 @@
+"""
+Chroma HNSW vs the NumPy snapshot (VECTOR_INDEX=numpy) for top-k search.
+
+Seeds a synthetic collection with --docs random unit vectors, builds float32
+and float16 snapshots, and times per-query latency for:
+
+  chroma        collection.query, one query per call
+  numpy-f32     snapshot, one query per call
+  numpy-f16     float16 snapshot (upcast at load), one query per call
+  numpy-batch   float32 snapshot, --batch queries per matrix product (per-query time)
+
+hnsw_recall@k is the share of the exact (NumPy) top-k that Chroma's
+approximate HNSW search also returned. Random vectors are HNSW's worst case,
+so expect it well below what real, clustered embeddings get.
+
+  python -m bench.bench_np_index --docs 700 5000 50000 --queries 500
+"""
+import time, argparse
+
+import numpy as np
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+from rag import np_index, chroma_client
+from rag.chroma_client import client, get_collection, upsert
+
+DIM = 384
+
+def _unit(rng, n: int) -> np.ndarray:
+    v = rng.standard_normal((n, DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+def seed(name: str, docs: int, rng):
+    if get_collection(name).count() == docs:
+        return
+    if name in chroma_client._collections:
+        client.delete_collection(name)
+        chroma_client._collections.pop(name)
+    for start in range(0, docs, 1000):
+        n = min(1000, docs - start)
+        upsert(
+            name,
+            ids=[f"d{j}" for j in range(start, start + n)],
+            embeddings=_unit(rng, n).tolist(),
+            documents=[f"passage {j}" for j in range(start, start + n)],
+            metadatas=[{"work": "Bench", "verse": j} for j in range(start, start + n)],
+        )
+
+def timed(fn, queries, batch: int = 1):
+    lat, out = [], []
+    for i in range(0, len(queries), batch):
+        t0 = time.perf_counter()
+        res = fn(queries[i:i + batch])
+        dt = time.perf_counter() - t0
+        lat.extend([dt / len(res)] * len(res))
+        out.extend(res)
+    return lat, out
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, nargs="+", default=[700, 5000, 50000])
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--k", type=int, default=3)
+    ap.add_argument("--batch", type=int, default=16)
+    args = ap.parse_args()
+    rng = np.random.default_rng(0)
+
+    for docs in args.docs:
+        name = f"bench_np_{docs}"
+        seed(name, docs, rng)
+        col = get_collection(name)
+        queries = _unit(rng, args.queries)
+        print(f"--- {docs} docs, k={args.k}")
+
+        lat, chroma_ids = timed(lambda q: [
+            col.query(query_embeddings=q.tolist(), n_results=args.k, include=["distances"])["ids"][0]
+        ], queries)
+        print(summarize_ms("chroma", lat))
+
+        for dtype in ("float32", "float16"):
+            info = np_index.build_snapshot(name, dtype=dtype)
+            t0 = time.perf_counter()
+            idx = np_index.get_index(name)
+            load_ms = (time.perf_counter() - t0) * 1000
+            lat, rows = timed(lambda q: idx.search(q, args.k), queries)
+            ids = [[idx.ids[r] for r, _ in hit] for hit in rows]
+            overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(ids, chroma_ids)])
+            label = "numpy-f32" if dtype == "float32" else "numpy-f16"
+            print(summarize_ms(label, lat)
+                  + f"  build={info['seconds']:.2f}s load={load_ms:.1f}ms hnsw_recall@{args.k}={overlap:.3f}")
+            if dtype == "float32":
+                lat, _ = timed(lambda q: idx.search(q, args.k), queries, args.batch)
+                print(summarize_ms(f"numpy-batch{args.batch}", lat))
+
+if __name__ == "__main__":
+    main_cli()
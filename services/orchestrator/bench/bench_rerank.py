@@ -0,0 +1,73 @@
+"""
+Cross-encoder re-rank: latency cost and recall change on the eval set.
+
+Uses the same corpus and labelled queries as bench_hybrid (ingested into
+the `eval_gita` collection if needed) and compares, per query:
+
+  base          vector (or hybrid, if the lexical index exists and RAG_HYBRID is on)
+  rerank-cold   base + cross-encoder over RERANK_CANDIDATES, score cache cleared
+  rerank-warm   same again, (query, doc) scores served from the cache
+
+Fallbacks counts queries that blew --budget-ms (or were shed because the
+rerank pool was backed up) and kept the base order.
+
+  python -m bench.bench_rerank --k 3 --budget-ms 150
+  RERANK_MODEL=cross-encoder/ms-marco-TinyBERT-L-2-v2 python -m bench.bench_rerank --candidates 10
+"""
+import os, time, argparse
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms, percentile
+
+os.environ["RETRIEVAL_CACHE_SIZE"] = "0"
+
+from rag import retrieve, rerank
+from rag.ingest import read_jsonl, ingest_records
+from bench.bench_hybrid import DATA, COLLECTION, recall_at_k
+from executors import shutdown_pools
+
+def run_pass(queries, embs, k):
+    lat, recall = [], 0.0
+    for q in queries:
+        t0 = time.perf_counter()
+        hits = retrieve.query_collection(COLLECTION, embs[q["query"]], k, query=q["query"])
+        lat.append(time.perf_counter() - t0)
+        recall += recall_at_k([h["id"] for h in hits], q["relevant"], k)
+    return lat, recall / len(queries)
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--k", type=int, default=3)
+    ap.add_argument("--candidates", type=int, default=rerank.RERANK_CANDIDATES)
+    ap.add_argument("--budget-ms", type=float, default=rerank.RERANK_BUDGET_MS)
+    args = ap.parse_args()
+
+    ingest_records(read_jsonl(os.path.join(DATA, "gita_eval_corpus.jsonl")), COLLECTION, log=lambda *_: None)
+    queries = list(read_jsonl(os.path.join(DATA, "gita_eval_queries.jsonl")))
+    embs = {q["query"]: retrieve.embed_query(q["query"]) for q in queries}
+    rerank.RERANK_BUDGET_MS = args.budget_ms
+    retrieve.RERANK_CANDIDATES = args.candidates
+
+    t0 = time.perf_counter()
+    rerank.get_reranker().predict([("warm up", "warm up")])
+    print(f"reranker load: {(time.perf_counter() - t0) * 1000:.0f} ms ({rerank.RERANK_MODEL})")
+    print(f"k={args.k} candidates={args.candidates} budget={args.budget_ms:.0f}ms queries={len(queries)}")
+
+    retrieve.RERANK_ENABLED = False
+    base_lat, base_recall = run_pass(queries, embs, args.k)
+    print(f"base         recall@{args.k}={base_recall:.3f}  " + summarize_ms("", base_lat).strip())
+
+    retrieve.RERANK_ENABLED = True
+    for label, clear in (("rerank-cold", True), ("rerank-warm", False)):
+        if clear:
+            rerank._scores.clear()
+        before = rerank.stats["fallbacks"] + rerank.stats["shed"]
+        lat, recall = run_pass(queries, embs, args.k)
+        print(f"{label:<12} recall@{args.k}={recall:.3f}  " + summarize_ms("", lat).strip()
+              + f"  fallbacks={rerank.stats['fallbacks'] + rerank.stats['shed'] - before}")
+        print(f"  p95 cost vs base: {(percentile(lat, 95) - percentile(base_lat, 95)) * 1000:+.1f} ms, "
+              f"recall {recall - base_recall:+.3f}")
+    shutdown_pools()
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,78 @@
+"""
+Per-request overhead of the /story pipeline, before vs after sharing the loop.
+
+  before: each request runs in a worker thread, builds a new event loop with
+          asyncio.run() and recompiles the LangGraph with build_story_graph()
+  after : requests await run_story_pipeline() on the app loop and reuse the
+          graph compiled at startup
+
+Uses the offline llm_generate fallback (OPENROUTER_API_KEY ignored) and a
+no-op retrieval, so what's left is pure orchestration overhead.
+
+  python -m bench.bench_story_overhead --requests 200 --concurrency 1
+  python -m bench.bench_story_overhead --requests 200 --concurrency 20
+"""
+import argparse, asyncio, time
+from concurrent.futures import ThreadPoolExecutor
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+import agents.llm_adapter
+import agents.lang_graph_story as lgs
+
+HITS = [{"doc": "You have a right to action.", "meta": {"work": "Bhagavad Gita", "chapter": 2, "verse": 47}, "score": 0.9}]
+
+def install_stubs():
+    agents.llm_adapter.OPENROUTER_KEY = None  # force the offline fallback
+    async def asearch(query, works=None, k=3, embedding=None):
+        return HITS
+    lgs.asearch = asearch
+
+async def _old_pipeline(problem_text, emotion_tags):
+    graph = lgs.build_story_graph()
+    return await graph.ainvoke({"problem_text": problem_text, "emotion_tags": emotion_tags})
+
+def _old_request(problem_text, emotion_tags):
+    t0 = time.perf_counter()
+    asyncio.run(_old_pipeline(problem_text, emotion_tags))
+    return time.perf_counter() - t0
+
+async def bench_before(n: int, concurrency: int) -> list[float]:
+    # mimic Starlette running a sync endpoint on its threadpool
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return await asyncio.gather(*[
+            loop.run_in_executor(pool, _old_request, "I'm anxious about exams", ["anxiety"])
+            for _ in range(n)
+        ])
+
+async def bench_after(n: int, concurrency: int) -> list[float]:
+    lgs.get_story_graph()  # startup compile, outside the timed region
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            await lgs.run_story_pipeline("I'm anxious about exams", ["anxiety"])
+            return time.perf_counter() - t0
+
+    return await asyncio.gather(*[one() for _ in range(n)])
+
+async def run(args):
+    install_stubs()
+    for label, fn in (("before (asyncio.run + compile)", bench_before), ("after (shared loop + graph)", bench_after)):
+        await fn(10, 1)  # warm imports / first-call costs
+        t0 = time.perf_counter()
+        lat = await fn(args.requests, args.concurrency)
+        wall = time.perf_counter() - t0
+        print(summarize_ms(label, lat) + f"  throughput={args.requests / wall:7.1f} req/s")
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=1)
+    asyncio.run(run(ap.parse_args()))
+
+if __name__ == "__main__":
+    main_cli()
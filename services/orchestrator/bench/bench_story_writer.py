@@ -0,0 +1,111 @@
+"""
+Story persistence at the end of /story/stream: an inline INSERT per story (old)
+vs the write-behind StoryWriter.
+
+--streams concurrent streams each persist --stories stories. Reports what the
+stream waits before it can send "done" in each mode, then how long the writer
+needs to drain and how it batched. Afterwards it checks every queued story
+reached the stories table.
+
+--fail-first N makes the writer's first N INSERTs raise an OperationalError,
+so the retry path runs. --fail-all simulates Postgres being down through
+shutdown: every story must end up in the spool file.
+
+Needs the real Postgres schema (alembic upgrade head):
+
+  DATABASE_URL=postgresql+psycopg://... python -m bench.bench_story_writer --streams 100
+  python -m bench.bench_story_writer --fail-first 3
+"""
+import os, time, uuid, asyncio, argparse, tempfile
+
+import bench.common  # noqa: F401  (env defaults)
+from bench.common import summarize_ms
+
+from sqlalchemy import delete, func, select, exc
+from db import SessionLocal, engine
+from models_db import User, Session as DBSession, Story as DBStory, Totals
+from crud import create_user_session, story_row, insert_stories
+from executors import run_db, shutdown_pools
+from story_writer import StoryWriter, write_stories
+
+PAYLOAD = {"title": "bench", "narration_text": "A calm bench story.",
+           "citations": [{"work": "Bhagavad Gita", "ref": "2.47"}]}
+
+def flaky(fail_first: int, fail_all: bool):
+    calls = 0
+    def write(rows):
+        nonlocal calls
+        calls += 1
+        if fail_all or calls <= fail_first:
+            raise exc.OperationalError("INSERT INTO stories", {}, ConnectionError("injected"))
+        write_stories(rows)
+    return write
+
+async def persist(mode: str, writer: StoryWriter, user_id: str, session_id: str, per_stream: int,
+                  lat: list[float], ids: list[str]):
+    for _ in range(per_stream):
+        row = story_row(user_id, session_id, PAYLOAD)
+        t0 = time.perf_counter()
+        if mode == "inline":
+            await run_db(insert_stories, [row])
+        else:
+            writer.submit(row)
+        lat.append(time.perf_counter() - t0)
+        ids.append(row["id"])
+
+def stored(ids: list[str]) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(DBStory).where(DBStory.id.in_(ids)))
+
+async def main_async(args):
+    user_id = str(uuid.uuid4())
+    spool = os.path.join(tempfile.mkdtemp(), "story_spool.jsonl")
+    with SessionLocal() as db:
+        session_id = create_user_session(db, user_id, "bench", ["calm"])
+        db.commit()
+    try:
+        for mode in ("inline", "queued"):
+            writer = StoryWriter(flaky(args.fail_first, args.fail_all), args.batch, args.flush_ms,
+                                 backoff_ms=50, spool_path=spool)
+            lat: list[float] = []
+            ids: list[str] = []
+            t0 = time.perf_counter()
+            await asyncio.gather(*(persist(mode, writer, user_id, session_id, args.stories, lat, ids)
+                                   for _ in range(args.streams)))
+            print(summarize_ms(f"{mode} wait before done", lat) + f"  wall={time.perf_counter() - t0:.2f}s")
+            if mode == "queued":
+                t1 = time.perf_counter()
+                drained = await asyncio.to_thread(writer.close, args.drain_s)
+                print(f"writer drained={drained} in {time.perf_counter() - t1:.2f}s  {writer.snapshot()}")
+            n = stored(ids)
+            spooled = writer.stats["spooled"] if mode == "queued" else 0
+            print(f"{mode:<6} stories in table {n}/{len(ids)}, spooled {spooled}")
+            if n + spooled != len(ids):
+                raise SystemExit(f"{len(ids) - n - spooled} stories lost")
+    finally:
+        with SessionLocal() as db:
+            db.execute(delete(DBStory).where(DBStory.session_id == session_id))
+            db.execute(delete(DBSession).where(DBSession.id == session_id))
+            db.execute(delete(Totals).where(Totals.user_id == user_id))
+            db.execute(delete(User).where(User.id == user_id))
+            db.commit()
+        if os.path.exists(spool):
+            print(f"spool left at {spool}")
+        shutdown_pools()
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--streams", type=int, default=100)
+    ap.add_argument("--stories", type=int, default=5, help="stories per stream")
+    ap.add_argument("--batch", type=int, default=100)
+    ap.add_argument("--flush-ms", type=float, default=50)
+    ap.add_argument("--drain-s", type=float, default=15)
+    ap.add_argument("--fail-first", type=int, default=0)
+    ap.add_argument("--fail-all", action="store_true")
+    args = ap.parse_args()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("bench_story_writer needs DATABASE_URL pointing at Postgres (alembic upgrade head)")
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,135 @@
+"""
+Concurrency benchmark for POST /story/stream against stubbed backends.
+
+Fires N simultaneous streams and reports p50/p99 time-to-first-event plus
+/health latency while the streams are running. Backends are stubbed with
+sleeps that behave like the real ones:
+  - retrieval    : blocking (CPU encode + Chroma query)   -> time.sleep
+  - Gemini       : network wait                           -> asyncio.sleep
+  - DB writes    : blocking SQLAlchemy round trips        -> time.sleep
+
+  python -m bench.bench_stream_concurrency --streams 100
+  python -m bench.bench_stream_concurrency --streams 100 --inline   # old behaviour
+
+--inline runs the blocking stubs directly on the event loop, which is what
+the handler did before the execution layer existed.
+"""
+import argparse, asyncio, json, time, uuid
+
+from bench.common import asgi_request, percentile, summarize_ms, sse_events
+
+import main
+import rag.retrieve
+import agents.curator
+
+STORY_JSON = json.dumps({
+    "title": "Stub story",
+    "narration_text": "A calm stub story.",
+    "slides": [{"image_prompt": "a river"}, {"image_prompt": "a lamp"}],
+    "takeaways": ["one", "two", "three"],
+    "citations": [{"work": "Bhagavad Gita", "ref": "2.47"}],
+})
+
+# calls that reached the retrieval stub; 0 after a run means retrieval was
+# never simulated (e.g. its signature drifted and _search_one swallowed the error)
+stub_calls = {"query_collection": 0}
+
+def install_stubs(args):
+    def query_collection(collection, embedding, k=3, where=None, query=None, deadline=None):
+        stub_calls["query_collection"] += 1
+        time.sleep(args.embed_ms / 1000)
+        return [{"id": "gita-2-47", "doc": "You have a right to action.",
+                 "meta": {"work": "Bhagavad Gita", "chapter": 2, "verse": 47}, "score": 0.9}]
+
+    async def agenerate(prompt):
+        if args.inline:
+            time.sleep(args.llm_ms / 1000)
+        else:
+            await asyncio.sleep(args.llm_ms / 1000)
+        return STORY_JSON
+
+    async def astream(prompt):
+        yield await agenerate(prompt)
+
+    async def web_search_agent(query, soft_fail=True):
+        await asyncio.sleep(args.search_ms / 1000)
+        return ["stub insight"]
+
+    def start_story(db, user_id, problem_text, emotion_tags):
+        time.sleep(args.db_ms / 1000)
+        return str(uuid.uuid4())
+
+    async def persist_story(user_id, session_id, story_payload):
+        # the story writer only enqueues; --inline waits on the INSERT like before
+        if args.inline:
+            time.sleep(args.db_ms / 1000)
+        return str(uuid.uuid4())
+
+    async def aembed_query(query):
+        return [0.0] * 384
+
+    rag.retrieve.query_collection = query_collection
+    rag.retrieve.aembed_query = aembed_query
+    main.astream_gemini = astream
+    agents.curator.agenerate_with_gemini = agenerate
+    main.web_search_agent = web_search_agent
+    main.start_story = start_story
+    main.persist_story = persist_story
+
+    if args.inline:
+        async def asearch_inline(query, works=None, k=3, embedding=None, deadline=None):
+            return query_collection("gita", embedding, k)
+
+        async def run_db_inline(fn, *a, **kw):
+            return fn(None, *a, **kw)
+
+        main.asearch = asearch_inline
+        main.run_db = run_db_inline
+
+async def probe_health(stop: asyncio.Event, out: list[float]):
+    while not stop.is_set():
+        r = await asgi_request(main.app, "GET", "/health")
+        out.append(r["total_s"])
+        await asyncio.sleep(0.05)
+
+async def run(args):
+    install_stubs(args)
+    body = {"user_id": str(uuid.uuid4()), "problem_text": "I'm anxious about exams"}
+
+    stop = asyncio.Event()
+    health: list[float] = []
+    prober = asyncio.create_task(probe_health(stop, health))
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*[
+        asgi_request(main.app, "POST", "/story/stream", body) for _ in range(args.streams)
+    ])
+    wall = time.perf_counter() - t0
+    stop.set()
+    await prober
+
+    ttfe = [r["first_chunk_s"] for r in results if r["first_chunk_s"] is not None]
+    total = [r["total_s"] for r in results]
+    done = sum(1 for r in results if any(e.get("stage") == "done" for e in sse_events(r["body"])))
+
+    mode = "inline (blocking)" if args.inline else "offloaded"
+    print(f"mode={mode} streams={args.streams} completed={done} wall={wall:.2f}s")
+    print(summarize_ms("time-to-first-event", ttfe))
+    print(summarize_ms("time-to-done", total))
+    print(summarize_ms("/health during load", health))
+    if stub_calls["query_collection"] == 0:
+        raise SystemExit("retrieval stub was never called: the numbers above don't include retrieval cost")
+    return {"p50_ttfe_ms": percentile(ttfe, 50) * 1000, "p99_ttfe_ms": percentile(ttfe, 99) * 1000}
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--streams", type=int, default=100)
+    ap.add_argument("--embed-ms", type=float, default=30)
+    ap.add_argument("--llm-ms", type=float, default=400)
+    ap.add_argument("--search-ms", type=float, default=150)
+    ap.add_argument("--db-ms", type=float, default=5)
+    ap.add_argument("--inline", action="store_true", help="run blocking stubs on the event loop (pre-change behaviour)")
+    asyncio.run(run(ap.parse_args()))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,85 @@
+"""
+Time-to-first-token for /story/stream with a fake streaming LLM backend.
+
+The fake backend waits --first-token-ms, then emits the story JSON in
+--chunk-chars pieces every --chunk-ms. For each stream we record (relative to
+the "llm" stage event):
+  ttft  : first "narration" delta reaching the client
+  done  : the final "done" event (what the client waited for before streaming)
+
+  python -m bench.bench_ttft --streams 20
+"""
+import argparse, asyncio, json, uuid
+from types import SimpleNamespace
+
+from bench.common import asgi_request, summarize_ms, sse_events
+from bench.bench_stream_concurrency import install_stubs
+
+import main
+
+NARRATION = (
+    "Arjuna stood still as the conch shells sounded. His hands shook. "
+    "Krishna smiled and said: do your part, and let the fruit be light. "
+    "Arjuna took one breath, then one step. The fear did not vanish, but it grew quiet. 💙"
+)
+STORY_JSON = json.dumps({
+    "title": "One Step on the Field",
+    "narration_text": NARRATION,
+    "slides": [{"image_prompt": "a chariot at dawn"}, {"image_prompt": "a calm charioteer"}],
+    "takeaways": ["Do one tiny step.", "Breathe first.", "Let results be light."],
+    "citations": [{"work": "Bhagavad Gita", "ref": "2.47"}],
+}, ensure_ascii=False, indent=2)
+
+def install_fake_stream(args):
+    async def astream(prompt):
+        await asyncio.sleep(args.first_token_ms / 1000)
+        for i in range(0, len(STORY_JSON), args.chunk_chars):
+            yield STORY_JSON[i:i + args.chunk_chars]
+            await asyncio.sleep(args.chunk_ms / 1000)
+    main.astream_gemini = astream
+
+async def run(args):
+    install_stubs(SimpleNamespace(embed_ms=5, llm_ms=50, search_ms=20, db_ms=1, inline=False))
+    install_fake_stream(args)
+    body = {"user_id": str(uuid.uuid4()), "problem_text": "I freeze before exams"}
+    results = await asyncio.gather(*[
+        asgi_request(main.app, "POST", "/story/stream", body) for _ in range(args.streams)
+    ])
+
+    ttft, done, streamed_ok = [], [], 0
+    for r in results:
+        t_llm = t_first = t_done = None
+        text = ""
+        for t, chunk in r["chunks"]:
+            for ev in sse_events(chunk):
+                st = ev.get("stage")
+                if st == "llm" and t_llm is None:
+                    t_llm = t
+                elif st == "narration":
+                    text += ev.get("delta", "")
+                    if t_first is None:
+                        t_first = t
+                elif st == "done":
+                    t_done = t
+                    streamed_ok += text == ev["story_payload"]["narration_text"]
+        if t_llm is not None and t_first is not None:
+            ttft.append(t_first - t_llm)
+        if t_llm is not None and t_done is not None:
+            done.append(t_done - t_llm)
+
+    print(f"streams={args.streams} first_token={args.first_token_ms}ms "
+          f"chunks={len(STORY_JSON) // args.chunk_chars + 1}x{args.chunk_ms}ms")
+    print(summarize_ms("llm -> first narration", ttft))
+    print(summarize_ms("llm -> done (buffered)", done))
+    print(f"narration deltas reassembled exactly: {streamed_ok}/{args.streams}")
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--streams", type=int, default=20)
+    ap.add_argument("--first-token-ms", type=float, default=300)
+    ap.add_argument("--chunk-chars", type=int, default=24)
+    ap.add_argument("--chunk-ms", type=float, default=30)
+    asyncio.run(run(ap.parse_args()))
+
+if __name__ == "__main__":
+    main_cli()
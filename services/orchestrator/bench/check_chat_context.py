@@ -0,0 +1,150 @@
+"""
+Read-path regression check for /guide/chat against a real Postgres schema.
+
+Seeds a session with --stories stories and a chat per persona (plus --filler
+other sessions so the tables aren't trivially small), then:
+
+  plans   EXPLAIN (FORMAT JSON) the exact statement crud.load_chat_context
+          sent, with seq scans disabled, and assert it reads stories and chats
+          through ix_stories_session_id_created_at / ix_chats_session_id_persona
+          (latest story with no Sort node); sessions-by-user uses ix_sessions_user_id
+  counts  statements per call: load_chat_context is 1 round trip, guide_chat
+          is 4 on an existing chat (context, turn_count bump, turn insert,
+          karma award) and 5 when it has to create the chat
+
+Exits non-zero on the first failed assertion.
+
+  DATABASE_URL=postgresql+psycopg://... python -m bench.check_chat_context
+"""
+import json, argparse
+from contextlib import contextmanager
+
+import bench.common  # noqa: F401  (env defaults)
+
+from sqlalchemy import event, delete, select, insert
+from db import SessionLocal, engine
+from models_db import User, Session as DBSession, Story as DBStory, Chat, ChatTurn, Totals
+from models import GuideChatRequest
+from crud import load_chat_context
+
+PERSONAS = ["krishna", "jiddu", "patanjali"]
+
+@contextmanager
+def capture_statements():
+    """Every statement the engine sends while active, as (sql, params)."""
+    seen = []
+    def before(conn, cursor, statement, parameters, context, executemany):
+        seen.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        yield seen
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+def explain(statement: str, params) -> list[dict]:
+    with engine.connect() as conn:
+        with conn.begin():
+            # tiny bench tables would tempt the planner into seq scans;
+            # with them off, a missing index still shows up as a Seq Scan
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            raw = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, params).scalar()
+    plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+    return list(plan_nodes(plan))
+
+def check(cond: bool, msg: str):
+    print(("ok    " if cond else "FAIL  ") + msg)
+    if not cond:
+        raise SystemExit(1)
+
+def seed(stories: int, filler: int) -> dict:
+    with SessionLocal() as db:
+        user = User(locale="bench")
+        db.add(user)
+        db.flush()
+        sessions = [DBSession(user_id=user.id, problem_text="bench") for _ in range(filler + 1)]
+        db.add_all(sessions)
+        db.flush()
+        db.execute(insert(DBStory), [
+            {"user_id": user.id, "session_id": s.id, "story_json": {"title": "bench"},
+             "citations_json": [{"work": "Bhagavad Gita", "ref": "2.47"}]}
+            for s in sessions for _ in range(stories)
+        ])
+        db.execute(insert(Chat), [
+            {"user_id": user.id, "session_id": s.id, "persona": p}
+            for s in sessions for p in PERSONAS
+        ])
+        db.commit()
+        return {"user_id": user.id, "session_ids": [s.id for s in sessions]}
+
+def cleanup(seeded: dict):
+    sids = seeded["session_ids"]
+    with SessionLocal() as db:
+        chat_ids = select(Chat.id).where(Chat.session_id.in_(sids))
+        db.execute(delete(ChatTurn).where(ChatTurn.chat_id.in_(chat_ids)))
+        db.execute(delete(Chat).where(Chat.session_id.in_(sids)))
+        db.execute(delete(DBStory).where(DBStory.session_id.in_(sids)))
+        db.execute(delete(DBSession).where(DBSession.id.in_(sids)))
+        db.execute(delete(Totals).where(Totals.user_id == seeded["user_id"]))
+        db.execute(delete(User).where(User.id == seeded["user_id"]))
+        db.commit()
+
+def check_plans(session_id: str, user_id: str):
+    with SessionLocal() as db, capture_statements() as seen:
+        ctx = load_chat_context(db, session_id)
+    check(ctx is not None and set(ctx["chats"]) == set(PERSONAS), "load_chat_context returns the session's chats")
+    check(len(seen) == 1, f"load_chat_context is one statement (saw {len(seen)})")
+
+    nodes = explain(*seen[0])
+    # by index name: a Bitmap Index Scan node carries no "Relation Name"
+    used = {n["Index Name"] for n in nodes if n.get("Index Name")}
+    print(f"      indexes used: {sorted(used)}")
+    check(not [n for n in nodes if n["Node Type"] == "Seq Scan"], "no seq scans")
+    check("ix_stories_session_id_created_at" in used, "latest story via ix_stories_session_id_created_at")
+    check("ix_chats_session_id_persona" in used, "chats via ix_chats_session_id_persona")
+    check(not [n for n in nodes if n["Node Type"] in ("Sort", "Incremental Sort")], "latest story needs no sort")
+
+    with capture_statements() as seen, SessionLocal() as db:
+        db.execute(select(DBSession.id).where(DBSession.user_id == user_id)).all()
+    names = {n.get("Index Name") for n in explain(*seen[0])}
+    check("ix_sessions_user_id" in names, "sessions by user via ix_sessions_user_id")
+
+def check_guide_chat(session_id: str):
+    from main import guide_chat
+
+    def call(persona: str) -> int:
+        with SessionLocal() as db, capture_statements() as seen:
+            guide_chat(GuideChatRequest(session_id=session_id, persona=persona, message="bench"), db=db)
+        return len(seen)
+
+    # existing chat, 2 turns in: no summary is due
+    n = call("krishna")
+    check(n == 4, f"guide_chat on an existing chat: 4 statements (saw {n})")
+    n = call("bench-new")
+    check(n == 5, f"guide_chat creating its chat: 5 statements (saw {n})")
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--stories", type=int, default=20)
+    ap.add_argument("--filler", type=int, default=500)
+    args = ap.parse_args()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("check_chat_context needs DATABASE_URL pointing at Postgres (alembic upgrade head)")
+
+    seeded = seed(args.stories, args.filler)
+    try:
+        with engine.begin() as conn:
+            for table in ("sessions", "stories", "chats"):
+                conn.exec_driver_sql(f"ANALYZE {table}")
+        session_id = seeded["session_ids"][0]
+        check_plans(session_id, seeded["user_id"])
+        check_guide_chat(session_id)
+    finally:
+        cleanup(seeded)
+
+if __name__ == "__main__":
+    main_cli()
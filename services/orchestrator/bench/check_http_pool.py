@@ -0,0 +1,88 @@
+"""
+Connection-reuse check for the shared HTTP pool against a local mock OpenRouter.
+
+Starts a tiny keep-alive HTTP/1.1 server that counts accepted TCP connections,
+points OPENROUTER_BASE_URL at it, then fires concurrent calls through all three
+callers (llm_generate, web_search_agent, aopenrouter_generate) for several rounds.
+
+Asserts the server never saw more connections than HTTP_PER_HOST_LIMIT, i.e.
+later rounds reused pooled keep-alive connections instead of reconnecting.
+
+  python -m bench.check_http_pool --calls 300 --rounds 3
+"""
+import os, json, asyncio, argparse, time
+
+HOST, PORT = "127.0.0.1", 18765
+os.environ["OPENROUTER_BASE_URL"] = f"http://{HOST}:{PORT}/api/v1"
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+os.environ["PROMPT_CACHE_BACKEND"] = "off"  # every call must reach the server
+
+import http_pool
+from agents.llm_adapter import llm_generate
+from agents.search_agents import web_search_agent
+from llm.openroute import aopenrouter_generate
+
+class MockOpenRouter:
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.connections = 0
+        self.requests = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    k, _, v = line.partition(":")
+                    if k.strip().lower() == "content-length":
+                        length = int(v.strip())
+                if length:
+                    await reader.readexactly(length)
+                self.requests += 1
+                await asyncio.sleep(self.latency_s)
+                body = json.dumps({"choices": [{"message": {"content": "- calm insight\n- one small step"}}]}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Connection: keep-alive\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+async def run(args):
+    mock = MockOpenRouter(args.latency_ms / 1000)
+    server = await asyncio.start_server(mock.handle, HOST, PORT)
+    callers = [
+        lambda: llm_generate("system", "user"),
+        lambda: web_search_agent("exam anxiety"),
+        lambda: aopenrouter_generate("hello"),
+    ]
+    try:
+        for rnd in range(args.rounds):
+            t0 = time.perf_counter()
+            await asyncio.gather(*[callers[i % len(callers)]() for i in range(args.calls)])
+            print(f"round {rnd + 1}: {args.calls} calls in {time.perf_counter() - t0:.2f}s, "
+                  f"connections so far={mock.connections}, requests={mock.requests}")
+    finally:
+        await http_pool.aclose_http_client()
+        server.close()
+        await server.wait_closed()
+
+    limit = http_pool.HTTP_PER_HOST_LIMIT
+    assert mock.requests == args.calls * args.rounds, mock.requests
+    assert mock.connections <= limit, f"opened {mock.connections} connections, per-host cap is {limit}"
+    print(f"OK: {mock.requests} requests over {mock.connections} connection(s) (cap {limit})")
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=300)
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--latency-ms", type=float, default=20)
+    asyncio.run(run(ap.parse_args()))
+
+if __name__ == "__main__":
+    main_cli()
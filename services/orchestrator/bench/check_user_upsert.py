@@ -0,0 +1,85 @@
+"""
+Concurrency check for crud.create_user_session against a real Postgres schema.
+
+Fires --requests parallel first-time requests for one fresh user_id through
+executors.run_db (the path /story and /story/stream take), then asserts:
+
+  - every request succeeded and got its own session
+  - exactly one users row and one totals row exist
+  - the courage bonus (15 points) was granted once
+  - each call was a single statement
+
+Run it with DB_ASYNC=true as well, to cover the asyncpg path. Exits non-zero on
+the first failed assertion.
+
+  DATABASE_URL=postgresql+psycopg://... python -m bench.check_user_upsert --requests 50
+"""
+import time, uuid, asyncio, argparse
+
+import bench.common  # noqa: F401  (env defaults)
+
+from sqlalchemy import event, delete, func, select
+from db import SessionLocal, engine, DB_ASYNC, get_async_engine, dispose_async_engine
+from models_db import User, Session as DBSession, Totals
+from crud import create_user_session
+from executors import run_db, DB_WORKERS
+
+def check(cond: bool, msg: str):
+    print(("ok    " if cond else "FAIL  ") + msg)
+    if not cond:
+        raise SystemExit(1)
+
+async def fire(user_id: str, n: int) -> tuple[list, int]:
+    statements = 0
+    def before(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        statements += 1
+    target = get_async_engine().sync_engine if DB_ASYNC else engine
+    event.listen(target, "before_cursor_execute", before)
+    try:
+        results = await asyncio.gather(
+            *(run_db(create_user_session, user_id, f"bench {i}", ["calm"]) for i in range(n)),
+            return_exceptions=True,
+        )
+    finally:
+        event.remove(target, "before_cursor_execute", before)
+    return results, statements
+
+async def main_async(n: int):
+    user_id = str(uuid.uuid4())
+    print(f"{n} parallel first requests for user {user_id} "
+          f"({'asyncpg' if DB_ASYNC else f'sync engine, {DB_WORKERS} db workers'})")
+    try:
+        t0 = time.perf_counter()
+        results, statements = await fire(user_id, n)
+        print(f"      wall {time.perf_counter() - t0:.3f}s")
+        errors = [r for r in results if isinstance(r, BaseException)]
+        check(not errors, f"no request failed ({len(errors)} did{': ' + repr(errors[0]) if errors else ''})")
+        check(len(set(results)) == n, f"{n} distinct session ids")
+        check(statements == n, f"one statement per request ({statements} for {n})")
+
+        with SessionLocal() as db:
+            users = db.scalar(select(func.count()).select_from(User).where(User.id == user_id))
+            totals = db.execute(select(Totals.karmic_points).where(Totals.user_id == user_id)).scalars().all()
+            sessions = db.scalar(select(func.count()).select_from(DBSession).where(DBSession.user_id == user_id))
+        check(users == 1, f"one users row ({users})")
+        check(totals == [15], f"one totals row with the 15-point bonus ({totals})")
+        check(sessions == n, f"{n} sessions rows ({sessions})")
+    finally:
+        await dispose_async_engine()
+        with SessionLocal() as db:
+            db.execute(delete(DBSession).where(DBSession.user_id == user_id))
+            db.execute(delete(Totals).where(Totals.user_id == user_id))
+            db.execute(delete(User).where(User.id == user_id))
+            db.commit()
+
+def main_cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=50)
+    args = ap.parse_args()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("check_user_upsert needs DATABASE_URL pointing at Postgres (alembic upgrade head)")
+    asyncio.run(main_async(args.requests))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,89 @@
+"""
+Small helpers shared by the bench scripts (run from services/orchestrator):
+  python -m bench.<script> [--help]
+"""
+import os, json, time, asyncio, math
+
+# main.py imports db.py, which refuses to start without a DATABASE_URL.
+# Benches stub the DB, so any URL that doesn't need a server will do.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    xs = sorted(values)
+    idx = min(len(xs) - 1, max(0, math.ceil(p / 100 * len(xs)) - 1))
+    return xs[idx]
+
+def summarize_ms(label: str, values: list[float]) -> str:
+    ms = [v * 1000 for v in values]
+    return (f"{label:<28} n={len(ms):<5} p50={percentile(ms, 50):8.1f}ms "
+            f"p95={percentile(ms, 95):8.1f}ms p99={percentile(ms, 99):8.1f}ms "
+            f"max={max(ms) if ms else float('nan'):8.1f}ms")
+
+async def asgi_request(app, method: str, path: str, body: dict | None = None) -> dict:
+    """
+    Drive an ASGI app in-process (no sockets, no httpx) and record when the
+    first non-empty body chunk arrives, i.e. time-to-first-event for SSE.
+    """
+    payload = json.dumps(body).encode() if body is not None else b""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    delivered = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    t0 = time.perf_counter()
+    out = {"status": None, "first_chunk_s": None, "chunks": []}
+
+    async def send(msg):
+        if msg["type"] == "http.response.start":
+            out["status"] = msg["status"]
+        elif msg["type"] == "http.response.body":
+            chunk = msg.get("body", b"")
+            if chunk:
+                if out["first_chunk_s"] is None:
+                    out["first_chunk_s"] = time.perf_counter() - t0
+                out["chunks"].append((time.perf_counter() - t0, chunk))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    out["total_s"] = time.perf_counter() - t0
+    out["body"] = b"".join(c for _, c in out["chunks"])
+    return out
+
+def sse_events(body: bytes) -> list[dict]:
+    events = []
+    for block in body.decode("utf-8", "replace").split("\n\n"):
+        for line in block.splitlines():
+            if line.startswith("data: "):
+                try:
+                    events.append(json.loads(line[6:]))
+                except ValueError:
+                    pass
+    return events
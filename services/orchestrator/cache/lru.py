@@ -0,0 +1,60 @@
+import time, threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+
+class LRUCache:
+    """Small thread-safe LRU with optional TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int, ttl_s: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and (self.ttl_s is None or item[0] > now):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not _MISSING:
+                del self._data[key]  # expired
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        expires = time.monotonic() + self.ttl_s if self.ttl_s is not None else 0.0
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            return default if item is _MISSING else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
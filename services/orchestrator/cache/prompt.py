@@ -0,0 +1,276 @@
+import os, json, time, sqlite3, hashlib, asyncio, threading
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+# Exact-match prompt -> completion cache. Prompts are deterministic functions
+# of their inputs, so identical inputs shouldn't re-hit the paid API. Opt-in
+# (like SEMANTIC_CACHE_ENABLED): completions are sampled, and with the cache
+# on, a repeated prompt gets the same text back instead of a fresh one.
+PROMPT_CACHE_BACKEND = os.getenv("PROMPT_CACHE_BACKEND", "off").lower()  # off | memory | sqlite
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "5000"))
+PROMPT_CACHE_PATH = os.getenv("PROMPT_CACHE_PATH", "./.cache/prompt_cache.sqlite3")
+
+def prompt_key(provider: str, model: str, *parts: str) -> str:
+    """Content address: same provider/model/prompt parts -> same key."""
+    raw = json.dumps([provider, model, *parts], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class MemoryBackend:
+    blocking = False  # dict lookups: fine to call on the event loop
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            val = self._data.get(key)
+            if val is not None:
+                self._data.move_to_end(key)
+            return val
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteBackend:
+    """Survives restarts. Evicts least-recently-used rows past max_entries."""
+
+    blocking = True  # disk I/O: async callers go through a thread
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self.evictions = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prompt_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_prompt_cache_last_used ON prompt_cache(last_used)")
+        self._lock = threading.Lock()
+        self._count = self._conn.execute("SELECT count(*) FROM prompt_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM prompt_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE prompt_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO prompt_cache (key, value, last_used) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._count += cur.rowcount
+            over = self._count - self.max_entries
+            if over > 0:
+                # trim in chunks so we don't pay a DELETE on every insert
+                n = max(over, self.max_entries // 20)
+                cur = self._conn.execute(
+                    "DELETE FROM prompt_cache WHERE key IN ("
+                    " SELECT key FROM prompt_cache ORDER BY last_used LIMIT ?)", (n,)
+                )
+                self._count -= cur.rowcount
+                self.evictions += cur.rowcount
+
+    def __len__(self):
+        return self._count
+
+class PromptCache:
+    """
+    Backend-agnostic wrapper with single-flight: concurrent callers asking for
+    the same key share one upstream call instead of each paying for it.
+    Empty completions and errors are never cached. If that call fails, every
+    caller waiting on it gets the same error at once (during an outage they
+    must not retry one after another, each paying a full timeout); only if
+    its owner goes away (cancelled) does a waiter take over.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = {"hits": 0, "misses": 0, "shared": 0}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._inflight_sync: dict[str, tuple[threading.Event, list]] = {}  # key -> (done, [error])
+        self._sync_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        if self.backend is None:
+            return None
+        val = self.backend.get(key)
+        self.stats["hits" if val is not None else "misses"] += 1
+        return val
+
+    def set(self, key: str, value: str):
+        if self.backend is not None and value:
+            self.backend.set(key, value)
+
+    async def aget(self, key: str) -> Optional[str]:
+        if self.backend is None:
+            return None
+        if self.backend.blocking:
+            val = await asyncio.to_thread(self.backend.get, key)
+        else:
+            val = self.backend.get(key)
+        self.stats["hits" if val is not None else "misses"] += 1
+        return val
+
+    async def aset(self, key: str, value: str):
+        if self.backend is None or not value:
+            return
+        if self.backend.blocking:
+            await asyncio.to_thread(self.backend.set, key, value)
+        else:
+            self.backend.set(key, value)
+
+    async def _await_inflight(self, key: str) -> Optional[str]:
+        """
+        Wait out whoever is computing `key`: their value, or their error
+        (raised), or None if nobody was or the owner was cancelled, in which
+        case the caller computes it itself.
+        """
+        while (pending := self._inflight.get(key)) is not None:
+            self.stats["shared"] += 1
+            value = await asyncio.shield(pending)
+            if value is not None:
+                return value
+        return None
+
+    def _own(self, key: str) -> asyncio.Future:
+        fut = self._inflight[key] = asyncio.get_running_loop().create_future()
+        return fut
+
+    def _release(self, key: str, fut: asyncio.Future, value: Optional[str] = None,
+                 error: Optional[BaseException] = None):
+        self._inflight.pop(key, None)
+        if fut.done():
+            return
+        if error is not None:
+            fut.set_exception(error)
+            fut.exception()  # mark retrieved so a future nobody waited on doesn't warn
+        else:
+            fut.set_result(value)
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        if self.backend is None:
+            return await compute()
+        value = await self._await_inflight(key)
+        if value is not None:
+            return value
+        fut = self._own(key)
+        try:
+            value = await self.aget(key)
+            if value is None:
+                value = await compute()
+                await self.aset(key, value)
+        except Exception as e:
+            self._release(key, fut, error=e)
+            raise
+        except BaseException:
+            self._release(key, fut)  # cancelled: a waiter takes over
+            raise
+        self._release(key, fut, value)
+        return value
+
+    async def astream_or_compute(self, key: str, stream: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Streaming single-flight: the first caller streams upstream and yields
+        chunks as they come; concurrent callers for the same key wait for its
+        final text and get it as one chunk (a cache hit looks the same).
+        """
+        if self.backend is None:
+            async for part in stream():
+                yield part
+            return
+        value = await self._await_inflight(key)
+        if value is not None:
+            yield value
+            return
+        fut = self._own(key)
+        try:
+            value = await self.aget(key)
+            if value is None:
+                parts = []
+                async for part in stream():
+                    parts.append(part)
+                    yield part
+                value = "".join(parts)
+                await self.aset(key, value)
+            else:
+                yield value
+        except Exception as e:
+            self._release(key, fut, error=e)
+            raise
+        except BaseException:
+            self._release(key, fut)  # consumer stopped early or was cancelled: a waiter takes over
+            raise
+        self._release(key, fut, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        if self.backend is None:
+            return compute()
+        while True:
+            with self._sync_lock:
+                entry = self._inflight_sync.get(key)
+                if entry is None:
+                    cached = self.get(key)
+                    if cached is not None:
+                        return cached
+                    entry = self._inflight_sync[key] = (threading.Event(), [])
+                    owner = True
+                else:
+                    owner = False
+            done, error = entry
+            if owner:
+                try:
+                    value = compute()
+                    self.set(key, value)
+                    return value
+                except Exception as e:
+                    error.append(e)
+                    raise
+                finally:
+                    with self._sync_lock:
+                        self._inflight_sync.pop(key, None)
+                    done.set()
+            self.stats["shared"] += 1
+            done.wait()
+            if error:
+                raise error[0]
+            cached = self.backend.get(key)
+            if cached is not None:
+                return cached
+            # owner got an empty completion (not cached): try ourselves
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "backend": type(self.backend).__name__ if self.backend else "off",
+            "size": len(self.backend) if self.backend else 0,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+def _make_backend():
+    if PROMPT_CACHE_BACKEND == "sqlite":
+        return SQLiteBackend(PROMPT_CACHE_PATH, PROMPT_CACHE_MAX_ENTRIES)
+    if PROMPT_CACHE_BACKEND == "memory":
+        return MemoryBackend(PROMPT_CACHE_MAX_ENTRIES)
+    return None
+
+prompt_cache = PromptCache(_make_backend())
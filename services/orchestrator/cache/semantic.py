@@ -0,0 +1,111 @@
+import os, copy, time, threading
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+
+# Opt-in: serve a previously generated story when a new problem_text is a
+# near-duplicate (cosine >= threshold) and the emotion tags match.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MAX = int(os.getenv("SEMANTIC_CACHE_MAX", "2048"))
+SEMANTIC_CACHE_TTL_S = float(os.getenv("SEMANTIC_CACHE_TTL_S", str(24 * 3600)))
+
+def tags_key(emotion_tags: Optional[List[str]]) -> str:
+    return "|".join(sorted({t.strip().lower() for t in (emotion_tags or [])}))
+
+class SemanticStoryCache:
+    """
+    In-process ANN-ish index: one preallocated float32 matrix of (already
+    normalized) query embeddings, so a lookup is a single mat-vec product.
+    LRU order + TTL per slot; all methods are thread-safe.
+    """
+
+    def __init__(self, max_entries: int, threshold: float, ttl_s: float, enabled: bool = True):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._vecs: np.ndarray | None = None            # (max_entries, dim), lazily sized
+        self._live = np.zeros(max_entries, dtype=bool)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._tags: list[str | None] = [None] * max_entries
+        self._payloads: list[dict | None] = [None] * max_entries
+        self._lru: OrderedDict[int, None] = OrderedDict()  # slot -> None, oldest first
+        self._free = list(range(max_entries - 1, -1, -1))
+        self.stats = {"hits": 0, "misses": 0, "inserts": 0, "evictions": 0, "expired": 0}
+
+    def _drop(self, slot: int):
+        self._live[slot] = False
+        self._payloads[slot] = None
+        self._tags[slot] = None
+        self._lru.pop(slot, None)
+        self._free.append(slot)
+
+    def lookup(self, embedding, emotion_tags: Optional[List[str]]) -> dict | None:
+        if not self.enabled:
+            return None
+        q = np.asarray(embedding, dtype=np.float32)
+        key = tags_key(emotion_tags)
+        now = time.monotonic()
+        with self._lock:
+            if self._vecs is None or not self._lru:
+                self.stats["misses"] += 1
+                return None
+            for slot in np.flatnonzero(self._live & (self._expires <= now)):
+                self._drop(int(slot))
+                self.stats["expired"] += 1
+            sims = self._vecs @ q
+            sims[~self._live] = -1.0
+            for slot in np.argsort(-sims)[:8]:  # best few; tags must match too
+                slot = int(slot)
+                if sims[slot] < self.threshold:
+                    break
+                if self._tags[slot] == key:
+                    self._lru.move_to_end(slot)
+                    self.stats["hits"] += 1
+                    return copy.deepcopy(self._payloads[slot])
+            self.stats["misses"] += 1
+            return None
+
+    def insert(self, embedding, emotion_tags: Optional[List[str]], story_payload: dict):
+        if not self.enabled:
+            return
+        q = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            if self._vecs is None:
+                self._vecs = np.zeros((self.max_entries, q.shape[0]), dtype=np.float32)
+            if not self._free:
+                oldest, _ = self._lru.popitem(last=False)
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+            slot = self._free.pop()
+            self._vecs[slot] = q
+            self._live[slot] = True
+            self._expires[slot] = time.monotonic() + self.ttl_s
+            self._tags[slot] = tags_key(emotion_tags)
+            self._payloads[slot] = copy.deepcopy(story_payload)
+            self._lru[slot] = None
+            self.stats["inserts"] += 1
+
+    def clear(self):
+        with self._lock:
+            for slot in list(self._lru):
+                self._drop(slot)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "enabled": self.enabled,
+                "size": len(self._lru),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+story_cache = SemanticStoryCache(
+    max_entries=SEMANTIC_CACHE_MAX,
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    ttl_s=SEMANTIC_CACHE_TTL_S,
+    enabled=SEMANTIC_CACHE_ENABLED,
+)
@@ -0,0 +1,128 @@
+from typing import List
+from sqlalchemy import select, update, insert, func, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session as SASession
+from models_db import User, Session as DBSession, Story as DBStory, Totals, Chat, ChatTurn, uuid4, CURRENT_XID
+
+def create_user_session(db: SASession, user_id: str, problem_text: str, emotion_tags: List[str]) -> str:
+    """
+    Upsert the user (+ courage bonus on first visit) and open a story session,
+    in one statement. Returns the new session id; caller owns the commit.
+
+    users and totals are INSERT ... ON CONFLICT DO NOTHING in CTEs, so only the
+    request that actually created the user grants the bonus: concurrent first
+    requests for one user_id wait on the users key instead of racing to insert.
+    """
+    new_user = (
+        pg_insert(User).values(id=user_id)
+        .on_conflict_do_nothing(index_elements=[User.id])
+        .returning(User.id)
+        .cte("new_user")
+    )
+    bonus = (
+        pg_insert(Totals).from_select(
+            ["user_id", "karmic_points", "streak_days", "change_xid"],
+            select(new_user.c.id, literal(15), literal(0), CURRENT_XID),  # courage bonus
+        )
+        .on_conflict_do_nothing(index_elements=[Totals.user_id])
+        .cte("new_totals")
+    )
+    return db.execute(
+        insert(DBSession)
+        # id set here: SQLAlchemy skips Python-side column defaults on an
+        # INSERT that carries CTEs, which would send id=NULL
+        .values(id=uuid4(), user_id=user_id, problem_text=problem_text,
+                emotion_tags=emotion_tags, last_stage="story")
+        .returning(DBSession.id)
+        .add_cte(new_user, bonus)
+    ).scalar_one()
+
+def save_story(db: SASession, user_id: str, session_id: str, story_payload: dict) -> str:
+    story = DBStory(
+        user_id=user_id,
+        session_id=session_id,
+        story_json=story_payload,
+        citations_json=[c for c in story_payload.get("citations", [])],
+    )
+    db.add(story)
+    db.flush()
+    return story.id
+
+def story_row(user_id: str, session_id: str, story_payload: dict) -> dict:
+    """A stories row with its id assigned up front, for insert_stories / the story writer."""
+    return {
+        "id": uuid4(),
+        "user_id": user_id,
+        "session_id": session_id,
+        "story_json": story_payload,
+        "citations_json": [c for c in story_payload.get("citations", [])],
+    }
+
+def insert_stories(db: SASession, rows: List[dict]) -> None:
+    """
+    One multi-row INSERT. ON CONFLICT (id) DO NOTHING makes a retry after an
+    ambiguous failure (e.g. the connection dropped around COMMIT) a no-op.
+    """
+    if rows:
+        db.execute(pg_insert(DBStory).values(rows).on_conflict_do_nothing(index_elements=[DBStory.id]))
+
+def append_turns(db: SASession, chat_id: str, turns: List[dict]) -> int:
+    """
+    Append turns to a chat with INSERTs only; returns the chat's new turn count.
+    The counter bump reserves the seq range and row-locks the chat until commit,
+    so concurrent turns on one chat queue up instead of overwriting each other.
+    """
+    count = db.execute(
+        update(Chat).where(Chat.id == chat_id)
+        .values(turn_count=Chat.turn_count + len(turns))
+        .returning(Chat.turn_count)
+    ).scalar_one()
+    first = count - len(turns) + 1
+    db.execute(insert(ChatTurn), [
+        {"chat_id": chat_id, "seq": first + i, "role": t["role"], "body": t["text"]}
+        for i, t in enumerate(turns)
+    ])
+    return count
+
+def recent_turns(db: SASession, chat_id: str, n: int) -> List[dict]:
+    """Last `n` turns of a chat, oldest first (an index range scan on (chat_id, seq))."""
+    rows = db.execute(
+        select(ChatTurn.role, ChatTurn.body)
+        .where(ChatTurn.chat_id == chat_id)
+        .order_by(ChatTurn.seq.desc())
+        .limit(n)
+    ).all()
+    return [{"role": r.role, "text": r.body} for r in reversed(rows)]
+
+def load_chat_context(db: SASession, session_id: str) -> dict | None:
+    """
+    Everything guide_chat reads, in one round trip: the session, whether its
+    user exists, the latest story's citations, and the session's chats as
+    {persona: chat_id}. None if the session doesn't exist.
+    """
+    latest_citations = (
+        select(DBStory.citations_json)
+        .where(DBStory.session_id == DBSession.id)
+        .order_by(DBStory.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    chats = (
+        select(func.json_object_agg(Chat.persona, Chat.id))
+        .where(Chat.session_id == DBSession.id)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(DBSession, User.id, latest_citations, chats)
+        .outerjoin(User, User.id == DBSession.user_id)
+        .where(DBSession.id == session_id)
+    ).first()
+    if row is None:
+        return None
+    session, user_id, citations, chat_ids = row
+    return {
+        "session": session,
+        "user_exists": user_id is not None,
+        "last_citations": citations,
+        "chats": chat_ids or {},
+    }
@@ -1,5 +1,6 @@
 import os, pathlib
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from dotenv import load_dotenv
 
@@ -9,13 +10,35 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError(f"DATABASE_URL is not set. Expected in {ENV_PATH}")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True , future=True)
+# Pool sizing, per engine. The sync and async engines each get a pool this
+# size, so keep 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) per worker under Postgres'
+# max_connections while both are in use.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT_S = float(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))  # under most LB/pgbouncer idle cutoffs
+# asyncpg prepared statement cache per connection; 0 behind pgbouncer in transaction mode
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+# async endpoints use the asyncpg engine instead of the sync engine on the DB pool
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+def _pool_kwargs(url) -> dict:
+    if url.get_backend_name() == "sqlite":
+        return {}  # bench/dev sqlite uses SQLAlchemy's single-connection pools
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_S,
+        "pool_recycle": DB_POOL_RECYCLE_S,
+    }
+
+engine = create_engine(DATABASE_URL, pool_pre_ping=True , future=True, **_pool_kwargs(make_url(DATABASE_URL)))
 # AFTER ✅
 SessionLocal = sessionmaker(
     bind=engine,
     autoflush=False,
     autocommit=False,
-    expire_on_commit=False,   
+    expire_on_commit=False,
 )
 
 class Base(DeclarativeBase):
@@ -27,3 +50,65 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# --- async engine (asyncpg), created on first use so sync-only tools never import it ---
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+def async_database_url() -> str:
+    """DATABASE_URL with its driver swapped for asyncpg (postgresql+psycopg:// -> postgresql+asyncpg://)."""
+    url = make_url(os.getenv("DATABASE_ASYNC_URL") or DATABASE_URL)
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() != "asyncpg":
+        url = url.set(drivername="postgresql+asyncpg")
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict({"prepared_statement_cache_size": str(DB_STATEMENT_CACHE_SIZE)})
+    return url.render_as_string(hide_password=False)
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = make_url(async_database_url())
+        connect_args = {}
+        if url.get_driver_name() == "asyncpg":
+            connect_args["statement_cache_size"] = DB_STATEMENT_CACHE_SIZE
+        _async_engine = create_async_engine(
+            url, pool_pre_ping=True, connect_args=connect_args, **_pool_kwargs(url),
+        )
+    return _async_engine
+
+def AsyncSessionLocal():
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _AsyncSessionLocal()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _AsyncSessionLocal = None
+
+def pool_stats() -> dict:
+    """Connections checked out / idle / overflow for each engine that exists."""
+    def stats(pool):
+        if not hasattr(pool, "checkedout"):
+            return {"status": pool.status()}
+        return {"in_use": pool.checkedout(), "idle": pool.checkedin(),
+                "overflow": pool.overflow(), "size": pool.size()}
+    out = {"sync": stats(engine.pool), "async_enabled": DB_ASYNC}
+    if _async_engine is not None:
+        out["async"] = stats(_async_engine.sync_engine.pool)
+    return out
@@ -0,0 +1,59 @@
+import os, asyncio, functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded pools for blocking work called from async handlers.
+# Embedding is CPU-bound, so keep it small; DB calls mostly wait on I/O.
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "2"))
+DB_WORKERS = int(os.getenv("DB_WORKERS", "8"))
+RERANK_WORKERS = int(os.getenv("RERANK_WORKERS", "1"))
+
+embed_pool = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix="embed")
+db_pool = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db")
+# separate from embed_pool: reranking is awaited (with a deadline) from code
+# already running on an embed worker, so sharing would risk self-deadlock
+rerank_pool = ThreadPoolExecutor(max_workers=RERANK_WORKERS, thread_name_prefix="rerank")
+
+async def run_in_pool(pool: ThreadPoolExecutor, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+
+async def run_embedding(fn, *args, **kwargs):
+    """Run a blocking encode / vector query on the embedding pool."""
+    return await run_in_pool(embed_pool, fn, *args, **kwargs)
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Run fn(db, *args) with its own SQLAlchemy session.
+    Commits if fn returns normally, rolls back (via close) if it raises.
+    With DB_ASYNC, fn runs on the asyncpg engine via AsyncSession.run_sync
+    (no db_pool thread); otherwise on db_pool with the sync engine.
+    """
+    from db import DB_ASYNC  # lazy: rag/ scripts use the embed pool without a DB
+
+    if DB_ASYNC:
+        return await run_db_async(fn, *args, **kwargs)
+    return await run_db_sync(fn, *args, **kwargs)
+
+async def run_db_sync(fn, *args, **kwargs):
+    from db import SessionLocal
+
+    def _call():
+        with SessionLocal() as db:
+            out = fn(db, *args, **kwargs)
+            db.commit()
+            return out
+    return await run_in_pool(db_pool, _call)
+
+async def run_db_async(fn, *args, **kwargs):
+    # the same sync crud functions, driven over asyncpg on the event loop
+    from db import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        out = await db.run_sync(fn, *args, **kwargs)
+        await db.commit()
+        return out
+
+def shutdown_pools():
+    embed_pool.shutdown(wait=False, cancel_futures=True)
+    rerank_pool.shutdown(wait=False, cancel_futures=True)
+    db_pool.shutdown(wait=True)
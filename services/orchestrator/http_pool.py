@@ -0,0 +1,57 @@
+import os, asyncio
+from urllib.parse import urlsplit
+import httpx
+
+# One connection-pooled client for every outbound LLM / search call, so we
+# pay the TCP+TLS handshake to OpenRouter once per connection, not per call.
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "60"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "16"))  # in-flight requests per host
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "60"))
+
+try:
+    import h2  # noqa: F401  (httpx only speaks HTTP/2 when h2 is installed)
+    HTTP2 = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+except ImportError:
+    HTTP2 = False
+
+_client: httpx.AsyncClient | None = None
+_host_limits: dict[str, asyncio.Semaphore] = {}
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=HTTP_TIMEOUT_S,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_S,
+            ),
+        )
+    return _client
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    sem = _host_limits.get(host)
+    if sem is None:
+        sem = _host_limits[host] = asyncio.Semaphore(HTTP_PER_HOST_LIMIT)
+    return sem
+
+async def post_json(url: str, *, headers: dict | None = None, json: dict | None = None,
+                    timeout: float | None = None) -> dict:
+    """POST json through the shared client; raises on non-2xx."""
+    async with _host_limit(url):
+        r = await get_http_client().post(url, headers=headers, json=json,
+                                         timeout=timeout or HTTP_TIMEOUT_S)
+        r.raise_for_status()
+        return r.json()
+
+async def aclose_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _host_limits.clear()
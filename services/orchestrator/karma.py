@@ -0,0 +1,131 @@
+import os, threading
+
+from sqlalchemy import Date, cast, case, event, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session as SASession
+
+from cache.lru import LRUCache
+from crud import create_user_session
+from models_db import Totals, CURRENT_XID
+
+# Karmic points and streaks, kept in the totals row and updated in place:
+# every award is one upsert that adds the points and advances the streak from
+# last_active, so neither needs the user's history. Day boundaries are in
+# KARMA_TZ, evaluated by Postgres against its own clock.
+KARMA_STORY_POINTS = int(os.getenv("KARMA_STORY_POINTS", "5"))
+KARMA_CHAT_POINTS = int(os.getenv("KARMA_CHAT_POINTS", "1"))
+KARMA_TZ = os.getenv("KARMA_TZ", "UTC")
+PROGRESS_CACHE_MAX = int(os.getenv("PROGRESS_CACHE_MAX", "100000"))
+PROGRESS_CACHE_TTL_S = float(os.getenv("PROGRESS_CACHE_TTL_S", "5"))
+
+# (level, minimum points), highest first
+LEVELS = [("Sage", 200), ("Practitioner", 120), ("Seeker", 60), ("Starter", 0)]
+
+# per worker: another worker's award shows up here once the TTL lapses
+_progress = LRUCache(PROGRESS_CACHE_MAX, PROGRESS_CACHE_TTL_S)
+_progress_lock = threading.Lock()
+
+def _remember(user_id: str, out: dict):
+    """Cache `out` unless a higher total is already cached (points only grow;
+    concurrent awards can finish out of order)."""
+    with _progress_lock:
+        cur = _progress.get(user_id)
+        if cur is None or out["karmic_points"] >= cur["karmic_points"]:
+            _progress.set(user_id, out)
+
+def level_from_points(points: int) -> str:
+    for name, floor in LEVELS:
+        if points >= floor:
+            return name
+    return LEVELS[-1][0]
+
+def _day(ts):
+    return cast(func.timezone(KARMA_TZ, ts), Date)
+
+def _week(ts):
+    """Monday of ts's week, in KARMA_TZ."""
+    return cast(func.date_trunc("week", func.timezone(KARMA_TZ, ts)), Date)
+
+def award(db: SASession, user_id: str, points: int) -> dict:
+    """
+    Add `points` and count today towards the streak, atomically; returns the
+    new {"karmic_points", "streak_days"}. Caller owns the commit; the
+    /progress cache is only updated once that commit succeeds.
+
+    The UPDATE reads karmic_points / streak_days / last_active from the locked
+    row, so concurrent awards for one user serialize on it and none is lost.
+    Streak: first activity or a gap of 2+ days -> 1, active yesterday -> +1,
+    already active today -> unchanged. week_points restarts with a new week.
+    """
+    today = _day(func.now())
+    last_day = _day(Totals.last_active)
+    this_week = _week(func.now())
+    stmt = pg_insert(Totals).values(user_id=user_id, karmic_points=points, streak_days=1, last_active=func.now(),
+                                    week_start=this_week, week_points=points, change_xid=CURRENT_XID)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Totals.user_id],
+        set_={
+            "karmic_points": Totals.karmic_points + stmt.excluded.karmic_points,
+            "streak_days": case(
+                (Totals.last_active.is_(None), 1),
+                (last_day >= today, func.greatest(Totals.streak_days, 1)),
+                (last_day == today - 1, Totals.streak_days + 1),
+                else_=1,
+            ),
+            "last_active": func.greatest(Totals.last_active, stmt.excluded.last_active),
+            "week_points": case(
+                (Totals.week_start == stmt.excluded.week_start, Totals.week_points + stmt.excluded.week_points),
+                else_=stmt.excluded.week_points,
+            ),
+            "week_start": stmt.excluded.week_start,
+            "updated_at": func.clock_timestamp(),
+            "change_xid": CURRENT_XID,
+        },
+    ).returning(Totals.karmic_points, Totals.streak_days, Totals.week_start, Totals.week_points)
+    row = db.execute(stmt).one()
+    out = {"karmic_points": row.karmic_points, "streak_days": row.streak_days}
+    db.info.setdefault("karma_pending", []).append(
+        (user_id, out, (row.karmic_points, row.week_start, row.week_points)))
+    return out
+
+@event.listens_for(SASession, "after_commit")
+def _after_commit(session):
+    # the award is durable now; a rollback just drops the pending list
+    from leaderboard import board  # lazy: leaderboard imports this module
+
+    for user_id, out, ranked in session.info.pop("karma_pending", ()):
+        _remember(user_id, out)
+        board.apply(user_id, *ranked)
+
+@event.listens_for(SASession, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    session.info.pop("karma_pending", None)
+
+def start_story(db: SASession, user_id: str, problem_text: str, emotion_tags: list[str]) -> str:
+    """create_user_session plus the story award, in one transaction."""
+    session_id = create_user_session(db, user_id, problem_text, emotion_tags)
+    award(db, user_id, KARMA_STORY_POINTS)
+    return session_id
+
+def cached_progress(user_id: str) -> dict | None:
+    return _progress.get(user_id)
+
+def load_progress(db: SASession, user_id: str) -> dict:
+    """
+    Points and the streak as of today: a streak whose last activity is older
+    than yesterday reads as 0 (without writing). A missing row reads as zeros.
+    """
+    last_day = _day(Totals.last_active)
+    row = db.execute(
+        select(
+            Totals.karmic_points,
+            case((last_day >= _day(func.now()) - 1, Totals.streak_days), else_=0).label("streak_days"),
+        ).where(Totals.user_id == user_id)
+    ).first()
+    out = {"karmic_points": row.karmic_points or 0, "streak_days": row.streak_days or 0} if row else \
+          {"karmic_points": 0, "streak_days": 0}
+    _remember(user_id, out)
+    return out
+
+def progress_cache_stats() -> dict:
+    return _progress.snapshot()
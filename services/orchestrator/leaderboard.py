@@ -0,0 +1,149 @@
+import os, time, threading
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from rank_index import RankIndex
+from karma import KARMA_TZ, LEVELS
+
+# Leaderboard over totals: two RankIndex rankings (all-time karmic_points and
+# this week's week_points) kept in-process. karma.award feeds this worker's
+# own awards once they commit; a background thread loads every row once, then
+# reads only rows changed since its last pass (awards made by other workers),
+# so no request ever scans totals.
+#
+# "Changed since" is by transaction id, not time: each pass remembers the
+# xmin of its snapshot (every transaction below it had finished), and the
+# next pass reads rows whose change_xid >= that xmin. Awards become visible
+# at commit, not when they are written: guide_chat and start_story award
+# first and commit after their other writes, and workers commit in any
+# order. A transaction still open during a pass has an id >= xmin, so its
+# rows are picked up by whichever pass first sees it committed; an
+# updated_at or sequence watermark would already have moved past them.
+LEADERBOARD_ENABLED = os.getenv("LEADERBOARD_ENABLED", "true").lower() == "true"
+LEADERBOARD_REFRESH_S = float(os.getenv("LEADERBOARD_REFRESH_S", "2"))
+LEADERBOARD_PAGE_MAX = int(os.getenv("LEADERBOARD_PAGE_MAX", "100"))
+
+def current_week() -> date:
+    """Monday of this week in KARMA_TZ (what Postgres' date_trunc('week') gives)."""
+    today = datetime.now(ZoneInfo(KARMA_TZ)).date()
+    return today - timedelta(days=today.weekday())
+
+class Leaderboard:
+    def __init__(self):
+        self.all = RankIndex()
+        self.week = RankIndex()
+        self._week = current_week()
+        self._watermark: int | None = None  # snapshot xmin of the last pass
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.loaded = False
+        self.stats = {"rows_loaded": 0, "refreshes": 0, "rows_refreshed": 0, "errors": 0,
+                      "load_ms": 0.0, "last_refresh_ms": 0.0}
+
+    def _index(self, scope: str) -> RankIndex:
+        if scope == "week":
+            self._roll()
+            return self.week
+        return self.all
+
+    def _roll(self):
+        week = current_week()
+        if week != self._week:
+            self.week.clear()  # last week's points no longer count
+            self._week = week
+
+    def apply(self, user_id: str, karmic_points: int, week_start: date | None, week_points: int):
+        """
+        Record a totals row. Points only grow, so a row with fewer points than
+        the index holds is an older version (an award and a refresh racing)
+        and is ignored.
+        """
+        self._roll()
+        cur = self.all.score(user_id)
+        if cur is not None and (karmic_points or 0) < cur:
+            return
+        self.all.set(user_id, karmic_points or 0)
+        if week_start == self._week and week_points:
+            self.week.set(user_id, week_points)
+        else:
+            self.week.remove(user_id)
+
+    # --- reads ---
+
+    def top(self, scope: str = "week", offset: int = 0, limit: int = 20) -> list[dict]:
+        limit = max(0, min(limit, LEADERBOARD_PAGE_MAX))
+        return [{"rank": r, "user_id": u, "points": s}
+                for r, u, s in self._index(scope).page(offset, limit)]
+
+    def rank(self, user_id: str, scope: str = "week") -> dict | None:
+        found = self._index(scope).rank(user_id)
+        return {"rank": found[0], "points": found[1]} if found else None
+
+    def total(self, scope: str = "week") -> int:
+        return len(self._index(scope))
+
+    def levels(self) -> dict[str, int]:
+        """All-time users per level, from LEVELS' point floors."""
+        out, hi = {}, None
+        for name, floor in LEVELS:
+            out[name] = self.all.count_between(floor, hi)
+            hi = floor
+        return out
+
+    # --- feed from the DB ---
+
+    def _read(self, since: int | None) -> int:
+        from sqlalchemy import select, text  # lazy: the index itself needs no DB
+        from db import SessionLocal
+        from models_db import Totals
+
+        q = select(Totals.user_id, Totals.karmic_points, Totals.week_start, Totals.week_points)
+        if since is not None:
+            q = q.where(Totals.change_xid >= since)
+        n = 0
+        with SessionLocal() as db:
+            # one snapshot for both statements: the rows read and the xmin kept
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            xmin = db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar_one()
+            for row in db.execute(q.execution_options(yield_per=10000)):
+                self.apply(row.user_id, row.karmic_points, row.week_start, row.week_points)
+                n += 1
+        self._watermark = xmin
+        return n
+
+    def load(self):
+        t0 = time.perf_counter()
+        self.stats["rows_loaded"] = self._read(None)
+        self.stats["load_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        self.loaded = True
+
+    def refresh(self):
+        t0 = time.perf_counter()
+        self.stats["rows_refreshed"] += self._read(self._watermark)
+        self.stats["refreshes"] += 1
+        self.stats["last_refresh_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh() if self.loaded else self.load()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print("⚠️ leaderboard refresh failed:", e)
+            self._stop.wait(LEADERBOARD_REFRESH_S)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="leaderboard", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self) -> dict:
+        s = dict(self.stats)
+        s.update(loaded=self.loaded, users=len(self.all), active_this_week=len(self.week),
+                 week_start=self._week.isoformat())
+        return s
+
+board = Leaderboard()
@@ -1,17 +1,62 @@
 import os
+from typing import AsyncIterator
 import google.generativeai as genai
 from dotenv import load_dotenv
+from cache.prompt import prompt_cache, prompt_key
 
 load_dotenv()
 
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+_models: dict[str, genai.GenerativeModel] = {}
+
+def get_gemini_model(name: str = GEMINI_MODEL) -> genai.GenerativeModel:
+    """Model objects are reusable; build each one once per process."""
+    model = _models.get(name)
+    if model is None:
+        model = _models[name] = genai.GenerativeModel(name)
+    return model
+
 def generate_with_gemini(prompt: str) -> str:
     """
     Call Gemini (Flash 2.0) and return text response.
     """
-    model = genai.GenerativeModel("gemini-2.0-flash")
-    resp = model.generate_content(prompt)
+    def call() -> str:
+        resp = get_gemini_model().generate_content(prompt)
+        # When Gemini streams chunks, resp.text combines everything
+        return resp.text
+
+    return prompt_cache.get_or_compute(prompt_key("gemini", GEMINI_MODEL, prompt), call)
+
+async def agenerate_with_gemini(prompt: str) -> str:
+    """
+    Async variant: uses the SDK's native async client so the event loop
+    keeps serving other streams while Gemini is thinking.
+    """
+    async def call() -> str:
+        resp = await get_gemini_model().generate_content_async(prompt)
+        return resp.text
+
+    return await prompt_cache.aget_or_compute(prompt_key("gemini", GEMINI_MODEL, prompt), call)
+
+async def astream_gemini(prompt: str) -> AsyncIterator[str]:
+    """
+    Yield text chunks as Gemini writes them (for SSE forwarding).
+    Joining every chunk gives the same text as agenerate_with_gemini, and
+    shares its prompt cache and single-flight: a hit, or an identical prompt
+    already streaming, is yielded as one chunk once its text is complete.
+    """
+    async def stream() -> AsyncIterator[str]:
+        resp = await get_gemini_model().generate_content_async(prompt, stream=True)
+        async for chunk in resp:
+            try:
+                text = chunk.text
+            except ValueError:
+                # chunk without text parts (e.g. safety / finish metadata)
+                continue
+            if text:
+                yield text
 
-    # When Gemini streams chunks, resp.text combines everything
-    return resp.text
+    async for text in prompt_cache.astream_or_compute(prompt_key("gemini", GEMINI_MODEL, prompt), stream):
+        yield text
@@ -1,6 +1,11 @@
-import os, requests
+import os
+import httpx
+from http_pool import post_json, HTTP_TIMEOUT_S
 
-def openrouter_generate(prompt: str):
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_URL = f"{OPENROUTER_BASE_URL.rstrip('/')}/chat/completions"
+
+def _request(prompt: str) -> tuple[dict, dict]:
     headers = {
         "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
         "Content-Type": "application/json"
@@ -10,6 +15,17 @@ def openrouter_generate(prompt: str):
         "model": "deepseek/deepseek-chat",
         "messages": [{"role": "user", "content": prompt}]
     }
+    return headers, body
 
-    r = requests.post("https://openrouter.ai/api/v1/chat/completions", json=body, headers=headers)
+def openrouter_generate(prompt: str):
+    """Blocking call, for scripts and other sync callers; async code uses aopenrouter_generate."""
+    headers, body = _request(prompt)
+    r = httpx.post(OPENROUTER_URL, json=body, headers=headers, timeout=HTTP_TIMEOUT_S)
+    r.raise_for_status()
     return r.json()["choices"][0]["message"]["content"]
+
+async def aopenrouter_generate(prompt: str):
+    """Async variant over the shared pooled client (http_pool)."""
+    headers, body = _request(prompt)
+    data = await post_json(OPENROUTER_URL, json=body, headers=headers)
+    return data["choices"][0]["message"]["content"]
@@ -1,32 +1,88 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
 import re
 
-from agents.lang_graph_story import run_story_pipeline
-from llm.adapter import generate_with_gemini
+from agents.lang_graph_story import run_story_pipeline, get_story_graph
+from agents.planner import plan_sources
+from agents.search_agents import web_search_agent, fallback_insights  # async search via OpenRouter
+from agents.curator import curate_context
+from llm.adapter import generate_with_gemini, astream_gemini
 
 
 from models import (
     StoryRequest, StoryResponse, StoryPayload, Slide, Citation,
     StoryQARequest, StoryQAResponse,
-    GuideChatRequest, GuideChatResponse, PracticeSuggestRequest, PracticeSuggestResponse, PracticeItem
+    GuideChatRequest, GuideChatResponse, PracticeSuggestRequest, PracticeSuggestResponse, PracticeItem,
+    MemoryRecallRequest, MemoryRecallResponse, MemoryItem,
+    LeaderboardScope, LeaderboardEntry, LeaderboardResponse, LeaderboardRankResponse, LeaderboardStatsResponse
 )
 
 from fastapi import Depends , Query
 from sqlalchemy.orm import Session as SASession
-from db import get_db
-from models_db import User, Session as DBSession, Story as DBStory, Totals, Chat as DBChat
-from rag.retrieve import search_gita
+from db import get_db, pool_stats, dispose_async_engine
+from models_db import Chat as DBChat
+from rag.retrieve import search_gita, asearch, works_for_hint, aembed_query, retrieval_cache_stats
 
-from memory.user_memory import summarize_if_needed
+from memory.user_memory import summarize_if_needed, recall, recall_cache_stats, writer as memory_writer
 from persona_router import choose_persona
 
-import os, hashlib, pathlib, asyncio
+import os, json, hashlib, pathlib, asyncio, time
+from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
 from fastapi import BackgroundTasks
-app = FastAPI(title="Rishi.AI Orchestrator")
+from executors import run_db, run_embedding, shutdown_pools
+from rag.rerank import rerank_stats
+from rag.embedder import warm_up, batcher as embed_batcher
+from http_pool import aclose_http_client
+from cache.semantic import story_cache
+from cache.prompt import prompt_cache
+from crud import save_story, story_row, insert_stories, append_turns, recent_turns, load_chat_context
+from story_writer import writer as story_writer, STORY_WRITER_ENABLED
+from leaderboard import board as leaderboard, LEADERBOARD_ENABLED, LEADERBOARD_PAGE_MAX
+from karma import start_story, award, KARMA_CHAT_POINTS, cached_progress, load_progress, progress_cache_stats, level_from_points
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_story_graph()  # compile LangGraph once, before the first /story
+
+    # warm the embedder + Chroma in the background; /ready flips when done
+    app.state.ready = False
+    app.state.cold_start = {}
+
+    async def warm():
+        t = time.perf_counter()
+        try:
+            report = await run_embedding(warm_up)
+            report["total_ms"] = round((time.perf_counter() - t) * 1000, 1)
+            app.state.cold_start = report
+            app.state.ready = True
+        except Exception as e:
+            app.state.cold_start = {"error": repr(e)}
+        print("[startup] cold start:", app.state.cold_start)
+
+    warm_task = asyncio.create_task(warm())
+    # stories spooled by a previous run (DB was down at shutdown) go in first
+    replay_task = asyncio.create_task(asyncio.to_thread(story_writer.replay_spool))
+    if LEADERBOARD_ENABLED:
+        leaderboard.start()  # full load of totals on its own thread, then incremental refreshes
+    yield
+    leaderboard.stop()
+    warm_task.cancel()
+    await aclose_http_client()
+    # flush queued user_memory notes (off the loop; bounded by MEMORY_WRITER_DRAIN_S)
+    if not await asyncio.to_thread(memory_writer.close):
+        print("[shutdown] memory writer did not drain in time:", memory_writer.snapshot())
+    await asyncio.gather(replay_task, return_exceptions=True)
+    if not await asyncio.to_thread(story_writer.close):
+        print("[shutdown] story writer did not drain in time (rest spooled):", story_writer.snapshot())
+    # let in-flight DB writes finish before the worker exits
+    shutdown_pools()
+    await dispose_async_engine()
+
+app = FastAPI(title="Rishi.AI Orchestrator", lifespan=lifespan)
 
 STATIC_DIR = os.getenv("STATIC_DIR", "./static")
 os.makedirs(os.path.join(STATIC_DIR, "tts"), exist_ok=True)
@@ -34,6 +90,7 @@ app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
 MIN_VALID_BYTES = 4096
+SUMMARY_EVERY_N = int(os.getenv("SUMMARY_EVERY_N", "6"))  # chat turns per user_memory note
 
 
 # Allow local Next.js to call the API
@@ -80,39 +137,126 @@ def parse_llm_json(s: str) -> dict:
     return {}
 
 
+class PartialJSONString:
+    """
+    Incremental read of one JSON string value that is still streaming in:
+    feed('{"title": "x", "narr') then feed('ation_text": "You feel hea')
+    returns 'You feel hea'. Each feed() scans only the new text plus at most
+    a held-back escape, so a whole stream is read in linear time.
+    """
+    _TOKEN_RE = re.compile(r'[^"\\]+|\\u[0-9a-fA-F]{4}|\\[^u]')
+
+    def __init__(self, key: str):
+        self._key_re = re.compile(r'"%s"\s*:\s*"' % re.escape(key))
+        self._buf = ""        # unscanned text: a possible key prefix, or an incomplete escape
+        self._found = False
+        self._done = False
+        self.text = ""
+
+    def feed(self, piece: str) -> str:
+        """Add streamed text; returns the newly decoded part of the value ("" if none)."""
+        if self._done:
+            return ""
+        buf = self._buf + piece
+        if not self._found:
+            m = self._key_re.search(buf)
+            if not m:
+                # an unfinished match holds at most two quotes (the key's own):
+                # keep from the second-to-last quote on
+                q = buf.rfind('"')
+                q2 = buf.rfind('"', 0, q) if q > 0 else -1
+                self._buf = buf[q2 if q2 >= 0 else q if q >= 0 else len(buf):]
+                return ""
+            self._found = True
+            buf = buf[m.end():]
+        raw, i = [], 0
+        while i < len(buf):
+            m = self._TOKEN_RE.match(buf, i)
+            if m is None:
+                # the closing quote, an escape that hasn't fully arrived, or
+                # (6+ chars and still no match) a malformed \u escape
+                self._done = buf[i] == '"' or len(buf) - i >= 6
+                break
+            raw.append(m.group(0))
+            i = m.end()
+        try:
+            out = json.loads('"' + "".join(raw) + '"', strict=False)
+        except ValueError:
+            self._done = True
+            return ""
+        if out and "\ud800" <= out[-1] <= "\udbff":
+            # first half of a \u surrogate pair; decode it with the second
+            i -= len(raw[-1])
+            out = out[:-1]
+        self._buf = buf[i:]
+        self.text += out
+        return out
+
+
 @app.get("/health")
 def health():
     return {"ok": True}
 
+@app.get("/ready")
+def ready():
+    """Readiness (vs. liveness in /health): 503 until the embedder is warm."""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse({"ready": False, "cold_start": getattr(app.state, "cold_start", {})}, status_code=503)
+    return {"ready": True, "cold_start": app.state.cold_start}
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "semantic_cache": story_cache.snapshot(),
+        "prompt_cache": prompt_cache.snapshot(),
+        "embed_batcher": embed_batcher.snapshot() if embed_batcher else None,
+        "memory_writer": memory_writer.snapshot(),
+        "memory_recall_cache": recall_cache_stats(),
+        "retrieval_cache": retrieval_cache_stats(),
+        "rerank": rerank_stats(),
+        "db_pool": pool_stats(),
+        "story_writer": story_writer.snapshot(),
+        "progress_cache": progress_cache_stats(),
+        "leaderboard": leaderboard.snapshot(),
+    }
+
+async def lookup_story_cache(req: StoryRequest, emotion_tags: list[str]):
+    """
+    Returns (query_embedding, cached_story_payload). The embedding is handed on
+    to retrieval so the problem text is only encoded once per request.
+    Both are None when the semantic cache is off or bypassed.
+    """
+    if not story_cache.enabled or req.bypass_cache:
+        return None, None
+    try:
+        emb = await aembed_query(req.problem_text)
+    except Exception:
+        return None, None
+    return emb, story_cache.lookup(emb, emotion_tags)
+
 @app.post("/story", response_model=StoryResponse)
-def create_story(req: StoryRequest, db: SASession = Depends(get_db)):
+async def create_story(req: StoryRequest):
     """
     Builds a story via the LangGraph pipeline:
       Router (persona+sources) -> RAG -> (Search stub) -> LLM -> Compose
     Persists user/session/story; returns story + session_id.
+    Runs on the app loop; DB work goes through the DB pool.
     """
-    # 1) Upsert user + courage bonus (first-time)
-    user = db.get(User, req.user_id)
-    if not user:
-        user = User(id=req.user_id)
-        db.add(user)
-        db.flush()
-        db.add(Totals(user_id=user.id, karmic_points=15))  # courage bonus
-
-    # 2) Create a session (store emotion tags for persona/memory)
+    # 1) Upsert user + courage bonus (first-time), 2) create a session (+ story points)
     emotion_tags = (req.emotion_tags or ["anxiety", "overthinking"])
-    sess = DBSession(
-        user_id=user.id,
-        problem_text=req.problem_text,
-        emotion_tags=emotion_tags,
-        last_stage="story",
-    )
-    db.add(sess); db.flush()
+    session_id = await run_db(start_story, req.user_id, req.problem_text, emotion_tags)
 
-    # 3) Run the LangGraph story pipeline (sync endpoint -> run loop locally)
+    # 3) Serve a near-duplicate story from the semantic cache, else run the
+    #    LangGraph story pipeline (shared, precompiled graph)
+    query_emb, cached = await lookup_story_cache(req, emotion_tags)
     try:
-        final_state = asyncio.run(run_story_pipeline(req.problem_text, emotion_tags))
-        story_payload_dict = final_state["story_payload"]
+        if cached:
+            story_payload_dict = cached
+        else:
+            final_state = await run_story_pipeline(req.problem_text, emotion_tags, query_emb)
+            story_payload_dict = final_state["story_payload"]
+            if query_emb is not None and not final_state.get("degraded"):
+                story_cache.insert(query_emb, emotion_tags, story_payload_dict)
     except Exception:
         # ultra-safe fallback if the graph errors
         story_payload_dict = {
@@ -137,63 +281,34 @@ def create_story(req: StoryRequest, db: SASession = Depends(get_db)):
     story_payload = StoryPayload(**story_payload_dict)
 
     # 6) Persist story record (for memory & guide/persona)
-    db.add(DBStory(
-        user_id=user.id,
-        session_id=sess.id,
-        story_json=story_payload.model_dump(),
-        citations_json=[c.model_dump() for c in story_payload.citations]
-    ))
-    db.commit()
+    await run_db(save_story, req.user_id, session_id, story_payload.model_dump())
 
     # 7) Return story + session_id for /guide/chat
-    return StoryResponse(story=story_payload, session_id=sess.id)
-
-from fastapi.responses import StreamingResponse
-import json, asyncio
+    return StoryResponse(story=story_payload, session_id=session_id)
 
-# add these imports near your other imports at the top of main.py
-from rag.retrieve import search_gita
-from llm.adapter import generate_with_gemini
-# make sure the file exists as agents/search_agents.py (plural) or adjust to agents.search_agent
-from agents.search_agents import web_search_agent  # async search via OpenRouter
-from agents.curator import curate_context 
+async def persist_story(user_id: str, session_id: str, story_payload: dict) -> str:
+    """
+    Hand the story to the write-behind writer and return its id right away.
+    Writes inline instead when the writer is off or its queue is full.
+    """
+    row = story_row(user_id, session_id, story_payload)
+    if not (STORY_WRITER_ENABLED and story_writer.submit(row)):
+        await run_db(insert_stories, [row])
+    return row["id"]
 
 @app.post("/story/stream")
-async def story_stream(req: StoryRequest, db: SASession = Depends(get_db)):
+async def story_stream(req: StoryRequest):
     """
     Streams progress to the frontend (SSE) while we build a curated story:
     RAG (scriptures) -> Web Search (snippets) -> Curate -> Gemini -> Compose.
+    Blocking work (embedding, DB) runs on bounded pools so one slow request
+    never freezes the other streams on this worker.
     """
-
-    # 1) Upsert user
-    # ✅ Create user + session first
-    user = db.get(User, req.user_id)
-    if not user:
-        user = User(id=req.user_id)
-        db.add(user)
-        db.flush()                     # <-- generates user.id
-        db.add(Totals(user_id=user.id, karmic_points=15))
-
-    # ✅ Cache scalar user_id BEFORE db commit
-    user_id = user.id
-
     emotion_tags = req.emotion_tags or ["anxiety", "overthinking"]
 
-    sess = DBSession(
-        user_id=user_id,
-        problem_text=req.problem_text,
-        emotion_tags=emotion_tags,
-        last_stage="story",
-    )
-    db.add(sess)
-    db.flush()                          # <-- generates session.id
-
-    # ✅ Cache scalar session_id BEFORE db commit
-    session_id = sess.id
-
-    db.commit()                         # <-- after commit, ORM objects become detached
-
-
+    # 1) Upsert user + create session + story points (committed before streaming so the FK is valid)
+    user_id = req.user_id
+    session_id = await run_db(start_story, user_id, req.problem_text, emotion_tags)
 
     async def event_stream():
         async def send(stage: str, msg: str, extra: dict | None = None):
@@ -204,15 +319,33 @@ async def story_stream(req: StoryRequest, db: SASession = Depends(get_db)):
 
         # UX: staged updates
         yield await send("router", "🧠 Choosing a guide + scripture…")
+
+        # 2) Semantic cache hit: a near-identical problem was answered recently
+        #    (looked up after the first event, so the embedding doesn't delay it)
+        query_emb, cached = await lookup_story_cache(req, emotion_tags)
+        if cached:
+            yield await send("cache", "💫 Found a story that fits…")
+            story_id = await persist_story(user_id, session_id, cached)
+            yield await send("done", "✨ Story generated!", {
+                "story_payload": cached,
+                "session_id": session_id,
+                "story_id": story_id,
+            })
+            return
+
         await asyncio.sleep(0.2)
 
         # 3) RAG (scripture) first
         yield await send("rag", "🔎 Searching sacred texts (RAG)…")
         hits = []
+        degraded = []  # stages that failed soft; such a story isn't cached
         try:
-            hits = search_gita(req.problem_text, k=3)
+            works = works_for_hint(plan_sources(req.problem_text, emotion_tags).get("work"))
+            hits = await asearch(req.problem_text, works, k=3, embedding=query_emb)
         except Exception:
             hits = []
+        if not hits:
+            degraded.append("rag")  # asearch swallows per-work failures; none found is one
 
         rag_context = ""
         citations = []
@@ -230,9 +363,10 @@ async def story_stream(req: StoryRequest, db: SASession = Depends(get_db)):
         # 4) Web search (OpenRouter) — soft fail allowed
         yield await send("search", "🌐 Seeking more context…")
         try:
-            web_results = await web_search_agent(req.problem_text)
+            web_results = await web_search_agent(req.problem_text, soft_fail=False)
         except Exception:
-            web_results = []
+            web_results = fallback_insights(req.problem_text)
+            degraded.append("search")
 
         await asyncio.sleep(0.2)
 
@@ -242,6 +376,7 @@ async def story_stream(req: StoryRequest, db: SASession = Depends(get_db)):
             curated_context = await curate_context(rag_context, web_results)
         except Exception:
             curated_context = ""
+            degraded.append("curate")
 
         await asyncio.sleep(0.2)
 
@@ -277,8 +412,15 @@ Return STRICT JSON only, in this shape:
 }}
 """.strip()
 
-            model_json = generate_with_gemini(final_prompt).strip()
-            data = parse_llm_json(model_json)
+            # stream tokens; forward the narration as it is written
+            parts, narration = [], PartialJSONString("narration_text")
+            async for piece in astream_gemini(final_prompt):
+                parts.append(piece)
+                delta = narration.feed(piece)
+                if delta:
+                    yield await send("narration", "", {"delta": delta})
+            model_json = "".join(parts)
+            data = parse_llm_json(model_json.strip())
             if not data:
                 raise ValueError("Model did not return valid JSON")
 
@@ -316,6 +458,8 @@ Return STRICT JSON only, in this shape:
                 "citations": final_citations,
                 "bg_music_url": "/audio/bg.mp3",
             }
+            if query_emb is not None and not degraded:
+                story_cache.insert(query_emb, emotion_tags, story_payload_dict)
 
         except Exception as e:
             print("Gemini pipeline failed:", e)
@@ -338,19 +482,14 @@ Return STRICT JSON only, in this shape:
                 "bg_music_url": "/audio/bg.mp3",
             }
 
-        # 7) Persist story (FK now valid because we committed earlier)
-        db.add(DBStory(
-        user_id=user_id,
-        session_id=session_id,
-        story_json=story_payload_dict,
-        citations_json=[c for c in story_payload_dict.get("citations", [])]
-    ))
-        db.commit()
+        # 7) Queue the story write (FK valid: the session was committed earlier)
+        story_id = await persist_story(user_id, session_id, story_payload_dict)
 
-        # 8) Final event
+        # 8) Final event, without waiting on Postgres
         yield await send("done", "✨ Story generated!", {
             "story_payload": story_payload_dict,
             "session_id": session_id,
+            "story_id": story_id,
         })
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -375,22 +514,22 @@ def story_qa(req: StoryQARequest):
 @app.post("/guide/chat", response_model=GuideChatResponse)
 def guide_chat(req: GuideChatRequest, db: SASession = Depends(get_db)):
     # session_id is required now (from /story response)
-    session = db.get(DBSession, req.session_id)
-    if not session:
+    # session, user check, latest story and chats: one round trip
+    ctx = load_chat_context(db, req.session_id)
+    if not ctx:
         # If client sent user_id earlier, you could fallback; for now, hard fail for clarity
         raise RuntimeError("Invalid session_id. Create a story first.")
+    session = ctx["session"]
 
-    user = db.get(User, session.user_id)
-    if not user:
+    if not ctx["user_exists"]:
         raise RuntimeError("User not found for session.")
 
-    # Find last story to infer last_work (for persona router)
-    last_story = db.query(DBStory).filter(DBStory.session_id == session.id).order_by(DBStory.created_at.desc()).first()
+    # Last story's citations infer last_work (for persona router)
     last_work = None
-    if last_story and last_story.citations_json:
+    if ctx["last_citations"]:
         try:
             # use first citation's work if present
-            last_work = (last_story.citations_json[0] or {}).get("work")
+            last_work = (ctx["last_citations"][0] or {}).get("work")
         except Exception:
             pass
 
@@ -432,21 +571,24 @@ def guide_chat(req: GuideChatRequest, db: SASession = Depends(get_db)):
         cites = []
 
     # --- persist chat turn ---
-    chat = db.query(DBChat).filter(DBChat.session_id == session.id, DBChat.persona == persona_selected).first()
-    if not chat:
-        chat = DBChat(user_id=session.user_id, session_id=session.id, persona=persona_selected, turns=[])
+    chat_id = ctx["chats"].get(persona_selected)
+    if not chat_id:
+        chat = DBChat(user_id=session.user_id, session_id=session.id, persona=persona_selected)
         db.add(chat)
         db.flush()
+        chat_id = chat.id
 
-    # append user + guide turns
-    turns = chat.turns or []
-    turns.append({"role": "user", "text": req.message})
-    turns.append({"role": "guide", "text": text})
-    chat.turns = turns
-    db.add(chat)
+    # append user + guide turns (INSERT only; the history is never rewritten)
+    turn_count = append_turns(db, chat_id, [
+        {"role": "user", "text": req.message},
+        {"role": "guide", "text": text},
+    ])
+    award(db, session.user_id, KARMA_CHAT_POINTS)
 
-    # summarize to user_memory every N turns
-    summarize_if_needed(user_id=session.user_id, session_id=session.id, turns=turns, every_n=6)
+    # summarize to user_memory every N turns, from the last N only
+    if turn_count % SUMMARY_EVERY_N == 0:
+        summarize_if_needed(user_id=session.user_id, session_id=session.id,
+                            turns=recent_turns(db, chat_id, SUMMARY_EVERY_N), every_n=SUMMARY_EVERY_N)
 
     db.commit()
 
@@ -457,6 +599,22 @@ def guide_chat(req: GuideChatRequest, db: SASession = Depends(get_db)):
         persona_selected=persona_selected
     )
 
+@app.post("/memory/recall", response_model=MemoryRecallResponse)
+async def memory_recall(req: MemoryRecallRequest):
+    """Top-k of this user's chat memories that relate to `text`."""
+    emb = await aembed_query(req.text)
+    hits = await run_embedding(recall, req.user_id, req.text, req.k, emb)
+    return MemoryRecallResponse(memories=[
+        MemoryItem(
+            text=h["doc"],
+            type=h["meta"].get("type", "summary"),
+            session_id=h["meta"].get("session_id"),
+            ts=h["meta"].get("ts"),
+            score=h["score"],
+        )
+        for h in hits
+    ])
+
 @app.post("/practice/suggest", response_model=PracticeSuggestResponse)
 def practice_suggest(req: PracticeSuggestRequest):
     # Very simple, emotion-aware branching (demo)
@@ -494,27 +652,49 @@ class ProgressResponse(BaseModel):
     streak_days: int
     level: str
 
-def level_from_points(points: int) -> str:
-    if points >= 200: return "Sage"
-    if points >= 120: return "Practitioner"
-    if points >= 60:  return "Seeker"
-    return "Starter"
-
 @app.get("/progress", response_model=ProgressResponse)
-def get_progress(user_id: str = Query(...), db: SASession = Depends(get_db)):
-    totals = db.get(Totals, user_id)
-    if not totals:
-        # create with 15 courage bonus if missing (first-time safeguard)
-        totals = Totals(user_id=user_id, karmic_points=15, streak_days=0)
-        db.add(totals); db.commit(); db.refresh(totals)
+async def get_progress(user_id: str = Query(...)):
+    # read-only: served from the short-TTL cache (kept current by awards), else one PK read
+    totals = cached_progress(user_id) or await run_db(load_progress, user_id)
     return ProgressResponse(
-        karmic_points=totals.karmic_points or 0,
-        streak_days=totals.streak_days or 0,
-        level=level_from_points(totals.karmic_points or 0)
+        karmic_points=totals["karmic_points"],
+        streak_days=totals["streak_days"],
+        level=level_from_points(totals["karmic_points"])
     )
 
 
 
+# leaderboard: served from the in-process rank indexes, never a scan of totals
+@app.get("/leaderboard", response_model=LeaderboardResponse)
+def get_leaderboard(scope: LeaderboardScope = "week", offset: int = Query(0, ge=0),
+                    limit: int = Query(20, ge=1, le=LEADERBOARD_PAGE_MAX)):
+    """Top seekers (this week by default), ranked by points, paginated."""
+    return LeaderboardResponse(
+        scope=scope,
+        total=leaderboard.total(scope),
+        entries=[LeaderboardEntry(level=level_from_points(e["points"]), **e)
+                 for e in leaderboard.top(scope, offset, limit)],
+    )
+
+@app.get("/leaderboard/rank", response_model=LeaderboardRankResponse)
+def get_leaderboard_rank(user_id: str = Query(...), scope: LeaderboardScope = "week"):
+    found = leaderboard.rank(user_id, scope) or {}
+    all_time = leaderboard.all.score(user_id) or 0
+    return LeaderboardRankResponse(
+        user_id=user_id, scope=scope, total=leaderboard.total(scope),
+        rank=found.get("rank"), points=found.get("points", 0),
+        level=level_from_points(all_time),
+    )
+
+@app.get("/leaderboard/stats", response_model=LeaderboardStatsResponse)
+def get_leaderboard_stats():
+    """User counts per level (all-time points) and how many earned points this week."""
+    return LeaderboardStatsResponse(
+        users=leaderboard.total("all"),
+        active_this_week=leaderboard.total("week"),
+        levels=leaderboard.levels(),
+    )
+
 # agents planning
 class KnowledgePlanRequest(BaseModel):
     problem_text: str
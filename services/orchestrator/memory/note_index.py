@@ -0,0 +1,122 @@
+import os, sqlite3, threading
+from typing import Iterable, List, Tuple
+
+# user_id -> note ids for the user_memory collection, in its own SQLite file
+# next to Chroma's (never inside Chroma's schema). Chroma has no index on
+# metadata values, so where={"user_id": ...} reads every note's metadata;
+# with this, loading one user's notes is an index seek here plus a by-id get.
+#
+# Every process writing user_memory goes through memory.user_memory and
+# shares this file, so:
+# - ids are added before a note is written to Chroma and removed after it
+#   is deleted there; a crash in between leaves a dangling id (skipped on
+#   read), never a note that recall can't find
+# - a user is "complete" once their ids here are known to be all of them:
+#   every user, if the index was created over an empty collection; otherwise
+#   after one where={"user_id": ...} read fills them in (fill)
+# - each user has a version, bumped by every change to their ids, so a
+#   process can tell whether its cached copy of a user's notes is current
+
+class NoteIndex:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS notes ("
+            " user_id TEXT NOT NULL, id TEXT NOT NULL, ts TEXT NOT NULL,"
+            " PRIMARY KEY (user_id, id)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            " user_id TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0,"
+            " complete INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._lock = threading.Lock()
+        self._born_complete: bool | None = None  # meta.born_complete, once recorded
+
+    def _write(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                fn(self._conn)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _bump(conn, user_ids: Iterable[str], complete: bool = False):
+        conn.executemany(
+            "INSERT INTO users (user_id, version, complete) VALUES (?, 1, ?)"
+            " ON CONFLICT (user_id) DO UPDATE SET version = version + 1,"
+            " complete = max(complete, excluded.complete)",
+            [(u, int(complete)) for u in dict.fromkeys(user_ids)],
+        )
+
+    def add(self, rows: Iterable[Tuple[str, str, str]]):
+        """(user_id, note_id, ts) rows; re-adding an id is a no-op."""
+        rows = list(rows)
+        def fn(conn):
+            conn.executemany("INSERT OR IGNORE INTO notes (user_id, id, ts) VALUES (?, ?, ?)", rows)
+            self._bump(conn, (r[0] for r in rows))
+        self._write(fn)
+
+    def fill(self, user_id: str, rows: Iterable[Tuple[str, str]]) -> int:
+        """All of a user's (note_id, ts), as read from Chroma; marks the user complete, returns their version."""
+        rows = [(user_id, i, ts) for i, ts in rows]
+        version = []
+        def fn(conn):
+            conn.executemany("INSERT OR IGNORE INTO notes (user_id, id, ts) VALUES (?, ?, ?)", rows)
+            self._bump(conn, [user_id], complete=True)
+            version.append(conn.execute("SELECT version FROM users WHERE user_id = ?", (user_id,)).fetchone()[0])
+        self._write(fn)
+        return version[0]
+
+    def remove(self, user_id: str, ids: List[str]):
+        def fn(conn):
+            conn.executemany("DELETE FROM notes WHERE user_id = ? AND id = ?", [(user_id, i) for i in ids])
+            self._bump(conn, [user_id])
+        self._write(fn)
+
+    def state(self, user_id: str) -> Tuple[int, bool]:
+        """(version, complete) for a user; version 0 if the index has never seen them."""
+        with self._lock:
+            row = self._conn.execute("SELECT version, complete FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        version, complete = row or (0, 0)
+        return version, bool(complete) or bool(self.born_complete())
+
+    def ids(self, user_id: str) -> List[str]:
+        """The user's note ids, oldest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM notes WHERE user_id = ? ORDER BY ts", (user_id,)).fetchall()
+        return [r[0] for r in rows]
+
+    def count(self, user_id: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM notes WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def touch(self, user_ids: Iterable[str]):
+        """Bump versions after the Chroma write that follows add(), so a copy read in between goes stale."""
+        self._write(lambda conn: self._bump(conn, user_ids))
+
+    def born_complete(self) -> bool | None:
+        """Whether the index was started over an empty collection; None until recorded."""
+        if self._born_complete is None:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'born_complete'").fetchone()
+            if row is not None:
+                self._born_complete = row[0] == "1"
+        return self._born_complete
+
+    def mark_born_complete(self, collection_empty: bool):
+        """Record, once, whether the collection was empty when this index started."""
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('born_complete', ?)",
+                               ("1" if collection_empty else "0",))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,40 @@
+import os
 from typing import List
 from datetime import datetime
-from rag.chroma_client import get_collection
-from rag.embedder import embed_texts
+import numpy as np
+from rag.chroma_client import CHROMA_DIR, get_collection, upsert, bump_collection_version
+from rag.embedder import encode_batch, embed_texts
+from cache.lru import LRUCache
+from .note_index import NoteIndex
+from .writer import (MemoryWriter, MEMORY_WRITER_ENABLED, MEMORY_WRITER_BATCH,
+                     MEMORY_WRITER_FLUSH_MS, MEMORY_WRITER_MAX_QUEUE)
 
 COLLECTION_NAME = "user_memory"
 
+# Retention: once a user has more than USER_MEMORY_MAX_NOTES +
+# USER_MEMORY_COMPACT_SLACK notes, their oldest are folded into one "digest"
+# note, leaving USER_MEMORY_MAX_NOTES; so recall cost per user is bounded no
+# matter how much they chat, and the full reload compaction needs happens once
+# per SLACK writes rather than after every one.
+# Hot cache: user_id -> all of that user's notes + embeddings, stamped with
+# the user's note_index version; a write for that user from any process
+# bumps the version and makes the entry stale.
+USER_MEMORY_MAX_NOTES = int(os.getenv("USER_MEMORY_MAX_NOTES", "50"))
+USER_MEMORY_COMPACT_SLACK = int(os.getenv("USER_MEMORY_COMPACT_SLACK", "10"))
+USER_MEMORY_INDEX_PATH = os.getenv("USER_MEMORY_INDEX_PATH", os.path.join(CHROMA_DIR, "user_memory_notes.sqlite3"))
+USER_MEMORY_DIGEST_CHARS = int(os.getenv("USER_MEMORY_DIGEST_CHARS", "600"))
+_hot = LRUCache(int(os.getenv("USER_MEMORY_HOT_USERS", "10000")),
+                ttl_s=float(os.getenv("USER_MEMORY_HOT_TTL_S", "600")))
+
+note_index = NoteIndex(USER_MEMORY_INDEX_PATH)
+
 def _col():
-    return get_collection(COLLECTION_NAME)
+    col = get_collection(COLLECTION_NAME)
+    if note_index.born_complete() is None:
+        # first use of the index: over an empty collection every user's ids
+        # will be in it; otherwise each user is filled in on first read
+        note_index.mark_born_complete(col.count() == 0)
+    return col
 
 def summarize_turns_to_note(turns: List[dict]) -> str:
     """
@@ -25,29 +53,169 @@ def summarize_turns_to_note(turns: List[dict]) -> str:
     )
     return note
 
-def upsert_summary(user_id: str, session_id: str, turns: List[dict]):
+def build_summary(user_id: str, session_id: str, turns: List[dict]) -> dict | None:
     note = summarize_turns_to_note(turns)
     if not note:
-        return
-    emb = embed_texts([note])[0]
-    doc = note
+        return None
     meta = {
         "user_id": user_id,
         "session_id": session_id,
         "type": "summary",
         "ts": datetime.utcnow().isoformat(),
     }
-    _col().upsert(
-        ids=[f"{user_id}:{session_id}:{meta['ts']}"],
-        embeddings=[emb],
-        documents=[doc],
-        metadatas=[meta],
+    return {"id": f"{user_id}:{session_id}:{meta['ts']}", "doc": note, "meta": meta}
+
+def write_summaries(notes: List[dict]):
+    """One forward pass + one upsert for a batch of notes, then retention per user."""
+    embeddings = encode_batch([n["doc"] for n in notes])
+    _col()  # settles born_complete before this batch's ids go in
+    note_index.add((n["meta"]["user_id"], n["id"], n["meta"]["ts"]) for n in notes)
+    upsert(
+        COLLECTION_NAME,
+        ids=[n["id"] for n in notes],
+        embeddings=embeddings,
+        documents=[n["doc"] for n in notes],
+        metadatas=[n["meta"] for n in notes],
     )
+    user_ids = list(dict.fromkeys(n["meta"]["user_id"] for n in notes))
+    note_index.touch(user_ids)
+    for user_id in user_ids:
+        if _count_user(user_id) > USER_MEMORY_MAX_NOTES + USER_MEMORY_COMPACT_SLACK:
+            compact_user(user_id)
+
+# ---------- Retention ----------
+def _count_user(user_id: str) -> int:
+    if not note_index.state(user_id)[1]:
+        _load_user(user_id)  # fills in their ids
+    return note_index.count(user_id)
+
+def _read_user(user_id: str) -> tuple[int, dict]:
+    """
+    (version, raw notes) for a user: by id via note_index, or for a user whose
+    notes predate the index, one where={"user_id": ...} read that fills it in.
+    The version is read first, so a write racing the read leaves it stale.
+    """
+    col = _col()
+    include = ["embeddings", "documents", "metadatas"]
+    version, complete = note_index.state(user_id)
+    if complete:
+        ids = note_index.ids(user_id)
+        return version, (col.get(ids=ids, include=include) if ids else
+                         {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+    got = col.get(where={"user_id": user_id}, include=include)
+    filled = note_index.fill(user_id, [(i, m.get("ts", "")) for i, m in zip(got["ids"], got["metadatas"])])
+    # only our own bump in between: what we read is current as of `filled`
+    return (filled if filled == version + 1 else version), got
+
+def _load_user(user_id: str) -> tuple[int, dict]:
+    """(version, all of a user's notes), oldest first, with a normalized embedding matrix."""
+    version, got = _read_user(user_id)
+    order = sorted(range(len(got["ids"])), key=lambda i: got["metadatas"][i].get("ts", ""))
+    emb = np.asarray([got["embeddings"][i] for i in order], dtype=np.float32)
+    if len(emb):
+        emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+    return version, {
+        "ids": [got["ids"][i] for i in order],
+        "docs": [got["documents"][i] for i in order],
+        "metas": [got["metadatas"][i] for i in order],
+        "emb": emb,
+    }
+
+def _gist(doc: str) -> str:
+    """The user's concern from a summary note, or the body of an older digest."""
+    if doc.startswith("Earlier: "):
+        return doc[len("Earlier: "):]
+    concern = doc.split(". Guide hint (short):")[0]
+    return concern.replace("User concern (short): ", "").strip()
+
+def compact_user(user_id: str, max_notes: int = USER_MEMORY_MAX_NOTES) -> dict:
+    """
+    Fold the oldest notes into a single digest so at most max_notes remain.
+    The digest's embedding is the normalized (folded-count weighted) mean of
+    the folded ones, so no re-encode is needed. Returns the user's (post-compaction) notes.
+    """
+    _, notes = _load_user(user_id)
+    over = len(notes["ids"]) - max_notes
+    if over <= 0:
+        return notes
+    n = over + 1  # these become one digest
+    gist = " | ".join(_gist(d) for d in notes["docs"][:n])
+    text = "Earlier: " + gist[-(USER_MEMORY_DIGEST_CHARS - 9):]  # newest folded notes win
+    # weight older digests by how many notes they already stand for
+    w = np.asarray([float(m.get("folded", 1)) for m in notes["metas"][:n]], dtype=np.float32)
+    vec = (notes["emb"][:n] * w[:, None]).sum(axis=0)
+    vec /= max(float(np.linalg.norm(vec)), 1e-12)
+    meta = {
+        "user_id": user_id,
+        "session_id": notes["metas"][n - 1].get("session_id", ""),
+        "type": "digest",
+        "ts": notes["metas"][n - 1].get("ts", ""),  # keeps its place as the oldest note
+        "folded": sum(int(m.get("folded", 1)) for m in notes["metas"][:n]),
+    }
+    digest_id = f"{user_id}:digest:{meta['ts']}"
+    folded = [i for i in notes["ids"][:n] if i != digest_id]
+    col = _col()
+    note_index.add([(user_id, digest_id, meta["ts"])])
+    col.upsert(ids=[digest_id], embeddings=[vec.tolist()],
+               documents=[text], metadatas=[meta])
+    col.delete(ids=folded)
+    note_index.remove(user_id, folded)
+    bump_collection_version(COLLECTION_NAME)
+    return {
+        "ids": [digest_id] + notes["ids"][n:],
+        "docs": [text] + notes["docs"][n:],
+        "metas": [meta] + notes["metas"][n:],
+        "emb": np.vstack([vec[None, :], notes["emb"][n:]]),
+    }
+
+# ---------- Recall ----------
+def _user_notes(user_id: str) -> dict:
+    version, complete = note_index.state(user_id)
+    cached = _hot.get(user_id)
+    if cached is not None and complete and cached[0] == version:
+        return cached[1]
+    version, notes = _load_user(user_id)  # bounded by retention
+    _hot.set(user_id, (version, notes))
+    return notes
+
+def recall(user_id: str, text: str, k: int = 5, embedding: list[float] | None = None) -> List[dict]:
+    """
+    Top-k of this user's memories for `text`. Scores the user's (bounded)
+    notes in-process, so cost doesn't grow with the collection.
+    """
+    notes = _user_notes(user_id)
+    if not notes["ids"]:
+        return []
+    q = np.asarray(embedding if embedding is not None else embed_texts([text])[0], dtype=np.float32)
+    scores = notes["emb"] @ q
+    top = np.argsort(-scores)[:k]
+    return [
+        {"id": notes["ids"][i], "doc": notes["docs"][i], "meta": notes["metas"][i], "score": float(scores[i])}
+        for i in top
+    ]
+
+def recall_cache_stats() -> dict:
+    return _hot.snapshot()
+
+writer = MemoryWriter(write_summaries, MEMORY_WRITER_BATCH, MEMORY_WRITER_FLUSH_MS, MEMORY_WRITER_MAX_QUEUE)
+
+def upsert_summary(user_id: str, session_id: str, turns: List[dict]):
+    """Synchronous write (scripts, tests); requests go through the writer."""
+    note = build_summary(user_id, session_id, turns)
+    if note:
+        write_summaries([note])
 
 def summarize_if_needed(user_id: str, session_id: str, turns: List[dict], every_n:int=6):
     """
     Call this after appending a turn.
     Writes to user_memory every N turns (shared across all chatbots).
+    The write is queued for the background writer; this never waits on it.
     """
-    if len(turns) % every_n == 0:
+    if len(turns) % every_n != 0:
+        return
+    if not MEMORY_WRITER_ENABLED:
         upsert_summary(user_id, session_id, turns)
+        return
+    note = build_summary(user_id, session_id, turns)
+    if note:
+        writer.submit(note)
@@ -0,0 +1,44 @@
+import os, time
+from typing import Callable, List
+
+from write_behind import WriteBehindQueue
+
+# Background writer for user_memory notes: chat requests enqueue and return;
+# a single worker thread embeds whatever has queued up in one forward pass
+# and writes it with one Chroma upsert.
+MEMORY_WRITER_ENABLED = os.getenv("MEMORY_WRITER_ENABLED", "true").lower() == "true"
+MEMORY_WRITER_BATCH = int(os.getenv("MEMORY_WRITER_BATCH", "64"))
+MEMORY_WRITER_FLUSH_MS = float(os.getenv("MEMORY_WRITER_FLUSH_MS", "500"))
+MEMORY_WRITER_MAX_QUEUE = int(os.getenv("MEMORY_WRITER_MAX_QUEUE", "10000"))
+MEMORY_WRITER_DRAIN_S = float(os.getenv("MEMORY_WRITER_DRAIN_S", "10"))
+
+class MemoryWriter(WriteBehindQueue):
+    """
+    Queue of {"id", "doc", "meta"} notes flushed when MEMORY_WRITER_BATCH have
+    queued or MEMORY_WRITER_FLUSH_MS after the first one arrived, whichever
+    comes first. submit() never blocks: past max_queue the note is dropped
+    and counted. A failed write is retried once, then the batch is dropped.
+    """
+
+    def __init__(self, write: Callable[[List[dict]], None], max_batch: int = 64,
+                 flush_ms: float = 500, max_queue: int = 10000):
+        super().__init__(max_batch, flush_ms, max_queue, name="memory writer")
+        self.write = write
+
+    def _write_batch(self, batch):
+        notes = [note for _, note in batch]
+        for attempt in range(2):
+            try:
+                self.write(notes)
+                break
+            except Exception as e:
+                if attempt:
+                    print(f"⚠️ {self.name} dropped {len(notes)} notes: {e}")
+                    self.stats["failed"] += len(notes)
+                    return
+                time.sleep(0.5)
+        self._record_written(batch)
+
+    def close(self, timeout: float = MEMORY_WRITER_DRAIN_S) -> bool:
+        """Stop accepting notes, flush what's queued; True if it finished in time."""
+        return super().close(timeout)
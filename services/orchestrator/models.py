@@ -17,6 +17,7 @@ class StoryRequest(BaseModel):
     language: Lang = "en"
     sources: List[str] = ["auto"]
     emotion_tags: Optional[List[str]] = None  # Added optional emotion_tags field
+    bypass_cache: bool = False  # skip the semantic story cache for this request
 
 class StoryPayload(BaseModel):
     title: str
@@ -51,6 +52,21 @@ class GuideChatResponse(BaseModel):
     citations: List[Citation] = []
     persona_selected: str
 
+class MemoryRecallRequest(BaseModel):
+    user_id: str
+    text: str
+    k: int = 5
+
+class MemoryItem(BaseModel):
+    text: str
+    type: str = "summary"  # "summary" | "digest"
+    session_id: Optional[str] = None
+    ts: Optional[str] = None
+    score: float
+
+class MemoryRecallResponse(BaseModel):
+    memories: List[MemoryItem] = []
+
 
 
 class PracticeSuggestRequest(BaseModel):
@@ -65,3 +81,29 @@ class PracticeItem(BaseModel):
 
 class PracticeSuggestResponse(BaseModel):
     practices: List[PracticeItem]
+
+LeaderboardScope = Literal["week", "all"]
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: str
+    points: int
+    level: str
+
+class LeaderboardResponse(BaseModel):
+    scope: LeaderboardScope
+    total: int
+    entries: List[LeaderboardEntry] = []
+
+class LeaderboardRankResponse(BaseModel):
+    user_id: str
+    scope: LeaderboardScope
+    rank: Optional[int] = None   # None: no points in this scope yet
+    points: int = 0
+    total: int
+    level: str
+
+class LeaderboardStatsResponse(BaseModel):
+    users: int
+    active_this_week: int
+    levels: dict[str, int]
@@ -1,13 +1,16 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, JSON, text
+from sqlalchemy import Column, String, DateTime, Date, Integer, BigInteger, ForeignKey, JSON, Index, text, cast, literal_column
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from datetime import datetime
+from datetime import date, datetime
 import uuid
 from db import Base
 
 def uuid4():
     return str(uuid.uuid4())
 
+# xid8 of the current transaction, as a bigint (see Totals.change_xid)
+CURRENT_XID = cast(literal_column("pg_current_xact_id()::text"), BigInteger)
+
 class User(Base):
     __tablename__ = "users"
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=uuid4)
@@ -25,6 +28,8 @@ class Session(Base):
     emotion_tags: Mapped[list[str] | None] = mapped_column(ARRAY(String), nullable=True)
     last_stage: Mapped[str | None] = mapped_column(String, nullable=True)
 
+    __table_args__ = (Index("ix_sessions_user_id", "user_id"),)
+
 class Story(Base):
     __tablename__ = "stories"
     id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True, default=uuid4)
@@ -34,6 +39,9 @@ class Story(Base):
     citations_json: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)  # <-- changed type hint
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"))
 
+    # latest story of a session: backward scan, LIMIT 1
+    __table_args__ = (Index("ix_stories_session_id_created_at", "session_id", "created_at"),)
+
 
 class Chat(Base):
     __tablename__ = "chats"
@@ -41,14 +49,35 @@ class Chat(Base):
     user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id"))
     session_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("sessions.id"))
     persona: Mapped[str] = mapped_column(String)
-    turns: Mapped[list[dict]] = mapped_column(JSON)  # [{role, text, ts}]
+    turns: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)  # legacy blob; turns live in chat_turns
+    turn_count: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"))
 
+    __table_args__ = (Index("ix_chats_session_id_persona", "session_id", "persona"),)
+
+class ChatTurn(Base):
+    """One chat message; appended with INSERT only, (chat_id, seq) is the key."""
+    __tablename__ = "chat_turns"
+    chat_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("chats.id"), primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)  # 1-based, per chat
+    role: Mapped[str] = mapped_column(String)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"))
+    body: Mapped[str] = mapped_column("text", String)  # column "text"
+
 class Totals(Base):
     __tablename__ = "totals"
     user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), ForeignKey("users.id"), primary_key=True)
     karmic_points: Mapped[int] = mapped_column(Integer, default=0)
     streak_days: Mapped[int] = mapped_column(Integer, default=0)
     last_active: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # points earned in the week starting week_start (Monday, KARMA_TZ); stale once the week is over
+    week_start: Mapped[date | None] = mapped_column(Date, nullable=True)
+    week_points: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"))
+    # transaction that last changed the row; the leaderboard feed's watermark.
+    # Set by every write (no server default: adding one would rewrite the table)
+    change_xid: Mapped[int | None] = mapped_column(BigInteger, nullable=True, default=CURRENT_XID)
 
     user = relationship("User", back_populates="totals")
+
+    __table_args__ = (Index("ix_totals_change_xid", "change_xid"),)
@@ -0,0 +1,87 @@
+import time, queue, threading
+from concurrent.futures import Future
+from typing import Callable, List
+
+class EmbeddingBatcher:
+    """
+    Request-coalescing front for a batch encoder.
+
+    Concurrent callers each submit a few texts; a single worker thread waits up
+    to `max_wait_ms` for more to arrive (or until `max_batch` texts are queued),
+    encodes them in one forward pass and hands each caller its slice back.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], List[List[float]]],
+                 max_batch: int = 32, max_wait_ms: float = 3.0):
+        self.encode = encode
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000
+        self._q: "queue.Queue[tuple[List[str], Future]]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self.stats = {"batches": 0, "texts": 0, "max_batch_seen": 0}
+
+    def submit(self, texts: List[str]) -> Future:
+        fut: Future = Future()
+        self._q.put((list(texts), fut))
+        if self._worker is None:
+            self._start()
+        return fut
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(texts).result()
+
+    def _start(self):
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list:
+        batch = [self._q.get()]  # block until there's work
+        n = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait_s
+        while n < self.max_batch:
+            try:
+                # always take what's already queued (natural batching, even
+                # with max_wait_ms=0), then wait out the window for more
+                item = self._q.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            batch.append(item)
+            n += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            batch = [(texts, fut) for texts, fut in batch if fut.set_running_or_notify_cancel()]
+            flat = [t for texts, _ in batch for t in texts]
+            if not flat:
+                continue
+            try:
+                vecs = self.encode(flat)
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            i = 0
+            for texts, fut in batch:
+                fut.set_result(vecs[i:i + len(texts)])
+                i += len(texts)
+            self.stats["batches"] += 1
+            self.stats["texts"] += len(flat)
+            self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(flat))
+
+    def snapshot(self) -> dict:
+        s = dict(self.stats)
+        s["avg_batch"] = round(s["texts"] / s["batches"], 2) if s["batches"] else 0.0
+        s["queue_depth"] = self._q.qsize()
+        return s
@@ -1,4 +1,4 @@
-import os
+import os, time, threading
 import chromadb
 from dotenv import load_dotenv
 
@@ -11,8 +11,57 @@ CHROMA_DIR = os.getenv("CHROMA_DIR", "./.chroma")
 
 client = chromadb.PersistentClient(path=CHROMA_DIR)
 
+_collections = {}
+
 def get_collection(name: str):
-    return client.get_or_create_collection(
-        name=name,
-        metadata={"hnsw:space": "cosine"}
-    )
+    """Resolve each collection handle once; later calls are a dict lookup."""
+    col = _collections.get(name)
+    if col is None:
+        col = _collections[name] = client.get_or_create_collection(
+            name=name,
+            metadata={"hnsw:space": "cosine"}
+        )
+    return col
+
+# ---- Change tracking, so read caches can tell when a collection was written.
+# In-process writes bump a counter; a marker file in CHROMA_DIR carries the
+# change to other processes (e.g. `python -m rag.seed_gita` while the API runs).
+_versions: dict[str, int] = {}
+_marker_seen: dict[str, tuple[float, int]] = {}  # name -> (checked_at, mtime_ns)
+_versions_lock = threading.Lock()
+MARKER_CHECK_S = float(os.getenv("CHROMA_MARKER_CHECK_S", "1.0"))
+
+def _marker_path(name: str) -> str:
+    return os.path.join(CHROMA_DIR, f".{name}.version")
+
+def bump_collection_version(name: str):
+    with _versions_lock:
+        _versions[name] = _versions.get(name, 0) + 1
+    try:
+        with open(_marker_path(name), "w") as f:
+            f.write(str(time.time_ns()))
+    except OSError:
+        pass
+    # our own write is visible at once, not after MARKER_CHECK_S
+    _marker_seen[name] = (time.monotonic(), marker_mtime(name))
+
+def marker_mtime(name: str) -> int:
+    """The marker file's mtime right now (0 if `name` was never written through upsert)."""
+    try:
+        return os.stat(_marker_path(name)).st_mtime_ns
+    except OSError:
+        return 0
+
+def collection_version(name: str) -> tuple[int, int]:
+    """Cheap token that changes whenever `name` is written (any process)."""
+    now = time.monotonic()
+    checked_at, mtime = _marker_seen.get(name, (0.0, 0))
+    if now - checked_at >= MARKER_CHECK_S:
+        mtime = marker_mtime(name)
+        _marker_seen[name] = (now, mtime)
+    return _versions.get(name, 0), mtime
+
+def upsert(name: str, **kwargs):
+    """Upsert into a collection and invalidate read caches keyed on it."""
+    get_collection(name).upsert(**kwargs)
+    bump_collection_version(name)
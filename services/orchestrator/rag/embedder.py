@@ -1,15 +1,94 @@
-from sentence_transformers import SentenceTransformer
-import os
+import os, time, asyncio
+from .batcher import EmbeddingBatcher
+from executors import run_embedding
+
+# Coalesce concurrent small encode calls into one forward pass.
+EMBED_BATCH_ENABLED = os.getenv("EMBED_BATCH_ENABLED", "true").lower() == "true"
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "32"))
+EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", "3"))
+
+# torch: full-precision SentenceTransformer. onnx / onnx-int8: the same
+# model's ONNX export on ONNX Runtime (rag/onnx_encoder.py), for CPU pods.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
 
 _model = None
 
+def load_model(backend: str | None = None):
+    name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name)
+    from .onnx_encoder import OnnxEncoder, ONNX_FILES
+    if backend not in ONNX_FILES:
+        raise ValueError(f"EMBEDDING_BACKEND must be torch, onnx or onnx-int8, got {backend!r}")
+    return OnnxEncoder(name, backend)
+
 def get_model():
     global _model
     if _model is None:
-        name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
-        _model = SentenceTransformer(name)
+        _model = load_model()
     return _model
 
-def embed_texts(texts: list[str]) -> list[list[float]]:
+def encode_batch(texts: list[str]) -> list[list[float]]:
+    """One direct forward pass, no coalescing."""
     model = get_model()
     return model.encode(texts, normalize_embeddings=True).tolist()
+
+batcher = EmbeddingBatcher(encode_batch, EMBED_BATCH_MAX, EMBED_BATCH_WAIT_MS) if EMBED_BATCH_ENABLED else None
+
+def _use_batcher(texts: list[str]) -> bool:
+    # big requests (ingestion) are already a full batch; don't make them wait
+    return batcher is not None and len(texts) < EMBED_BATCH_MAX
+
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    if _use_batcher(texts):
+        return batcher.embed(texts)
+    return encode_batch(texts)
+
+async def aembed_texts(texts: list[str]) -> list[list[float]]:
+    """Async callers wait on the batcher without holding a pool thread."""
+    if _use_batcher(texts):
+        return await asyncio.wrap_future(batcher.submit(texts))
+    return await run_embedding(encode_batch, texts)
+
+def warm_up(collections=("gita", "user_memory")) -> dict:
+    """
+    Load the model, run one throwaway encode (first forward pass is slow) and
+    resolve collection handles. Returns a cold-start timing report in ms.
+    """
+    from .chroma_client import get_collection
+
+    report = {}
+    t = time.perf_counter()
+    get_model()
+    report["model_load_ms"] = round((time.perf_counter() - t) * 1000, 1)
+    report["backend"] = EMBEDDING_BACKEND
+
+    t = time.perf_counter()
+    embed_texts(["warm up"])
+    report["first_encode_ms"] = round((time.perf_counter() - t) * 1000, 1)
+
+    t = time.perf_counter()
+    embed_texts(["warm up again"])
+    report["warm_encode_ms"] = round((time.perf_counter() - t) * 1000, 1)
+
+    t = time.perf_counter()
+    for name in collections:
+        get_collection(name)
+    report["collections_ms"] = round((time.perf_counter() - t) * 1000, 1)
+
+    from .retrieve import VECTOR_INDEX
+    if VECTOR_INDEX == "numpy":
+        from .np_index import get_index
+        t = time.perf_counter()
+        for name in collections:
+            get_index(name)
+        report["snapshots_ms"] = round((time.perf_counter() - t) * 1000, 1)
+
+    from .rerank import RERANK_ENABLED, get_reranker
+    if RERANK_ENABLED:  # otherwise the first requests would blow the rerank budget
+        t = time.perf_counter()
+        get_reranker().predict([("warm up", "warm up")])
+        report["reranker_load_ms"] = round((time.perf_counter() - t) * 1000, 1)
+    return report
@@ -0,0 +1,219 @@
+"""
+Streaming corpus ingestion into Chroma.
+
+  python -m rag.ingest data/gita.jsonl --collection gita
+  python -m rag.ingest data/upanishads.jsonl --work "Upanishads" --batch-size 64 --page-size 256
+
+Without --collection, records go to the collection mapped to --work in
+rag.retrieve.WORK_COLLECTIONS (falling back to `gita`).
+
+Each record needs a `text` field; `translation`, `work`, `chapter`, `verse`
+and any other scalar fields become metadata. Records are read lazily, one
+page at a time, so memory stays flat no matter how large the corpus is.
+Reruns are cheap: every chunk stores a content hash (of its text, metadata
+and the embedding model/backend) and unchanged chunks are skipped without
+re-embedding. Chunks a record no longer produces (it got shorter) are
+deleted.
+"""
+import os, re, csv, sys, json, time, hashlib, argparse
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .chroma_client import get_collection, upsert, bump_collection_version
+from .embedder import EMBEDDING_BACKEND, encode_batch
+from .retrieve import collection_for_work
+from .lexical import build_index
+from .np_index import build_snapshot
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# ---------- Sources ----------
+def _coerce(v):
+    if isinstance(v, str) and v.strip().lstrip("-").isdigit():
+        return int(v)
+    return v
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def read_csv(path: str) -> Iterator[Dict]:
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {k: _coerce(v) for k, v in row.items() if k}
+
+def read_source(path: str) -> Iterator[Dict]:
+    if path.endswith(".csv"):
+        return read_csv(path)
+    if path.endswith(".jsonl") or path.endswith(".ndjson"):
+        return read_jsonl(path)
+    raise ValueError(f"Unsupported source (want .jsonl or .csv): {path}")
+
+# ---------- Chunking ----------
+_SENT_RE = re.compile(r"(?<=[.!?।])\s+")
+
+def chunk_text(text: str, max_chars: int = 800) -> List[str]:
+    """Split on sentence boundaries into chunks of at most ~max_chars."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return [text] if text else []
+    chunks, cur = [], ""
+    for sent in _SENT_RE.split(text):
+        while len(sent) > max_chars:  # one giant sentence: hard split
+            chunks.append(sent[:max_chars]); sent = sent[max_chars:]
+        if cur and len(cur) + 1 + len(sent) > max_chars:
+            chunks.append(cur); cur = sent
+        else:
+            cur = f"{cur} {sent}".strip()
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+def _slug(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", s.lower()).strip("-")
+
+def record_id(rec: Dict) -> str:
+    if rec.get("id"):
+        return str(rec["id"])
+    work = _slug(str(rec.get("work", "doc")))
+    if rec.get("chapter") is not None and rec.get("verse") is not None:
+        return f"{work}-{rec['chapter']}-{rec['verse']}"
+    return f"{work}-{hashlib.sha1(rec['text'].encode('utf-8')).hexdigest()[:12]}"
+
+def content_hash(doc: str, meta: Dict) -> str:
+    # model and backend are part of the hash: switching either re-embeds
+    # everything; a metadata change rewrites the chunk
+    raw = json.dumps([EMBEDDING_MODEL, EMBEDDING_BACKEND, doc, meta], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+def to_chunks(records: Iterable[Dict], default_work: Optional[str], max_chars: int) -> Iterator[Dict]:
+    for rec in records:
+        if not rec.get("text"):
+            continue
+        if default_work and not rec.get("work"):
+            rec["work"] = default_work
+        base = record_id(rec)
+        body = rec["text"] + (" " + rec["translation"] if rec.get("translation") else "")
+        meta = {k: v for k, v in rec.items()
+                if k not in ("id",) and isinstance(v, (str, int, float, bool))}
+        parts = chunk_text(body, max_chars)
+        for i, doc in enumerate(parts):
+            cid = base if len(parts) == 1 else f"{base}#c{i}"
+            md = dict(meta)
+            if len(parts) > 1:
+                md["chunk"], md["chunks"] = i, len(parts)
+            md["content_hash"] = content_hash(doc, md)
+            yield {"id": cid, "doc": doc, "meta": md, "record": base, "parts": len(parts)}
+
+# chunks written before `chunks` was stored: how far past the new count to look
+_STALE_PROBE = 64
+
+def stale_chunk_ids(col, parts: Dict[str, int]) -> List[str]:
+    """
+    Ids an earlier ingest wrote for these records (record id -> chunk count
+    now) that the current chunking no longer produces: the unchunked id of a
+    record that is now chunked, and vice versa, and trailing #cN past the new
+    count. Found via the old #c0's `chunks`, so it's two by-id gets.
+    """
+    heads = col.get(ids=[f"{base}#c0" for base in parts], include=["metadatas"])
+    old = {cid[:-len("#c0")]: (md or {}).get("chunks") for cid, md in zip(heads["ids"], heads["metadatas"])}
+    candidates = []
+    for base, n in parts.items():
+        if n > 1:
+            candidates.append(base)
+        if base in old:
+            start = 0 if n == 1 else n
+            candidates.extend(f"{base}#c{i}" for i in range(start, old[base] or start + _STALE_PROBE))
+    if not candidates:
+        return []
+    return col.get(ids=candidates, include=[])["ids"]
+
+# ---------- Pipeline ----------
+def _pages(items: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    page = []
+    for it in items:
+        page.append(it)
+        if len(page) >= size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+def ingest_records(records: Iterable[Dict], collection: str, *, work: Optional[str] = None,
+                   batch_size: int = 64, page_size: int = 256, max_chars: int = 800,
+                   force: bool = False, lexical: bool = True, snapshot: bool = True,
+                   log=print) -> Dict:
+    col = get_collection(collection)
+    stats = {"chunks": 0, "skipped": 0, "upserted": 0, "deleted": 0}
+    t0 = time.perf_counter()
+
+    for page in _pages(to_chunks(records, work, max_chars), page_size):
+        stats["chunks"] += len(page)
+        stale = stale_chunk_ids(col, {c["record"]: c["parts"] for c in page})
+        if stale:
+            col.delete(ids=stale)
+            bump_collection_version(collection)
+            stats["deleted"] += len(stale)
+        if not force:
+            existing = col.get(ids=[c["id"] for c in page], include=["metadatas"])
+            seen = {i: (m or {}).get("content_hash") for i, m in zip(existing["ids"], existing["metadatas"])}
+            todo = [c for c in page if seen.get(c["id"]) != c["meta"]["content_hash"]]
+        else:
+            todo = page
+        stats["skipped"] += len(page) - len(todo)
+        if not todo:
+            continue
+
+        embeddings = []
+        for i in range(0, len(todo), batch_size):
+            embeddings.extend(encode_batch([c["doc"] for c in todo[i:i + batch_size]]))
+        upsert(
+            collection,
+            ids=[c["id"] for c in todo],
+            embeddings=embeddings,
+            documents=[c["doc"] for c in todo],
+            metadatas=[c["meta"] for c in todo],
+        )
+        stats["upserted"] += len(todo)
+        elapsed = time.perf_counter() - t0
+        log(f"  {stats['chunks']} chunks ({stats['upserted']} upserted, {stats['skipped']} unchanged) "
+            f"{stats['chunks'] / elapsed:.1f} docs/s")
+
+    stats["seconds"] = round(time.perf_counter() - t0, 2)
+    stats["docs_per_s"] = round(stats["chunks"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    changed = stats["upserted"] or stats["deleted"]
+    if lexical and changed:
+        # BM25 needs corpus-wide stats, so rebuild from the whole collection
+        stats["lexical"] = build_index(collection)
+    if snapshot and changed:
+        stats["snapshot"] = build_snapshot(collection)
+    return stats
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("sources", nargs="+", help=".jsonl or .csv files")
+    ap.add_argument("--collection", default=None)
+    ap.add_argument("--work", default=None, help="default `work` for records that don't set one")
+    ap.add_argument("--batch-size", type=int, default=64, help="texts per embedding forward pass")
+    ap.add_argument("--page-size", type=int, default=256, help="chunks per Chroma upsert")
+    ap.add_argument("--chunk-chars", type=int, default=800)
+    ap.add_argument("--force", action="store_true", help="re-embed even if the content hash matches")
+    ap.add_argument("--no-lexical", action="store_true", help="skip rebuilding the BM25 index")
+    ap.add_argument("--no-snapshot", action="store_true", help="skip rebuilding the NumPy vector snapshot")
+    args = ap.parse_args(argv)
+    collection = args.collection or (collection_for_work(args.work) if args.work else "gita")
+
+    for path in args.sources:
+        print(f"📥 {path} -> {collection}")
+        stats = ingest_records(
+            read_source(path), collection, work=args.work,
+            batch_size=args.batch_size, page_size=args.page_size,
+            max_chars=args.chunk_chars, force=args.force, lexical=not args.no_lexical,
+            snapshot=not args.no_snapshot,
+        )
+        print(f"✅ {path}: {json.dumps(stats)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
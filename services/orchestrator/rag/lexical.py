@@ -0,0 +1,187 @@
+"""
+BM25 inverted index stored next to a Chroma collection.
+
+Built from the collection's documents at ingest time and written as plain
+.npy arrays in CSR layout (one postings run per term) plus a JSON sidecar:
+
+  CHROMA_DIR/lexical/<collection>/
+    indptr.npy   int64[V+1]   postings run of term t is [indptr[t], indptr[t+1])
+    docs.npy     int32[P]     document row of each posting
+    weights.npy  float32[P]   precomputed BM25 term weight (idf * saturated tf)
+    works.npy    int16[N]     work code per row, for where={"work": ...}
+    meta.json                 vocab, row -> id, work names, corpus stats
+
+The arrays are memory-mapped on load, so a query only touches the postings
+of its own terms and scoring is one gather-add per term.
+"""
+import os, re, json, time, shutil, threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .chroma_client import CHROMA_DIR, get_collection
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+LEXICAL_DIR = os.getenv("LEXICAL_DIR", os.path.join(CHROMA_DIR, "lexical"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its "
+    "me my not of on or our she so that the their them they this to was we were "
+    "what when which who will with you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+def index_dir(collection: str) -> str:
+    return os.path.join(LEXICAL_DIR, collection)
+
+def replace_dir(tmp: str, out: str):
+    """Swap a freshly written index dir into place so readers never see a half-written one."""
+    if os.path.isdir(out):
+        old = out + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(out, old)
+        os.replace(tmp, out)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, out)
+
+# ---------- Build ----------
+def build_index(collection: str, page_size: int = 1000) -> Dict:
+    """(Re)build the BM25 index for `collection` from what's in Chroma."""
+    t0 = time.perf_counter()
+    col = get_collection(collection)
+    ids, works, work_codes, lengths = [], [], {}, []
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    offset = 0
+    while True:
+        page = col.get(offset=offset, limit=page_size, include=["documents", "metadatas"])
+        if not page["ids"]:
+            break
+        for cid, doc, md in zip(page["ids"], page["documents"], page["metadatas"]):
+            row = len(ids)
+            ids.append(cid)
+            work = (md or {}).get("work", "")
+            works.append(work_codes.setdefault(work, len(work_codes)))
+            tf = Counter(tokenize(doc or ""))
+            lengths.append(sum(tf.values()))
+            for term, n in tf.items():
+                postings.setdefault(term, []).append((row, n))
+        offset += len(page["ids"])
+
+    n_docs = len(ids)
+    dl = np.asarray(lengths, dtype=np.float32)
+    avgdl = float(dl.mean()) if n_docs else 0.0
+    vocab = sorted(postings)
+    indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    for t, term in enumerate(vocab):
+        indptr[t + 1] = indptr[t] + len(postings[term])
+    docs = np.empty(indptr[-1], dtype=np.int32)
+    weights = np.empty(indptr[-1], dtype=np.float32)
+    for t, term in enumerate(vocab):
+        rows, tfs = zip(*postings.pop(term))
+        rows = np.asarray(rows, dtype=np.int32)
+        tfs = np.asarray(tfs, dtype=np.float32)
+        df = len(rows)
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * dl[rows] / (avgdl or 1.0))
+        s, e = indptr[t], indptr[t + 1]
+        docs[s:e] = rows
+        weights[s:e] = idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+
+    out = index_dir(collection)
+    tmp = out + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+    np.save(os.path.join(tmp, "indptr.npy"), indptr)
+    np.save(os.path.join(tmp, "docs.npy"), docs)
+    np.save(os.path.join(tmp, "weights.npy"), weights)
+    np.save(os.path.join(tmp, "works.npy"), np.asarray(works, dtype=np.int16))
+    meta = {
+        "collection": collection,
+        "n_docs": n_docs,
+        "avgdl": avgdl,
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "ids": ids,
+        "works": sorted(work_codes, key=work_codes.get),
+        "vocab": vocab,
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    replace_dir(tmp, out)
+    return {"docs": n_docs, "terms": len(vocab), "postings": int(indptr[-1]),
+            "seconds": round(time.perf_counter() - t0, 2)}
+
+# ---------- Query ----------
+class LexicalIndex:
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids: List[str] = meta["ids"]
+        self.n_docs: int = meta["n_docs"]
+        self.terms = {t: i for i, t in enumerate(meta["vocab"])}
+        self.work_codes = {w: i for i, w in enumerate(meta["works"])}
+        self.indptr = np.load(os.path.join(path, "indptr.npy"), mmap_mode="r")
+        self.docs = np.load(os.path.join(path, "docs.npy"), mmap_mode="r")
+        self.weights = np.load(os.path.join(path, "weights.npy"), mmap_mode="r")
+        self.works = np.load(os.path.join(path, "works.npy"), mmap_mode="r")
+
+    def search(self, query: str, k: int = 20, work: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Top-k (id, bm25) pairs; only rows with at least one query term."""
+        tids = [self.terms[t] for t in dict.fromkeys(tokenize(query)) if t in self.terms]
+        if not tids or not self.n_docs:
+            return []
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for t in tids:
+            s, e = self.indptr[t], self.indptr[t + 1]
+            scores[self.docs[s:e]] += self.weights[s:e]  # rows are unique within a run
+        if work is not None:
+            code = self.work_codes.get(work)
+            if code is None:
+                return []
+            scores[self.works != code] = 0.0
+        hit = np.flatnonzero(scores)
+        if hit.size > k:
+            hit = hit[np.argpartition(-scores[hit], k - 1)[:k]]
+        hit = hit[np.argsort(-scores[hit], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in hit]
+
+_indexes: Dict[str, Tuple[int, Optional[LexicalIndex]]] = {}
+_load_lock = threading.Lock()
+
+def index_version(collection: str) -> int:
+    try:
+        return os.stat(os.path.join(index_dir(collection), "meta.json")).st_mtime_ns
+    except OSError:
+        return 0
+
+def get_index(collection: str) -> Optional[LexicalIndex]:
+    """Loaded index for `collection`, reloaded after a rebuild; None if never built."""
+    version = index_version(collection)
+    cached = _indexes.get(collection)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _load_lock:
+        cached = _indexes.get(collection)
+        if cached is None or cached[0] != version:
+            idx = LexicalIndex(index_dir(collection)) if version else None
+            cached = _indexes[collection] = (version, idx)
+    return cached[1]
+
+def rrf(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Reciprocal rank fusion: sum of 1 / (k + rank) over every list an id appears in."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, cid in enumerate(ranking, start=1):
+            fused[cid] = fused.get(cid, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
+
+if __name__ == "__main__":
+    # rebuild for existing collections: python -m rag.lexical gita yoga_sutra
+    import sys
+    for name in sys.argv[1:] or ["gita"]:
+        print(f"🔤 {name}: {build_index(name)}")
@@ -0,0 +1,164 @@
+"""
+Read-only NumPy snapshot of a Chroma collection, for small, rarely-changing
+corpora (the scriptures). Chroma stays the source of truth; the snapshot is
+rebuilt after ingestion and lives next to it. It records the collection's
+version marker as of the build, and any later write through
+chroma_client.upsert (from any process) makes it stale: searches go to
+Chroma until the next rebuild.
+
+  CHROMA_DIR/vectors/<collection>/
+    vectors.npy  float32|float16[N, D]  L2-normalized embeddings, row-aligned with ids
+    works.npy    int16[N]               work code per row, for where={"work": ...}
+    meta.json                           ids, documents, metadatas, work names, dtype,
+                                        source marker
+
+vectors.npy is memory-mapped; a query is one matrix-vector (or, batched,
+matrix-matrix) product plus argpartition. No SQLite, no HNSW, no locks.
+"""
+import os, json, time, threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .chroma_client import CHROMA_DIR, get_collection, collection_version, marker_mtime
+from .lexical import replace_dir
+
+VECTOR_SNAPSHOT_DIR = os.getenv("VECTOR_SNAPSHOT_DIR", os.path.join(CHROMA_DIR, "vectors"))
+VECTOR_SNAPSHOT_DTYPE = os.getenv("VECTOR_SNAPSHOT_DTYPE", "float32")  # float32 | float16
+
+def snapshot_dir(collection: str) -> str:
+    return os.path.join(VECTOR_SNAPSHOT_DIR, collection)
+
+def build_snapshot(collection: str, dtype: str = VECTOR_SNAPSHOT_DTYPE, page_size: int = 1000) -> Dict:
+    """Dump `collection` from Chroma into a snapshot, streaming rows straight into the .npy."""
+    t0 = time.perf_counter()
+    col = get_collection(collection)
+    marker = marker_mtime(collection)  # before reading: a write during the build leaves it stale
+    n = col.count()
+    out = snapshot_dir(collection)
+    tmp = out + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+
+    ids, docs, metas, works, work_codes = [], [], [], [], {}
+    mat = None
+    offset = 0
+    while offset < n:
+        page = col.get(offset=offset, limit=min(page_size, n - offset),
+                       include=["embeddings", "documents", "metadatas"])
+        if not page["ids"]:
+            break
+        emb = np.asarray(page["embeddings"], dtype=np.float32)
+        if mat is None:
+            mat = np.lib.format.open_memmap(os.path.join(tmp, "vectors.npy"), mode="w+",
+                                            dtype=dtype, shape=(n, emb.shape[1]))
+        emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+        mat[offset:offset + len(emb)] = emb
+        for cid, doc, md in zip(page["ids"], page["documents"], page["metadatas"]):
+            ids.append(cid)
+            docs.append(doc)
+            metas.append(md or {})
+            works.append(work_codes.setdefault((md or {}).get("work", ""), len(work_codes)))
+        offset += len(page["ids"])
+    if mat is None:  # empty collection
+        mat = np.lib.format.open_memmap(os.path.join(tmp, "vectors.npy"), mode="w+", dtype=dtype, shape=(0, 0))
+    mat.flush()
+    del mat
+    rows = len(ids)  # may be < n if rows were deleted mid-build; readers slice to len(ids)
+
+    np.save(os.path.join(tmp, "works.npy"), np.asarray(works, dtype=np.int16))
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "collection": collection,
+            "dtype": dtype,
+            "ids": ids,
+            "documents": docs,
+            "metadatas": metas,
+            "works": sorted(work_codes, key=work_codes.get),
+            "source_marker": marker,
+        }, f, ensure_ascii=False)
+    replace_dir(tmp, out)
+    return {"rows": rows, "dtype": dtype, "seconds": round(time.perf_counter() - t0, 2)}
+
+class VectorIndex:
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids: List[str] = meta["ids"]
+        self.documents: List[str] = meta["documents"]
+        self.metadatas: List[dict] = meta["metadatas"]
+        self.work_codes = {w: i for i, w in enumerate(meta["works"])}
+        self.source_marker: Optional[int] = meta.get("source_marker")  # None: built before markers were recorded
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")[:len(self.ids)]
+        # BLAS has no float16 kernels: upcast once at load instead of per query
+        # (float16 then only halves the snapshot on disk / in the page cache)
+        self.vectors = vectors if vectors.dtype == np.float32 else np.asarray(vectors, dtype=np.float32)
+        self.works = np.load(os.path.join(path, "works.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, queries, k: int = 3, work: Optional[str] = None) -> List[List[Tuple[int, float]]]:
+        """
+        Top-k (row, cosine) per query. `queries` is one vector or a [B, D]
+        batch; the batch is scored with a single matrix product.
+        """
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if not len(self.ids):
+            return [[] for _ in range(len(q))]
+        scores = q @ self.vectors.T  # [B, N]
+        if work is not None:
+            code = self.work_codes.get(work)
+            if code is None:
+                return [[] for _ in range(len(q))]
+            scores[:, self.works != code] = -np.inf
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        out = []
+        for b in range(len(q)):
+            rows = top[b][np.argsort(-scores[b, top[b]], kind="stable")]
+            out.append([(int(r), float(scores[b, r])) for r in rows if np.isfinite(scores[b, r])])
+        return out
+
+    def hit(self, row: int, score: float) -> dict:
+        return {"id": self.ids[row], "doc": self.documents[row], "meta": dict(self.metadatas[row]), "score": score}
+
+_indexes: Dict[str, Tuple[int, Optional[VectorIndex]]] = {}
+_load_lock = threading.Lock()
+_stale_warned: Dict[str, int] = {}
+
+def snapshot_version(collection: str) -> int:
+    try:
+        return os.stat(os.path.join(snapshot_dir(collection), "meta.json")).st_mtime_ns
+    except OSError:
+        return 0
+
+def get_index(collection: str) -> Optional[VectorIndex]:
+    """
+    Loaded snapshot for `collection`, reloaded after a rebuild; None if never
+    built or if the collection has been written since (stale).
+    """
+    version = snapshot_version(collection)
+    cached = _indexes.get(collection)
+    if cached is None or cached[0] != version:
+        with _load_lock:
+            cached = _indexes.get(collection)
+            if cached is None or cached[0] != version:
+                idx = VectorIndex(snapshot_dir(collection)) if version else None
+                cached = _indexes[collection] = (version, idx)
+    idx = cached[1]
+    if idx is None:
+        return None
+    marker = collection_version(collection)[1]
+    if idx.source_marker != marker:
+        if _stale_warned.get(collection) != marker:
+            _stale_warned[collection] = marker
+            print(f"⚠️ vector snapshot for {collection!r} is stale (collection written since); "
+                  f"using Chroma until `python -m rag.np_index {collection}`")
+        return None
+    return idx
+
+if __name__ == "__main__":
+    # rebuild for existing collections: python -m rag.np_index gita yoga_sutra
+    import sys
+    for name in sys.argv[1:] or ["gita"]:
+        print(f"🧮 {name}: {build_snapshot(name)}")
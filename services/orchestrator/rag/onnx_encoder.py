@@ -0,0 +1,82 @@
+import os, json
+import numpy as np
+
+# The sentence-transformers repos on the Hub ship ONNX exports next to the
+# PyTorch weights (onnx/model.onnx, plus int8-quantized variants), so the same
+# model can run on ONNX Runtime without importing torch at all. onnxruntime and
+# tokenizers are already installed as chromadb dependencies.
+ONNX_FILES = {
+    "onnx": os.getenv("EMBEDDING_ONNX_FILE", "onnx/model.onnx"),
+    "onnx-int8": os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx"),
+}
+ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))  # 0 = ORT default
+
+def _resolve(model: str, filename: str) -> str | None:
+    """Local model dir or Hub repo id -> local path of `filename` (None if absent)."""
+    if os.path.isdir(model):
+        path = os.path.join(model, filename)
+        return path if os.path.exists(path) else None
+    from huggingface_hub import hf_hub_download
+    if "/" not in model:
+        model = f"sentence-transformers/{model}"
+    try:
+        return hf_hub_download(model, filename)
+    except Exception:
+        return None
+
+def _read_json(model: str, filename: str) -> dict:
+    path = _resolve(model, filename)
+    if path is None:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+class OnnxEncoder:
+    """
+    Drop-in for SentenceTransformer.encode on ONNX Runtime: tokenizer ->
+    transformer -> pooling (mean or CLS, per the model's pooling config) ->
+    optional L2 normalization. Returns float32 [n, dim] like the original.
+    """
+
+    def __init__(self, model: str, backend: str = "onnx"):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        path = _resolve(model, ONNX_FILES[backend])
+        tok_path = _resolve(model, "tokenizer.json")
+        if path is None or tok_path is None:
+            raise FileNotFoundError(f"{model} has no {ONNX_FILES[backend]} export / tokenizer.json")
+        self.max_seq_length = _read_json(model, "sentence_bert_config.json").get("max_seq_length", 256)
+        self.tokenizer = Tokenizer.from_file(tok_path)
+        self.tokenizer.enable_truncation(self.max_seq_length)
+        self.tokenizer.enable_padding()
+        pooling = _read_json(model, "1_Pooling/config.json")
+        self.cls_pooling = bool(pooling.get("pooling_mode_cls_token"))
+
+        opts = ort.SessionOptions()
+        if ONNX_THREADS:
+            opts.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: list[str], normalize_embeddings: bool = True, batch_size: int = 32, **_) -> np.ndarray:
+        out = []
+        for i in range(0, len(texts), batch_size):
+            batch = self.tokenizer.encode_batch(texts[i:i + batch_size])
+            enc = {
+                "input_ids": np.array([e.ids for e in batch], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in batch], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in batch], dtype=np.int64),
+            }
+            feed = {k: v for k, v in enc.items() if k in self.input_names}
+            hidden = self.session.run(None, feed)[0]  # [b, seq, dim]
+            if self.cls_pooling:
+                emb = hidden[:, 0]
+            else:
+                mask = enc["attention_mask"][..., None].astype(np.float32)
+                emb = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            out.append(emb.astype(np.float32))
+        emb = np.concatenate(out) if out else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(emb):
+            emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+        return emb
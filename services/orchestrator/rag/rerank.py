@@ -0,0 +1,95 @@
+import os, math, hashlib, threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from cache.lru import LRUCache
+from executors import rerank_pool, RERANK_WORKERS
+
+# Optional cross-encoder pass over the vector/hybrid candidates. Off by
+# default: it costs a forward pass per candidate, so it only runs within a
+# hard per-request budget and falls back to the incoming order past it.
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))
+
+# (normalized query, doc digest) -> sigmoid score
+_scores = LRUCache(int(os.getenv("RERANK_CACHE_SIZE", "20000")))
+_model = None
+_model_lock = threading.Lock()
+stats = {"reranked": 0, "fallbacks": 0, "shed": 0, "pairs_scored": 0}
+# timed-out jobs keep running; cap the backlog so overload sheds instead of queueing
+_inflight = 0
+_inflight_lock = threading.Lock()
+
+def get_reranker():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import CrossEncoder
+                _model = CrossEncoder(RERANK_MODEL, max_length=256)
+    return _model
+
+def _pair_key(query: str, doc: str) -> tuple:
+    q = " ".join(query.lower().split())
+    return q, hashlib.blake2b(doc.encode("utf-8"), digest_size=12).digest()
+
+def _score_pairs(query: str, docs: list[str], keys: list[tuple]) -> list[float]:
+    logits = get_reranker().predict([(query, d) for d in docs], batch_size=len(docs))
+    scores = [1 / (1 + math.exp(-float(x))) for x in logits]
+    for key, s in zip(keys, scores):
+        _scores.set(key, s)  # kept even if the caller already gave up waiting
+    stats["pairs_scored"] += len(docs)
+    return scores
+
+def _submit(query: str, docs: list[str], keys: list[tuple]):
+    global _inflight
+    with _inflight_lock:
+        if _inflight >= RERANK_WORKERS * 2:
+            return None
+        _inflight += 1
+    fut = rerank_pool.submit(_score_pairs, query, docs, keys)
+    fut.add_done_callback(_release)
+    return fut
+
+def _release(_fut):
+    global _inflight
+    with _inflight_lock:
+        _inflight -= 1
+
+def rerank(query: str, hits: list, k: int, budget_ms: float | None = None) -> tuple[list, bool]:
+    """
+    Re-order `hits` by cross-encoder score and cut to k. Returns (hits, True)
+    on success, or (hits[:k] in incoming order, False) if scoring didn't
+    finish within the budget or failed. `score` becomes the reranker's
+    probability; the previous score moves to `vector_score` if unset.
+    """
+    if not hits:
+        return hits, True
+    budget_ms = RERANK_BUDGET_MS if budget_ms is None else budget_ms
+    keys = [_pair_key(query, h.get("doc") or "") for h in hits]
+    scores = [_scores.get(key) for key in keys]
+    todo = [i for i, s in enumerate(scores) if s is None]
+    if todo:
+        fut = _submit(query, [hits[i].get("doc") or "" for i in todo], [keys[i] for i in todo])
+        if fut is None:
+            stats["shed"] += 1
+            return hits[:k], False
+        try:
+            for i, s in zip(todo, fut.result(timeout=budget_ms / 1000)):
+                scores[i] = s
+        except FutureTimeout:
+            stats["fallbacks"] += 1
+            return hits[:k], False
+        except Exception as e:
+            print(f"⚠️ rerank failed, keeping vector order: {e}")
+            stats["fallbacks"] += 1
+            return hits[:k], False
+    for h, s in zip(hits, scores):
+        h.setdefault("vector_score", h.get("score"))
+        h["score"] = s
+    stats["reranked"] += 1
+    return sorted(hits, key=lambda h: h["score"], reverse=True)[:k], True
+
+def rerank_stats() -> dict:
+    return {**stats, "enabled": RERANK_ENABLED, "budget_ms": RERANK_BUDGET_MS, "cache": _scores.snapshot()}
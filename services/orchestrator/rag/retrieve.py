@@ -1,23 +1,270 @@
-from .chroma_client import get_collection
-from .embedder import embed_texts
+import os, copy, json, math, time, asyncio, hashlib
+import numpy as np
+from .chroma_client import get_collection, collection_version
+from .embedder import embed_texts, aembed_texts
+from . import lexical, np_index
+from .rerank import RERANK_ENABLED, RERANK_CANDIDATES, RERANK_BUDGET_MS, rerank
+from executors import run_embedding
+from cache.lru import LRUCache
 
+# (normalized query -> embedding) and (collection, version, k, embedding -> hits).
+# Hit keys carry the collection version, so any upsert makes old entries unreachable.
+_query_embeddings = LRUCache(int(os.getenv("QUERY_EMBED_CACHE_SIZE", "4096")))
+_search_results = LRUCache(int(os.getenv("RETRIEVAL_CACHE_SIZE", "4096")))
 
-def search_gita(query: str, k: int = 3):
-    col = get_collection("gita")
-    emb = embed_texts([query])[0]
+# work -> Chroma collection. Several works may share one collection; they are
+# then told apart with a `where={"work": ...}` filter on the ingested metadata.
+WORK_COLLECTIONS = json.loads(os.getenv("RAG_WORK_COLLECTIONS", "null")) or {
+    "Bhagavad Gita": "gita",
+    "Yoga Sutra": "yoga_sutra",
+    "Upanishads": "upanishads",
+}
+# always searched alongside the planner's hint, so a thin corpus still yields hits
+DEFAULT_WORKS = [w.strip() for w in os.getenv("RAG_DEFAULT_WORKS", "Bhagavad Gita").split(",") if w.strip()]
 
-    res = col.query(
-        query_embeddings=[emb],
-        n_results=k,
-        include=["metadatas", "documents", "distances"]
-    )
+# Hybrid retrieval: fuse BM25 (rag.lexical) with cosine via reciprocal rank
+# fusion. Only kicks in for collections whose lexical index has been built.
+# Fusion picks and orders a collection's hits, but `score` stays cosine (the
+# fused value is `rrf_score`), so hits from collections with and without a
+# lexical index still merge on one scale.
+RAG_HYBRID = os.getenv("RAG_HYBRID", "true").lower() == "true"
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
 
+# chroma: query Chroma's HNSW. numpy: answer from the read-only snapshot that
+# rag.ingest writes (rag/np_index.py), falling back to Chroma where none exists.
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "chroma").lower()
+
+def collection_for_work(work: str) -> str:
+    return WORK_COLLECTIONS.get(work) or "gita"
+
+def works_for_hint(hint: str | None) -> list[str]:
+    """Planner hint first, then the defaults, without duplicates."""
+    return list(dict.fromkeys(([hint] if hint else []) + DEFAULT_WORKS))
+
+def _where_for(work: str) -> dict | None:
+    col = collection_for_work(work)
+    shared = sum(1 for c in WORK_COLLECTIONS.values() if c == col) > 1
+    return {"work": work} if shared or work not in WORK_COLLECTIONS else None
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def _use_lexical(collection: str, query: str | None, where: dict | None) -> bool:
+    # the lexical index only knows how to filter by work
+    return (RAG_HYBRID and bool(query) and (not where or set(where) == {"work"})
+            and lexical.index_version(collection) != 0)
+
+def _results_key(collection: str, k: int, emb, where: dict | None = None, query: str | None = None) -> tuple:
+    digest = hashlib.blake2b(np.asarray(emb, dtype=np.float32).tobytes(), digest_size=16).digest()
+    filt = json.dumps(where, sort_keys=True) if where else None
+    lex = (_normalize(query), lexical.index_version(collection)) if _use_lexical(collection, query, where) else None
+    reranked = RERANK_ENABLED and bool(query)
+    snap = np_index.snapshot_version(collection) if VECTOR_INDEX == "numpy" else 0
+    return (collection, collection_version(collection), snap, k, filt, lex, reranked, digest)
+
+def _snapshot_for(collection: str, where: dict | None):
+    if VECTOR_INDEX != "numpy" or (where and set(where) != {"work"}):
+        return None
+    return np_index.get_index(collection)
+
+def _chroma_hits(res: dict) -> list:
     hits = []
-    for md, doc, dist in zip(res["metadatas"][0], res["documents"][0], res["distances"][0]):
+    for cid, md, doc, dist in zip(res["ids"][0], res["metadatas"][0], res["documents"][0], res["distances"][0]):
         hits.append({
+            "id": cid,
             "doc": doc,
             "meta": md,
             "score": 1 - dist  # cosine score hack
         })
+    return hits
+
+def embed_query(query: str) -> list[float]:
+    key = _normalize(query)
+    emb = _query_embeddings.get(key)
+    if emb is None:
+        emb = embed_texts([query])[0]
+        _query_embeddings.set(key, emb)
+    return emb
+
+def _cached_hits(key: tuple):
+    hits = _search_results.get(key)
+    return copy.deepcopy(hits) if hits is not None else None
+
+def _left_ms(deadline: float | None) -> float | None:
+    """Milliseconds until a time.monotonic() deadline (None: no deadline)."""
+    return None if deadline is None else (deadline - time.monotonic()) * 1000
+
+def query_collection(collection: str, embedding: list[float], k: int = 3,
+                     where: dict | None = None, query: str | None = None,
+                     deadline: float | None = None):
+    """
+    Top-k hits from one collection for an already-encoded query (cached).
+    With `query` text and a built lexical index, vector and BM25 candidates
+    are fused with RRF: hits come in fused order with the fused value in
+    `rrf_score`, and `score` is still cosine. With RERANK_ENABLED,
+    RERANK_CANDIDATES are re-scored by the cross-encoder before the cut to k.
+    Past `deadline` (time.monotonic()) the remaining steps are skipped and
+    the vector hits returned uncached: the caller has stopped waiting, and
+    the pool thread shouldn't keep working for it.
+    """
+    key = _results_key(collection, k, embedding, where, query)
+    hits = _cached_hits(key)
+    if hits is not None:
+        return hits
 
+    hybrid = _use_lexical(collection, query, where)
+    reranked = RERANK_ENABLED and bool(query)
+    keep = max(k, RERANK_CANDIDATES) if reranked else k
+    n = max(keep, RAG_HYBRID_CANDIDATES) if hybrid else keep
+    col = get_collection(collection)
+    snap = _snapshot_for(collection, where)
+    if snap is not None:
+        hits = [snap.hit(r, s) for r, s in snap.search(embedding, n, (where or {}).get("work"))[0]]
+    else:
+        res = col.query(
+            query_embeddings=[embedding],
+            n_results=n,
+            where=where,
+            include=["metadatas", "documents", "distances"]
+        )
+        hits = _chroma_hits(res)
+    left = _left_ms(deadline)
+    if left is not None and left <= 0:
+        return hits[:k]
+    if hybrid:
+        hits = _fuse(col, collection, query, embedding, hits, keep, (where or {}).get("work"))
+    if reranked:
+        left = _left_ms(deadline)
+        if left is not None and left <= 0:
+            return hits[:k]
+        hits, ok = rerank(query, hits, k, None if left is None else min(RERANK_BUDGET_MS, left))
+        if not ok:
+            return hits  # over budget: serve vector order, but don't cache it
+
+    _search_results.set(key, copy.deepcopy(hits))
+    return hits
+
+def _fuse(col, collection: str, query: str, embedding, vector_hits: list, k: int, work: str | None) -> list:
+    lex = lexical.get_index(collection).search(query, RAG_HYBRID_CANDIDATES, work)
+    fused = lexical.rrf([[h["id"] for h in vector_hits], [cid for cid, _ in lex]], RAG_RRF_K)[:k]
+    by_id = {h["id"]: h for h in vector_hits}
+    missing = [cid for cid, _ in fused if cid not in by_id]
+    if missing:  # lexical-only hits: fetch their text, and score them by cosine like the rest
+        got = col.get(ids=missing, include=["documents", "metadatas", "embeddings"])
+        q = np.asarray(embedding, dtype=np.float32)
+        q /= max(float(np.linalg.norm(q)), 1e-12)
+        for cid, doc, md, emb in zip(got["ids"], got["documents"], got["metadatas"], got["embeddings"]):
+            emb = np.asarray(emb, dtype=np.float32)
+            cos = float(emb @ q) / max(float(np.linalg.norm(emb)), 1e-12)
+            by_id[cid] = {"id": cid, "doc": doc, "meta": md, "score": cos}
+    bm25 = dict(lex)
+    out = []
+    for cid, rrf_score in fused:
+        if cid in by_id:
+            h = by_id[cid]
+            h["rrf_score"], h["bm25"] = rrf_score, bm25.get(cid)
+            out.append(h)
+    return out
+
+def search_gita(query: str, k: int = 3, embedding: list[float] | None = None):
+    """Top-k verses; pass `embedding` if the caller already encoded `query`."""
+    emb = embedding if embedding is not None else embed_query(query)
+    return query_collection("gita", emb, k, query=query)
+
+async def asearch_gita(query: str, k: int = 3, embedding: list[float] | None = None):
+    """
+    Same as search_gita: the encode goes through the micro-batcher, then the
+    Chroma query runs on the bounded embedding pool. Cache hits skip both.
+    """
+    if embedding is None:
+        embedding = await aembed_query(query)
+    hits = _cached_hits(_results_key("gita", k, embedding, query=query))
+    if hits is not None:
+        return hits
+    return await run_embedding(query_collection, "gita", embedding, k, None, query)
+
+def merge_hits(per_work: dict[str, list], k: int, quota: int | None = None) -> list:
+    """
+    Merge per-work hit lists, keeping each list's own order (fused or
+    reranked, so not necessarily by `score`): each step takes the list head
+    with the best score. No work contributes more than `quota` hits
+    (default: an even share of k) unless the others run dry.
+    """
+    quota = quota or max(1, math.ceil(k / max(1, len(per_work))))
+    pos = {w: 0 for w in per_work}
+    taken = []
+    for capped in (True, False):  # within quota first, then whatever is left
+        while len(taken) < k:
+            best, best_score = None, None
+            for w, hits in per_work.items():
+                if pos[w] >= len(hits) or (capped and pos[w] >= quota):
+                    continue
+                score = hits[pos[w]].get("score") or 0.0
+                if best is None or score > best_score:
+                    best, best_score = w, score
+            if best is None:
+                break
+            taken.append(per_work[best][pos[best]])
+            pos[best] += 1
+    return taken
+
+def _tag_work(hits: list, work: str) -> list:
+    for h in hits:
+        h["meta"] = {"work": work, **(h.get("meta") or {})}
     return hits
+
+def _search_one(work: str, query: str, emb, k: int, deadline: float | None = None) -> list:
+    left = _left_ms(deadline)
+    if left is not None and left <= 0:
+        return []  # queued behind other work until the caller gave up
+    try:
+        hits = query_collection(collection_for_work(work), emb, k, _where_for(work), query, deadline)
+    except Exception as e:  # missing/empty collection shouldn't sink the others
+        print(f"⚠️ retrieval for {work!r} failed: {e}")
+        return []
+    return _tag_work(hits, work)
+
+async def _asearch_one(work: str, query: str, emb, k: int, deadline: float | None = None) -> list:
+    hits = _cached_hits(_results_key(collection_for_work(work), k, emb, _where_for(work), query))
+    if hits is not None:
+        return _tag_work(hits, work)
+    return await run_embedding(_search_one, work, query, emb, k, deadline)
+
+def search(query: str, works: list[str] | None = None, k: int = 3,
+           quota: int | None = None, embedding: list[float] | None = None):
+    """Sequential multi-work search; see asearch for the concurrent version."""
+    works = works or DEFAULT_WORKS
+    emb = embedding if embedding is not None else embed_query(query)
+    per_work = {w: _search_one(w, query, emb, k) for w in works}
+    return merge_hits(per_work, k, quota)
+
+async def asearch(query: str, works: list[str] | None = None, k: int = 3,
+                  quota: int | None = None, embedding: list[float] | None = None,
+                  deadline: float | None = None):
+    """
+    Embed once, query every work's collection concurrently on the embedding
+    pool, then merge by score with per-work quotas. Cancelling the await
+    doesn't stop the pool threads, so callers with a timeout pass it as
+    `deadline` (time.monotonic()) too; see query_collection.
+    """
+    works = works or DEFAULT_WORKS
+    if embedding is None:
+        embedding = await aembed_query(query)
+    results = await asyncio.gather(*[_asearch_one(w, query, embedding, k, deadline) for w in works])
+    per_work = dict(zip(works, results))
+    return merge_hits(per_work, k, quota)
+
+async def aembed_query(query: str) -> list[float]:
+    key = _normalize(query)
+    emb = _query_embeddings.get(key)
+    if emb is None:
+        emb = (await aembed_texts([query]))[0]
+        _query_embeddings.set(key, emb)
+    return emb
+
+def retrieval_cache_stats() -> dict:
+    return {
+        "query_embeddings": _query_embeddings.snapshot(),
+        "results": _search_results.snapshot(),
+    }
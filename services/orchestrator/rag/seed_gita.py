@@ -1,5 +1,4 @@
-from .chroma_client import get_collection
-from .embedder import embed_texts
+from .ingest import ingest_records
 
 # few verses for demo
 verses = [
@@ -22,20 +21,9 @@ verses = [
 ]
 
 def main():
-    col = get_collection("gita")
-    texts = [v["text"] + " " + v["translation"] for v in verses]
-    embeddings = embed_texts(texts)
-    ids = [v["id"] for v in verses]
-    metadatas = verses
-
-    col.upsert(
-        ids=ids,
-        embeddings=embeddings,
-        documents=texts,
-        metadatas=metadatas,
-    )
-
-    print("✅ Seeded Bhagavad Gita verses:", ids)
+    # demo seed; load full corpora with `python -m rag.ingest <file.jsonl|csv>`
+    stats = ingest_records(verses, "gita")
+    print("✅ Seeded Bhagavad Gita verses:", [v["id"] for v in verses], stats)
 
 if __name__ == "__main__":
     main()
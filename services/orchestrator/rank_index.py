@@ -0,0 +1,135 @@
+"""
+In-process ranking of users by an integer score (karmic points), for the
+leaderboard. Scores are small non-negative integers, so the index is a
+Fenwick tree of user counts per score plus, per score, a sorted list of the
+users holding it:
+
+  set / remove         O(log S) tree update + bisect into one score bucket
+  rank(user)           O(log S): 1 + users with a strictly higher score
+  page(offset, limit)  O(log S) to find where `offset` falls, then a slice
+  count_between(a, b)  O(log S), e.g. users per level
+
+S is the highest score seen (the tree doubles when a score outgrows it).
+Order is score descending, then user id ascending; ties share a rank.
+Thread-safe; pure Python, no DB.
+"""
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List, Optional, Tuple
+
+class RankIndex:
+    def __init__(self, size: int = 1024):
+        self._lock = threading.Lock()
+        self._score: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, List] = {}
+        self._size = size
+        self._tree = [0] * (size + 1)
+
+    def __len__(self):
+        return len(self._score)
+
+    # --- Fenwick tree over score positions (score s lives at position s + 1) ---
+
+    def _add(self, score: int, delta: int):
+        i = score + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, pos: int) -> int:
+        """Users whose score is < pos (i.e. at positions 1..pos)."""
+        total = 0
+        pos = min(pos, self._size)
+        while pos > 0:
+            total += self._tree[pos]
+            pos -= pos & -pos
+        return total
+
+    def _grow(self, score: int):
+        size = self._size
+        while size <= score:
+            size *= 2
+        self._size = size
+        self._tree = [0] * (size + 1)
+        for s, users in self._buckets.items():
+            self._add(s, len(users))
+
+    def _below(self, target: int) -> int:
+        """Largest pos with _prefix(pos) < target (binary lifting down the tree)."""
+        pos, step = 0, 1 << (self._size.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= self._size and self._tree[nxt] < target:
+                pos = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+    # --- updates ---
+
+    def _unlink(self, user, score: int):
+        users = self._buckets[score]
+        del users[bisect_left(users, user)]
+        if not users:
+            del self._buckets[score]
+        self._add(score, -1)
+
+    def set(self, user, score: int):
+        score = max(0, int(score))
+        with self._lock:
+            old = self._score.get(user)
+            if old == score:
+                return
+            if old is not None:
+                self._unlink(user, old)
+            if score >= self._size:
+                self._grow(score)
+            self._score[user] = score
+            insort(self._buckets.setdefault(score, []), user)
+            self._add(score, 1)
+
+    def remove(self, user):
+        with self._lock:
+            old = self._score.pop(user, None)
+            if old is not None:
+                self._unlink(user, old)
+
+    def clear(self):
+        with self._lock:
+            self._score.clear()
+            self._buckets.clear()
+            self._tree = [0] * (self._size + 1)
+
+    # --- reads ---
+
+    def score(self, user) -> Optional[int]:
+        return self._score.get(user)
+
+    def rank(self, user) -> Optional[Tuple[int, int]]:
+        """(rank, score) of `user`, 1-based; None if not ranked."""
+        with self._lock:
+            s = self._score.get(user)
+            if s is None:
+                return None
+            return len(self._score) - self._prefix(s + 1) + 1, s
+
+    def page(self, offset: int = 0, limit: int = 20) -> List[Tuple[int, Hashable, int]]:
+        """[(rank, user, score)] for positions offset .. offset+limit-1 of the ranking."""
+        out = []
+        with self._lock:
+            n = len(self._score)
+            k = max(0, offset)
+            while len(out) < limit and k < n:
+                s = self._below(n - k)            # score holding the k-th user (descending)
+                above = n - self._prefix(s + 1)   # users with a higher score
+                users = self._buckets[s]
+                take = users[k - above:k - above + limit - len(out)]
+                out.extend((above + 1, u, s) for u in take)
+                k += len(take)
+        return out
+
+    def count_between(self, lo: int, hi: Optional[int] = None) -> int:
+        """Users with lo <= score < hi (hi None: no upper bound)."""
+        with self._lock:
+            upper = len(self._score) if hi is None else self._prefix(hi)
+            return upper - self._prefix(max(0, lo))
@@ -0,0 +1,129 @@
+import os, json, time, threading
+from typing import List
+
+from sqlalchemy import exc
+
+from db import SessionLocal
+from crud import insert_stories
+from write_behind import WriteBehindQueue
+
+# Write-behind persistence for /story/stream: the stream sends "done" with a
+# pre-generated story id and queues the row; one worker thread writes queued
+# rows with a multi-row INSERT. Transient DB failures are retried with
+# backoff, then spooled to a JSONL file that is replayed at the next startup.
+STORY_WRITER_ENABLED = os.getenv("STORY_WRITER_ENABLED", "true").lower() == "true"
+STORY_WRITER_BATCH = int(os.getenv("STORY_WRITER_BATCH", "100"))
+STORY_WRITER_FLUSH_MS = float(os.getenv("STORY_WRITER_FLUSH_MS", "50"))
+STORY_WRITER_MAX_QUEUE = int(os.getenv("STORY_WRITER_MAX_QUEUE", "5000"))
+STORY_WRITER_RETRIES = int(os.getenv("STORY_WRITER_RETRIES", "5"))
+STORY_WRITER_BACKOFF_MS = float(os.getenv("STORY_WRITER_BACKOFF_MS", "200"))  # doubles per retry, capped at 5s
+STORY_WRITER_DRAIN_S = float(os.getenv("STORY_WRITER_DRAIN_S", "15"))
+STORY_WRITER_SPOOL = os.getenv("STORY_WRITER_SPOOL", "./.story_spool.jsonl")
+
+def is_transient(e: Exception) -> bool:
+    """Connection loss, pool timeout, server restart: worth retrying the same rows."""
+    if isinstance(e, (exc.OperationalError, exc.InterfaceError, exc.TimeoutError)):
+        return True
+    return isinstance(e, exc.DBAPIError) and e.connection_invalidated
+
+def write_stories(rows: List[dict]):
+    with SessionLocal() as db:
+        insert_stories(db, rows)
+        db.commit()
+
+class StoryWriter(WriteBehindQueue):
+    """
+    Write-behind batching with a failure policy for rows that are the user's
+    only copy of their story:
+      transient error   retry with exponential backoff, up to `retries` times
+                        (and never past the drain deadline while closing),
+                        then append the rows to the spool file
+      other error       split the batch and write rows one by one, so one bad
+                        row (e.g. a vanished session FK) doesn't sink the rest
+    insert_stories ignores duplicate ids, so retries and replays are idempotent.
+    """
+
+    def __init__(self, write, max_batch: int = 100, flush_ms: float = 50, max_queue: int = 5000,
+                 retries: int = 5, backoff_ms: float = 200, spool_path: str = STORY_WRITER_SPOOL):
+        super().__init__(max_batch, flush_ms, max_queue, name="story writer")
+        self.write = write
+        self.retries = retries
+        self.backoff_s = backoff_ms / 1000
+        self.spool_path = spool_path
+        self._spool_lock = threading.Lock()
+        self.stats.update({"retries": 0, "spooled": 0, "replayed": 0})
+
+    def _write_batch(self, batch):
+        self._write_rows(batch)
+
+    def _write_rows(self, batch) -> int:
+        """Write, retry, isolate or spool `batch`; returns how many rows were written."""
+        rows = [row for _, row in batch]
+        delay = self.backoff_s
+        for attempt in range(self.retries + 1):
+            try:
+                self.write(rows)
+                self._record_written(batch)
+                return len(rows)
+            except Exception as e:
+                if not is_transient(e):
+                    if len(batch) > 1:
+                        return sum(self._write_rows([item]) for item in batch)
+                    print(f"⚠️ story writer dropped story {rows[0]['id']}: {e}")
+                    self.stats["failed"] += 1
+                    return 0
+                err = e
+            if attempt == self.retries:
+                break
+            wait = min(delay, 5.0)
+            if self._deadline is not None and time.monotonic() + wait > self._deadline:
+                break
+            self.stats["retries"] += 1
+            time.sleep(wait)
+            delay *= 2
+        self._spool(rows, err)
+        return 0
+
+    def _spool(self, rows: List[dict], err: Exception | None = None):
+        with self._spool_lock, open(self.spool_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        self.stats["spooled"] += len(rows)
+        print(f"⚠️ story writer spooled {len(rows)} stories to {self.spool_path}: {err}")
+
+    def _abandon(self, rows: List[dict], err: Exception):
+        self._spool(rows, err)
+
+    def close(self, timeout: float = STORY_WRITER_DRAIN_S) -> bool:
+        """
+        Flush what's queued; whatever can't be written in time is spooled, not
+        lost. Past the deadline the rows still queued are spooled here, and
+        the batch the worker holds is retried no further: the worker writes
+        or spools it itself before it exits.
+        """
+        return super().close(timeout)
+
+    def replay_spool(self) -> int:
+        """
+        Write rows spooled by an earlier run (call at startup, off the loop),
+        with the same retry/isolate/spool policy as queued rows, so a row that
+        still can't be written goes back to the spool for the next start.
+        """
+        replay = self.spool_path + ".replay"
+        with self._spool_lock:
+            if os.path.exists(self.spool_path) and not os.path.exists(replay):
+                os.replace(self.spool_path, replay)
+        if not os.path.exists(replay):
+            return 0
+        with open(replay, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        replayed = 0
+        for i in range(0, len(rows), self.max_batch):
+            now = time.monotonic()
+            replayed += self._write_rows([(now, row) for row in rows[i:i + self.max_batch]])
+        os.remove(replay)
+        self.stats["replayed"] += replayed
+        return replayed
+
+writer = StoryWriter(write_stories, STORY_WRITER_BATCH, STORY_WRITER_FLUSH_MS, STORY_WRITER_MAX_QUEUE,
+                     STORY_WRITER_RETRIES, STORY_WRITER_BACKOFF_MS)
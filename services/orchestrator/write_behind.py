@@ -0,0 +1,166 @@
+import time, queue, threading
+from typing import List, Optional
+
+# Batching queue behind the background writers (memory.writer, story_writer):
+# callers enqueue and return; one worker thread takes whatever has queued up
+# and hands it to the subclass's _write_batch as one batch.
+
+_STOP = object()
+
+class WriteBehindQueue:
+    """
+    Items are flushed when max_batch have queued or flush_ms after the first
+    one arrived, whichever comes first. submit() never blocks: past max_queue
+    the item is dropped and counted.
+
+    Subclasses implement _write_batch (their retry/failure policy) and may
+    override _abandon, which gets whatever close() could not write in time.
+    """
+
+    def __init__(self, max_batch: int = 64, flush_ms: float = 500, max_queue: int = 10000,
+                 name: str = "writer"):
+        self.name = name
+        self.max_batch = max_batch
+        self.flush_s = flush_ms / 1000
+        self._q: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._deadline: float | None = None  # set by close(); write policies stop retrying past it
+        # set once close() gives up waiting: from then on the queue is close()'s
+        # and the worker only finishes the batch it already holds
+        self._abandoned = threading.Event()
+        self._batch_since: Optional[float] = None  # enqueue time of the batch being collected/written
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "dropped": 0, "failed": 0,
+                      "last_lag_ms": 0.0, "max_lag_ms": 0.0}
+
+    def submit(self, item) -> bool:
+        if self._closed:
+            self.stats["dropped"] += 1
+            return False
+        try:
+            self._q.put_nowait((time.monotonic(), item))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["enqueued"] += 1
+        if self._worker is None:
+            self._start()
+        return True
+
+    def _start(self):
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=self.name.replace(" ", "-"), daemon=True)
+                self._worker.start()
+
+    def _write_batch(self, batch: list):
+        """Write [(enqueued_at, item), ...]; call _record_written for what landed."""
+        raise NotImplementedError
+
+    def _abandon(self, items: List, err: Exception):
+        print(f"⚠️ {self.name} dropped {len(items)} unwritten items: {err}")
+        self.stats["dropped"] += len(items)
+
+    def _collect(self, draining: bool):
+        """Next batch, and whether the stop marker was seen. Draining, it never waits."""
+        while True:
+            try:
+                first = self._q.get_nowait() if draining else self._q.get()
+            except queue.Empty:
+                return [], False
+            if first is not _STOP:
+                break
+            if not draining:
+                return [], True
+        self._batch_since = first[0]
+        batch = [first]
+        deadline = first[0] + self.flush_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._q.get_nowait() if draining or remaining <= 0 else self._q.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _take(self, batch) -> bool:
+        """Claim `batch` for writing, unless close() has abandoned the worker."""
+        if not self._abandoned.is_set():
+            return True
+        # taken from the queue while close() was emptying it
+        self._abandon([item for _, item in batch], TimeoutError("shutdown drain deadline"))
+        return False
+
+    def _run(self):
+        draining = False
+        while True:
+            batch, stop = self._collect(draining)
+            if batch:
+                if not self._take(batch):
+                    return
+                try:
+                    self._write_batch(batch)
+                finally:
+                    self._batch_since = None
+            elif draining:
+                return
+            # after the stop marker, write what is still queued a batch at a
+            # time, so anything not yet taken stays in the queue
+            draining = draining or stop
+
+    def _record_written(self, batch):
+        lag = (time.monotonic() - batch[0][0]) * 1000
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["last_lag_ms"] = round(lag, 1)
+        self.stats["max_lag_ms"] = round(max(self.stats["max_lag_ms"], lag), 1)
+
+    def close(self, timeout: float, grace: float = 5.0) -> bool:
+        """
+        Stop accepting items and write what's queued; True if it finished in
+        time. Otherwise the worker is told to stop after its current batch,
+        what is still queued goes to _abandon, and close() waits up to `grace`
+        more seconds for that batch, which the worker still owns.
+        """
+        self._closed = True
+        if self._worker is None:
+            return True
+        self._deadline = time.monotonic() + timeout
+        try:
+            self._q.put(_STOP, timeout=timeout)  # waits for room if the queue is full
+        except queue.Full:
+            pass
+        self._worker.join(max(0.0, self._deadline - time.monotonic()))
+        if not self._worker.is_alive():
+            return True
+        self._abandoned.set()
+        rest = []
+        while True:
+            try:
+                item = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item[1])
+        try:
+            self._q.put_nowait(_STOP)  # the drain above may have taken the first one
+        except queue.Full:
+            pass
+        if rest:
+            self._abandon(rest, TimeoutError("shutdown drain deadline"))
+        self._worker.join(grace)
+        return False
+
+    def snapshot(self) -> dict:
+        s = dict(self.stats)
+        s["queue_depth"] = self._q.qsize()
+        # age of the oldest unwritten item: the batch in hand, else the queue head
+        with self._q.mutex:
+            head = next((item for item in self._q.queue if item is not _STOP), None)
+        oldest = self._batch_since or (head[0] if head else None)
+        s["oldest_pending_ms"] = round((time.monotonic() - oldest) * 1000, 1) if oldest else 0.0
+        return s